@@ -1,10 +1,10 @@
 #!/usr/bin/env python3
 import asyncio
-import bittensor
 import argparse
-from src.shared.dtao_helper import DTAOHelper
-from src.investing.investment_manager import InvestmentManager
-from src.utils.get_my_wallet import get_my_wallet
+
+from src.shared.trade_ledger import add_ledger_argument
+from src.utils.output import add_output_arguments, configure_logging, output_from_args
+from src.utils.startup_profile import StartupProfile, add_profile_argument
 
 
 def parse_arguments():
@@ -28,11 +28,46 @@ def parse_arguments():
         required=True,
         help="Total amount to stake across the specified netuids."
     )
-    return parser.parse_args()
+    add_ledger_argument(parser)
+    parser.add_argument(
+        "--journal",
+        type=str,
+        default="data/dca_journal.jsonl",
+        help="Write-ahead journal of executed stakes; a restart with the same arguments resumes the plan "
+             "instead of starting over (empty string disables it; use one file per running plan)."
+    )
+    parser.add_argument(
+        "--signing_workers",
+        type=int,
+        default=4,
+        help="Threads that sign stake extrinsics off the event loop (0 signs through subtensor.add_stake/unstake)."
+    )
+    add_output_arguments(parser)
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    if args.increment <= 0 or args.total <= 0:
+        parser.error("--increment and --total must be positive.")
+    if args.journal and args.signing_workers <= 0:
+        parser.error("--journal records each stake's nonce and needs --signing_workers > 0 (or --journal \"\").")
+    return args
 
 
-async def main():
-    args = parse_arguments()
+async def main(args):
+    configure_logging()
+    # Heavy imports only once the arguments are known to be valid
+    profile = StartupProfile(args.profile_startup)
+    with profile.phase("bittensor"):
+        import bittensor
+    with profile.phase("src"):
+        from src.shared.dtao_helper import DTAOHelper
+        from src.investing.investment_manager import InvestmentManager
+        from src.shared.extrinsic_signer import ExtrinsicSigner
+        from src.shared.trade_ledger import TradeLedger
+        from src.shared.dca_journal import DcaJournal
+        from src.utils.get_my_wallet import get_my_wallet
+    with profile.phase("output"):
+        output = output_from_args(args)
+    profile.report()
 
     # Create the AsyncSubtensor instance
     subtensor = await bittensor.async_subtensor().initialize()
@@ -41,26 +76,43 @@ async def main():
 
     # Instantiate helpers
     helper = DTAOHelper(subtensor)
-    investor = InvestmentManager(wallet=my_wallet, subtensor=subtensor)
+    ledger = TradeLedger(args.ledger) if args.ledger else None
+    signer = ExtrinsicSigner(subtensor, max_workers=args.signing_workers) if args.signing_workers > 0 else None
+    journal = DcaJournal(args.journal) if args.journal else None
+    investor = InvestmentManager(
+        wallet=my_wallet, subtensor=subtensor, ledger=ledger, signer=signer, output=output, journal=journal
+    )
 
     # Check balance
     start_balance = await helper.get_balance(my_wallet.coldkeypub.ss58_address)
-    print(f"Starting TAO balance: {start_balance}")
+    output.event("start_balance", message=f"Starting TAO balance: {start_balance}", tao=start_balance)
 
-    # Perform DCA into the specified subnets
-    final_stakes = await investor.dca(
-        target_netuids=args.netuids,
-        total_stake=args.total,
-        increment=args.increment
-    )
+    try:
+        # Perform DCA into the specified subnets
+        final_stakes = await investor.dca(
+            target_netuids=args.netuids,
+            total_stake=args.total,
+            increment=args.increment
+        )
+
+        output.event(
+            "final_stakes",
+            message="=== Final Stake Info ===",
+            rows=[{"netuid": netuid, "final_alpha": stake_balance} for netuid, stake_balance in final_stakes.items()]
+        )
 
-    print("=== Final Stake Info ===")
-    for netuid, stake_balance in final_stakes.items():
-        print(f"Netuid: {netuid}, Final Stake: {stake_balance}")
+        # Check final balance
+        end_balance = await helper.get_balance(my_wallet.coldkeypub.ss58_address)
+        output.event("end_balance", message=f"Ending TAO balance: {end_balance}", tao=end_balance)
 
-    # Check final balance
-    end_balance = await helper.get_balance(my_wallet.coldkeypub.ss58_address)
-    print(f"Ending TAO balance: {end_balance}")
+        if signer is not None:
+            output.event("signing", message=f"Signing: {signer.metrics()}", **signer.metrics())
+    finally:
+        if signer is not None:
+            signer.close()
+        if journal is not None:
+            journal.close()
+        output.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(parse_arguments()))
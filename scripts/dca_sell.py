@@ -1,15 +1,14 @@
 #!/usr/bin/env python3
 
 import asyncio
-import bittensor
 import argparse
 
-from src.shared.dtao_helper import DTAOHelper
-from src.investing.investment_manager import InvestmentManager
-from src.utils.get_my_wallet import get_my_wallet
+from src.shared.trade_ledger import add_ledger_argument
+from src.utils.output import add_output_arguments, configure_logging, output_from_args
+from src.utils.startup_profile import StartupProfile, add_profile_argument
 
 
-async def main():
+def parse_args():
     parser = argparse.ArgumentParser(
         description="Perform percentage-based DCA selling for specific subnets."
     )
@@ -33,11 +32,37 @@ async def main():
         default=0.05,
         help="Percentage of total stake to sell in each iteration (0 < sell_percentage < 1)."
     )
+    add_ledger_argument(parser)
+    parser.add_argument(
+        "--signing_workers",
+        type=int,
+        default=4,
+        help="Threads that sign stake extrinsics off the event loop (0 signs through subtensor.add_stake/unstake)."
+    )
+    add_output_arguments(parser)
+    add_profile_argument(parser)
     args = parser.parse_args()
 
     if len(args.netuids) != len(args.percentages):
-        print("Error: The number of netuids must match the number of percentages.")
-        return
+        parser.error("The number of netuids must match the number of percentages.")
+    return args
+
+
+async def main(args):
+    configure_logging()
+    # Heavy imports only once the arguments are known to be valid
+    profile = StartupProfile(args.profile_startup)
+    with profile.phase("bittensor"):
+        import bittensor
+    with profile.phase("src"):
+        from src.shared.dtao_helper import DTAOHelper
+        from src.investing.investment_manager import InvestmentManager
+        from src.shared.extrinsic_signer import ExtrinsicSigner
+        from src.shared.trade_ledger import TradeLedger
+        from src.utils.get_my_wallet import get_my_wallet
+    with profile.phase("output"):
+        output = output_from_args(args)
+    profile.report()
 
     subnets_and_percentages = dict(zip(args.netuids, args.percentages))
 
@@ -45,22 +70,34 @@ async def main():
     my_wallet = get_my_wallet(unlock=True)
 
     helper = DTAOHelper(subtensor)
-    investor = InvestmentManager(wallet=my_wallet, subtensor=subtensor)
+    ledger = TradeLedger(args.ledger) if args.ledger else None
+    signer = ExtrinsicSigner(subtensor, max_workers=args.signing_workers) if args.signing_workers > 0 else None
+    investor = InvestmentManager(wallet=my_wallet, subtensor=subtensor, ledger=ledger, signer=signer, output=output)
 
     start_balance = await helper.get_balance(my_wallet.coldkeypub.ss58_address)
-    print(f"Starting TAO balance: {start_balance}")
+    output.event("start_balance", message=f"Starting TAO balance: {start_balance}", tao=start_balance)
 
-    final_stakes = await investor.sell_dca(
-        subnets_and_percentages=subnets_and_percentages,
-        dca_sell_percentage=args.sell_percentage
-    )
+    try:
+        final_stakes = await investor.sell_dca(
+            subnets_and_percentages=subnets_and_percentages,
+            dca_sell_percentage=args.sell_percentage
+        )
+
+        output.event(
+            "final_stakes",
+            message="=== Final Stake Info After Unstake ===",
+            rows=[{"netuid": netuid, "remaining_alpha": stake_balance} for netuid, stake_balance in final_stakes.items()]
+        )
 
-    print("=== Final Stake Info After Unstake ===")
-    for netuid, stake_balance in final_stakes.items():
-        print(f"Netuid: {netuid}, Remaining Stake: {stake_balance}")
+        end_balance = await helper.get_balance(my_wallet.coldkeypub.ss58_address)
+        output.event("end_balance", message=f"Ending TAO balance: {end_balance}", tao=end_balance)
 
-    end_balance = await helper.get_balance(my_wallet.coldkeypub.ss58_address)
-    print(f"Ending TAO balance: {end_balance}")
+        if signer is not None:
+            output.event("signing", message=f"Signing: {signer.metrics()}", **signer.metrics())
+    finally:
+        if signer is not None:
+            signer.close()
+        output.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(parse_args()))
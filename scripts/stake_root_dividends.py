@@ -2,121 +2,242 @@
 
 import argparse
 import asyncio
-import bittensor
-from dotenv import load_dotenv
-from tabulate import tabulate
-
-from src.utils.colors import color_diff, color_value
-from src.utils.get_my_wallet import get_my_wallet
-from src.shared.subnet_staker import SubnetStaker
-from src.shared.dtao_helper import DTAOHelper
-
-load_dotenv()
-
-
-async def main(validator_hotkey:str):
+import logging
+from typing import List, Optional
+
+from src.shared.trade_ledger import add_ledger_argument
+from src.utils.output import add_output_arguments, configure_logging
+from src.utils.startup_profile import StartupProfile, add_profile_argument
+
+
+def _alpha_by_netuid(stake_infos, coldkey: str, netuids) -> dict:
+    """
+    Alpha held on each of `netuids` (summed over hotkeys) from one stake-info snapshot.
+    """
+    import bittensor
+
+    alpha = {netuid: bittensor.Balance.from_tao(0) for netuid in netuids}
+    for stake_info in stake_infos.get(coldkey, []):
+        if stake_info.netuid in alpha:
+            alpha[stake_info.netuid] += stake_info.stake
+    return alpha
+
+
+async def main(
+    validator_hotkeys: List[str],
+    ledger_path: str = None,
+    min_dividends: float = 0.01,
+    allocations_path: Optional[str] = None,
+    profile_startup: bool = False,
+    output_mode: str = "auto",
+    output_file: Optional[str] = None
+):
+    configure_logging()
+    # Heavy imports only once the arguments are known to be valid
+    profile = StartupProfile(profile_startup)
+    with profile.phase("bittensor"):
+        import bittensor
+    with profile.phase("src"):
+        from src.utils.get_my_wallet import get_my_wallet
+        from src.shared.subnet_staker import SubnetStaker
+        from src.shared.dtao_helper import DTAOHelper
+        from src.shared.trade_ledger import TradeLedger
+        from src.investing.dividend_harvester import DEFAULT_ALLOCATION, DividendHarvester, load_allocations
+        from src.investing.investment_manager import trade_row
+    with profile.phase("output"):
+        from src.utils.output import make_output
+        output = make_output(output_mode, output_file)
+    profile.report()
 
     subtensor = await bittensor.async_subtensor().initialize()
     my_wallet = get_my_wallet()
+    coldkey = my_wallet.coldkeypub.ss58_address
 
-    staker = SubnetStaker(wallet=my_wallet, subtensor=subtensor)
+    ledger = TradeLedger(ledger_path) if ledger_path else None
+    staker = SubnetStaker(wallet=my_wallet, subtensor=subtensor, ledger=ledger)
     helper = DTAOHelper(subtensor=subtensor)
 
-    subnets_to_stake = [1, 277, 18, 5]
-    subnets_percentages = [0.25, 0.25, 0.25, 0.25]
-
-    old_stake = await helper.get_stake(
-        netuid=0,
-        coldkey_ss58=my_wallet.coldkeypub.ss58_address,
-        hotkey_ss58=validator_hotkey
+    if allocations_path:
+        allocations = load_allocations(allocations_path)
+    else:
+        allocations = {DEFAULT_ALLOCATION: {1: 0.25, 277: 0.25, 18: 0.25, 5: 0.25}}
+    harvester = DividendHarvester(
+        wallet=my_wallet,
+        subtensor=subtensor,
+        validator_hotkeys=validator_hotkeys,
+        allocations=allocations,
+        staker=staker,
+        min_dividends=min_dividends
     )
+    subnets_to_stake = sorted({netuid for allocation in harvester.allocations.values() for netuid in allocation})
 
-    old_balance = await helper.get_balance(my_wallet.coldkeypub.ss58_address)
-    print(f"Starting TAO balance: {color_value(float(old_balance.tao))}\n")
-
-    old_alpha_balances = {}
-    for netuid in subnets_to_stake:
-        old_alpha_balances[netuid] = await staker.get_alpha_balance(netuid)
+    # One stake-info query gives every hotkey's root stake and every target's alpha
+    stake_infos, old_balance = await asyncio.gather(
+        helper.get_stake_info_for_coldkeys([coldkey]),
+        helper.get_balance(coldkey)
+    )
+    old_alpha_balances = _alpha_by_netuid(stake_infos, coldkey, subnets_to_stake)
+    await harvester.poll()
+    output.event("start_balance", message=f"Starting TAO balance: {float(old_balance.tao):.9f}\n", tao=old_balance)
+
+    output.event(
+        "root_stakes",
+        message="Root stake per validator hotkey:",
+        rows=[
+            {
+                "hotkey": hotkey,
+                "root_stake": harvester.root_stakes[hotkey],
+                "allocation": ", ".join(
+                    f"{netuid}: {weight:.0%}" for netuid, weight in harvester.allocation_for(hotkey).items()
+                )
+            }
+            for hotkey in harvester.validator_hotkeys
+        ]
+    )
 
-    print("Initial Alpha balances on each subnet:")
-    table_rows = []
-    for netuid in subnets_to_stake:
-        table_rows.append([
-            netuid,
-            color_value(float(old_alpha_balances[netuid].tao))
-        ])
-    print(tabulate(table_rows, headers=["NetUID", "Alpha"], tablefmt="fancy_grid"), "\n")
+    output.event(
+        "initial_alpha",
+        message="Initial Alpha balances on each subnet:",
+        rows=[{"netuid": netuid, "alpha": old_alpha_balances[netuid]} for netuid in subnets_to_stake]
+    )
 
     while True:
         try:
             current_block = await subtensor.get_current_block()
-            print(f"Current block: {current_block}. Waiting for next block...\n")
+            output.event("block", message=f"Current block: {current_block}. Waiting for next block...\n", block=current_block)
             await subtensor.wait_for_block(current_block + 1)
 
-            new_stake = await helper.get_stake(
-                netuid=0,
-                coldkey_ss58=my_wallet.coldkeypub.ss58_address,
-                hotkey_ss58=validator_hotkey
+            pending = await harvester.poll(current_block + 1)
+            total_pending = sum(float(dividend.tao) for dividend in pending.values())
+            if total_pending <= 0:
+                output.event("no_dividends", message="No new dividends this block.\n", block=current_block + 1)
+                continue
+
+            plan, results = await harvester.reinvest()
+            if not plan:
+                output.event(
+                    "accumulating",
+                    message=(
+                        f"Accumulated dividends: {total_pending:.9f} TAO over {len(pending)} hotkey(s) "
+                        f"(reinvesting each hotkey at {min_dividends} TAO)\n"
+                    ),
+                    block=current_block + 1,
+                    pending=total_pending,
+                    hotkeys=len(pending)
+                )
+                continue
+            if not results:
+                output.event(
+                    "reinvest_failed",
+                    message=(
+                        f"Reinvesting {total_pending:.9f} TAO of dividends failed; "
+                        f"they stay pending and are retried next block.\n"
+                    ),
+                    block=current_block + 1,
+                    pending=total_pending,
+                    hotkeys=len(plan)
+                )
+                continue
+
+            output.event(
+                "dividends",
+                message="Dividends reinvested per validator hotkey:",
+                rows=[
+                    {
+                        "hotkey": hotkey,
+                        "dividends": sum(per_netuid.values()),
+                        "routed_to": ", ".join(f"{n}: {t:.9f}" for n, t in per_netuid.items())
+                    }
+                    for hotkey, per_netuid in plan.items()
+                ],
+                block=current_block + 1
+            )
+
+            output.event(
+                "stakes",
+                rows=[
+                    trade_row(
+                        netuid,
+                        old_subnet_alpha,
+                        new_subnet_alpha,
+                        float(new_subnet_alpha.tao) - float(old_subnet_alpha.tao),
+                        None,
+                        "Staked"
+                    )
+                    for netuid, (old_subnet_alpha, new_subnet_alpha) in results.items()
+                ],
+                block=current_block + 1
+            )
+
+            old_balance = await helper.get_balance(coldkey)
+            output.event(
+                "balance",
+                message=f"\nBalance after staking dividends: {float(old_balance.tao):.9f}\n",
+                tao=old_balance
             )
-            dividends = new_stake - old_stake
-            if dividends > bittensor.Balance(0):
-                print(f"Dividends detected: {color_value(float(dividends.tao))} TAO\n")
-
-                stake_rows = []
-                for netuid, pct in zip(subnets_to_stake, subnets_percentages):
-                    stake_amount_tao = dividends.tao * pct
-                    if stake_amount_tao > 0:
-                        old_subnet_alpha = await staker.get_alpha_balance(netuid)
-                        await staker.buy_alpha(netuid=netuid, tao_amount=stake_amount_tao)
-                        new_subnet_alpha = await staker.get_alpha_balance(netuid)
-                        alpha_diff = float(new_subnet_alpha.tao) - float(old_subnet_alpha.tao)
-                        stake_rows.append([
-                            netuid,
-                            f"{float(old_subnet_alpha.tao):.9f}",
-                            color_value(float(new_subnet_alpha.tao)),
-                            color_diff(alpha_diff),
-                            "Staked"
-                        ])
-
-                if stake_rows:
-                    headers = ["NetUID", "Old Alpha", "New Alpha", "Alpha Diff", "Action"]
-                    print(tabulate(stake_rows, headers=headers, tablefmt="fancy_grid"))
-
-                old_balance = await helper.get_balance(my_wallet.coldkeypub.ss58_address)
-                print(f"\nBalance after staking dividends: {color_value(float(old_balance.tao))}\n")
-
-            else:
-                print("No new dividends this block.\n")
 
         except KeyboardInterrupt:
-            print("Exiting script.")
+            logging.info("Exiting script.")
             break
         except Exception as e:
-            print(f"Error in loop: {e}")
+            logging.error(f"Error in loop: {e}")
             await asyncio.sleep(5)
 
-    print("\nFinal Alpha balances on each subnet:")
-    final_table_rows = []
-    for netuid in subnets_to_stake:
-        final_alpha = await staker.get_alpha_balance(netuid)
-        diff = float(final_alpha.tao) - float(old_alpha_balances[netuid].tao)
-        final_table_rows.append([
-            netuid,
-            color_value(float(old_alpha_balances[netuid].tao)),
-            color_value(float(final_alpha.tao)),
-            color_diff(diff)
-        ])
-    print(tabulate(final_table_rows, headers=["NetUID", "Old Alpha", "Final Alpha", "Diff"], tablefmt="fancy_grid"))
+    final_alpha = _alpha_by_netuid(await helper.get_stake_info_for_coldkeys([coldkey]), coldkey, subnets_to_stake)
+    output.event(
+        "final_alpha",
+        message="\nFinal Alpha balances on each subnet:",
+        rows=[
+            {
+                "netuid": netuid,
+                "old_alpha": old_alpha_balances[netuid],
+                "final_alpha": final_alpha[netuid],
+                "diff": float(final_alpha[netuid].tao) - float(old_alpha_balances[netuid].tao)
+            }
+            for netuid in subnets_to_stake
+        ]
+    )
+    output.close()
 
-if __name__ == "__main__":
+
+def parse_args():
     parser = argparse.ArgumentParser()
     parser.add_argument(
         "--validator_hotkey",
         type=str,
+        nargs="+",
         required=True,
-        help="SS58 address of the validator hotkey to sell dividends from"
+        help="SS58 address(es) of the validator hotkey(s) whose root dividends are reinvested"
+    )
+    add_ledger_argument(parser)
+    parser.add_argument(
+        "--min_dividends",
+        type=float,
+        default=0.01,
+        help="Accumulate each hotkey's dividends until at least this many TAO before reinvesting (default: 0.01)"
     )
+    parser.add_argument(
+        "--allocations",
+        type=str,
+        default=None,
+        help="JSON allocation table: {\"default\": {netuid: weight}, \"hotkeys\": {hotkey: {netuid: weight}}}"
+    )
+    add_output_arguments(parser)
+    add_profile_argument(parser)
     args = parser.parse_args()
-    validator_hotkey = args.validator_hotkey
+    if args.min_dividends < 0:
+        parser.error("--min_dividends cannot be negative.")
+    return args
 
-    asyncio.run(main(validator_hotkey=validator_hotkey))
+
+if __name__ == "__main__":
+    args = parse_args()
+    asyncio.run(main(
+        validator_hotkeys=args.validator_hotkey,
+        ledger_path=args.ledger,
+        min_dividends=args.min_dividends,
+        allocations_path=args.allocations,
+        profile_startup=args.profile_startup,
+        output_mode=args.output,
+        output_file=args.output_file
+    ))
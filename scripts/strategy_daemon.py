@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import logging
+
+from src.utils.output import configure_logging
+from src.utils.startup_profile import StartupProfile, add_profile_argument
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Run several strategies (dca, dca_sell, tao_n, root_dividends) in one process sharing one chain connection pool."
+    )
+    parser.add_argument(
+        "--config",
+        type=str,
+        default="data/strategies.json",
+        help="JSON file listing the strategies to run (default: data/strategies.json)"
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="Worker processes to shard wallets across; 0 uses every core (default: 1, a single process)"
+    )
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    if args.processes < 0:
+        parser.error("--processes cannot be negative.")
+    return args
+
+
+async def main(args):
+    configure_logging()
+    # Heavy imports only once the arguments are known to be valid
+    profile = StartupProfile(args.profile_startup)
+    with profile.phase("bittensor + src"):
+        from src.investing.sharded_runner import ShardedRunner
+        from src.investing.strategy_daemon import StrategyDaemon, load_config, load_wallets
+        from src.utils.get_my_wallet import get_my_wallet
+    profile.report()
+
+    config = load_config(args.config)
+
+    if args.processes == 1:
+        strategies = config.get("strategies", [])
+        # Unlocked once, shared by every strategy
+        my_wallet = get_my_wallet(unlock=True) if any("wallet" not in s for s in strategies) else None
+        wallets = load_wallets(config, sorted({s["wallet"] for s in strategies if "wallet" in s}))
+        results = await StrategyDaemon(config, my_wallet, wallets=wallets).run()
+    else:
+        # Each worker unlocks only the wallets it hosts
+        results = await ShardedRunner(config, processes=args.processes or None).run()
+
+    logging.info("=== Strategy Results ===")
+    for name, result in results.items():
+        status = f"failed: {result}" if isinstance(result, Exception) else "finished"
+        logging.info(f"{name}: {status}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
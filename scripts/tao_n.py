@@ -1,15 +1,10 @@
 #!/usr/bin/env python3
 import argparse
 import asyncio
-import bittensor
 
-from src.shared.dtao_helper import DTAOHelper
-from src.investing.tao_n import TaoN
-from src.utils.get_my_wallet import get_my_wallet
-from src.utils.colors import color_value
-
-from tabulate import tabulate
-from colorama import Fore, Style
+from src.shared.trade_ledger import add_ledger_argument
+from src.utils.output import add_output_arguments, configure_logging, output_from_args
+from src.utils.startup_profile import StartupProfile, add_profile_argument
 
 
 def parse_args():
@@ -41,11 +36,46 @@ def parse_args():
         default=16,
         help="Number of top subnets to use (default: 16)"
     )
-    return parser.parse_args()
-
-
-async def main():
-    args = parse_args()
+    add_ledger_argument(parser)
+    parser.add_argument(
+        "--journal",
+        type=str,
+        default="data/tao_n_journal.jsonl",
+        help="Write-ahead journal of executed stakes; a restart with the same arguments resumes the plan "
+             "instead of starting over (empty string disables it; use one file per running plan)."
+    )
+    parser.add_argument(
+        "--signing_workers",
+        type=int,
+        default=4,
+        help="Threads that sign stake extrinsics off the event loop (0 signs through subtensor.add_stake/unstake)."
+    )
+    add_output_arguments(parser)
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    if args.total <= 0 or args.days <= 0 or args.n <= 0:
+        parser.error("--total, --days and --n must be positive.")
+    if args.journal and args.signing_workers <= 0:
+        parser.error("--journal records each stake's nonce and needs --signing_workers > 0 (or --journal \"\").")
+    return args
+
+
+async def main(args):
+    configure_logging()
+    # Heavy imports only once the arguments are known to be valid
+    profile = StartupProfile(args.profile_startup)
+    with profile.phase("bittensor"):
+        import bittensor
+    with profile.phase("src"):
+        from src.shared.dtao_helper import DTAOHelper
+        from src.investing.tao_n import TaoN
+        from src.shared.extrinsic_signer import ExtrinsicSigner
+        from src.shared.trade_ledger import TradeLedger
+        from src.shared.dca_journal import DcaJournal
+        from src.utils.get_my_wallet import get_my_wallet
+    with profile.phase("output"):
+        output = output_from_args(args)
+    profile.report()
 
     # Initialize async subtensor
     subtensor = await bittensor.async_subtensor(network=args.network).initialize()
@@ -56,50 +86,78 @@ async def main():
     # Check starting balance
     helper = DTAOHelper(subtensor)
     start_balance = await helper.get_balance(my_wallet.coldkeypub.ss58_address)
-    print(
-        f"{Fore.GREEN}Starting TAO balance:{Style.RESET_ALL} "
-        f"{color_value(float(start_balance.tao), decimals=9)}\n"
-    )
+    output.event("start_balance", message=f"Starting TAO balance: {float(start_balance.tao):.9f}\n", tao=start_balance)
 
     # Create TaoN instance
-    tao_n = TaoN(wallet=my_wallet, subtensor=subtensor, N=args.n)
-
-    print(
-        f"Will stake a total of {args.total} TAO over {args.days} days.\n"
-        f"Targeting top {args.n} subnets on '{args.network}' network.\n"
+    ledger = TradeLedger(args.ledger) if args.ledger else None
+    signer = ExtrinsicSigner(subtensor, max_workers=args.signing_workers) if args.signing_workers > 0 else None
+    journal = DcaJournal(args.journal) if args.journal else None
+    tao_n = TaoN(
+        wallet=my_wallet, subtensor=subtensor, N=args.n, ledger=ledger, signer=signer, output=output, journal=journal
     )
 
-    # Execute the DCA process
-    final_stakes = await tao_n.dca_TaoN(
-        total_tao=args.total,
+    output.event(
+        "plan",
+        message=(
+            f"Will stake a total of {args.total} TAO over {args.days} days.\n"
+            f"Targeting top {args.n} subnets on '{args.network}' network.\n"
+        ),
+        total=args.total,
         days=args.days,
-        N=args.n
-    )
-
-    # Show final results
-    print(f"=== Final Tao{args.n} Alpha Distribution ===")
-    table_rows = []
-    total_staked = 0.0
-    for netuid, alpha_balance in final_stakes.items():
-        st_val = float(alpha_balance.tao)
-        table_rows.append([netuid, color_value(st_val, decimals=9)])
-        total_staked += st_val
-
-    headers = ["NetUID", "Final Alpha"]
-    print(tabulate(table_rows, headers=headers, tablefmt="fancy_grid"))
-
-    print(f"\nTotal Staked: {color_value(total_staked, decimals=9)} TAO")
-
-    # Check ending wallet balance
-    end_balance = await helper.get_balance(my_wallet.coldkeypub.ss58_address)
-    print(
-        f"{Fore.GREEN}Ending TAO balance:{Style.RESET_ALL} "
-        f"{color_value(float(end_balance.tao), decimals=9)}"
+        n=args.n,
+        network=args.network
     )
 
-    balance_diff = float(end_balance.tao) - float(start_balance.tao)
-    print(f"Balance difference (End - Start): {color_value(balance_diff, decimals=9)} TAO")
+    try:
+        # Execute the DCA process
+        final_stakes = await tao_n.dca_TaoN(
+            total_tao=args.total,
+            days=args.days,
+            N=args.n
+        )
+
+        # Show final results
+        total_staked = sum(float(alpha_balance.tao) for alpha_balance in final_stakes.values())
+        output.event(
+            "final_stakes",
+            message=f"=== Final Tao{args.n} Alpha Distribution ===",
+            rows=[{"netuid": netuid, "final_alpha": alpha_balance} for netuid, alpha_balance in final_stakes.items()],
+            total_staked=total_staked
+        )
+
+        # Check ending wallet balance
+        end_balance = await helper.get_balance(my_wallet.coldkeypub.ss58_address)
+        balance_diff = float(end_balance.tao) - float(start_balance.tao)
+        output.event(
+            "summary",
+            message=(
+                f"\nTotal Staked: {total_staked:.9f} TAO\n"
+                f"Ending TAO balance: {float(end_balance.tao):.9f}\n"
+                f"Balance difference (End - Start): {balance_diff:+.9f} TAO"
+            ),
+            start_tao=start_balance,
+            end_tao=end_balance,
+            diff=balance_diff
+        )
+
+        if signer is not None:
+            metrics = signer.metrics()
+            output.event(
+                "signing",
+                message=(
+                    f"Signed {metrics['signed']} extrinsics off the event loop: "
+                    f"avg {metrics['avg_signing_ms']:.2f} ms, max {metrics['max_signing_ms']:.2f} ms, "
+                    f"encoding {metrics['encoding_seconds']:.3f} s total"
+                ),
+                **metrics
+            )
+    finally:
+        if signer is not None:
+            signer.close()
+        if journal is not None:
+            journal.close()
+        output.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import logging
+
+from src.utils.output import configure_logging
+from src.utils.startup_profile import StartupProfile, add_profile_argument
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Unlock the coldkey once and sign for other local scripts over a Unix socket."
+    )
+    parser.add_argument(
+        "--socket",
+        type=str,
+        default=None,
+        help="Socket path (default: ~/.bittensor/agent/<BT_WALLET_NAME>.sock, or $WALLET_AGENT_SOCKET)"
+    )
+    add_profile_argument(parser)
+    return parser.parse_args()
+
+
+async def main(args):
+    configure_logging()
+    profile = StartupProfile(args.profile_startup)
+    with profile.phase("bittensor + src"):
+        import os
+        from src.shared.wallet_agent import WalletAgent
+        from src.utils.get_my_wallet import get_my_wallet
+    profile.report()
+
+    # The only place the keyfile is decrypted
+    my_wallet = get_my_wallet(unlock=True, use_agent=False)
+    agent = WalletAgent(my_wallet, socket_path=args.socket or os.getenv("WALLET_AGENT_SOCKET"))
+    try:
+        await agent.serve_forever()
+    finally:
+        logging.info(f"[WalletAgent] Stopped after {agent.signed} signature(s).")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main(parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,193 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import bittensor
+from bittensor import AsyncSubtensor
+
+from src.shared.dtao_helper import DTAOHelper
+from src.shared.subnet_staker import SubnetStaker
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Allocation key applying to every hotkey without its own table
+DEFAULT_ALLOCATION = "default"
+
+
+def normalize_allocation(allocation: Dict[int, float]) -> Dict[int, float]:
+    total = sum(weight for weight in allocation.values() if weight > 0)
+    if total <= 0:
+        raise ValueError(f"Allocation {allocation} has no positive weight.")
+    return {int(netuid): weight / total for netuid, weight in allocation.items() if weight > 0}
+
+
+def load_allocations(path: str) -> Dict[str, Dict[int, float]]:
+    """
+    Reads an allocation table from JSON:
+
+        {"default": {"1": 0.5, "18": 0.5}, "hotkeys": {"5F...": {"277": 1.0}}}
+
+    and returns {DEFAULT_ALLOCATION or hotkey: {netuid: weight}} with weights normalized.
+    """
+    with open(path, "r") as f:
+        return parse_allocations(json.load(f))
+
+
+def parse_allocations(raw: dict) -> Dict[str, Dict[int, float]]:
+    """
+    Same as `load_allocations`, from an already decoded table.
+    """
+    allocations = {}
+    if "default" in raw:
+        allocations[DEFAULT_ALLOCATION] = normalize_allocation({int(k): float(v) for k, v in raw["default"].items()})
+    for hotkey, allocation in raw.get("hotkeys", {}).items():
+        allocations[hotkey] = normalize_allocation({int(k): float(v) for k, v in allocation.items()})
+    return allocations
+
+
+class DividendHarvester:
+    """
+    Reinvests root (netuid 0) dividends from many validator hotkeys at once.
+
+    Every block, one stake-info query for the coldkey gives the root stake
+    delegated to each hotkey, and one events read gives the stake the coldkey
+    added, removed or moved itself. A hotkey's dividend is the root stake
+    change those events do not explain, so manual stakes and unstakes are never
+    counted as dividends. Blocks skipped between two polls have their events
+    read too (up to `max_catch_up_blocks`). If those events cannot be read
+    in full, no dividends are attributed for the poll and the current stakes
+    become the new baseline.
+
+    Hotkeys whose pending dividend reached `min_dividends` are reinvested
+    together: their amounts are split by the hotkey's allocation (or the
+    default one) and bought in one batch extrinsic.
+    """
+
+    def __init__(
+        self,
+        wallet: bittensor.wallet,
+        subtensor: AsyncSubtensor,
+        validator_hotkeys: List[str],
+        allocations: Dict[str, Dict[int, float]],
+        staker: Optional[SubnetStaker] = None,
+        min_dividends: float = 0.01,
+        max_catch_up_blocks: int = 50
+    ):
+        missing = [hk for hk in validator_hotkeys if hk not in allocations and DEFAULT_ALLOCATION not in allocations]
+        if missing:
+            raise ValueError(f"No allocation (and no default allocation) for hotkeys: {missing}")
+
+        self.wallet = wallet
+        self.coldkey = wallet.coldkeypub.ss58_address
+        self.helper = DTAOHelper(subtensor)
+        self.staker = staker if staker is not None else SubnetStaker(wallet, subtensor)
+        self.validator_hotkeys = list(dict.fromkeys(validator_hotkeys))
+        self.allocations = {key: normalize_allocation(allocation) for key, allocation in allocations.items()}
+        self.min_dividends = min_dividends
+        self.max_catch_up_blocks = max_catch_up_blocks
+        self.subtensor = subtensor
+        # Root stake per hotkey at `last_block`, and dividends not reinvested yet
+        self.last_block: Optional[int] = None
+        self.root_stakes: Dict[str, bittensor.Balance] = {}
+        self.pending: Dict[str, bittensor.Balance] = {
+            hotkey: bittensor.Balance.from_tao(0) for hotkey in self.validator_hotkeys
+        }
+
+    def allocation_for(self, hotkey: str) -> Dict[int, float]:
+        return self.allocations.get(hotkey) or self.allocations[DEFAULT_ALLOCATION]
+
+    def _root_stakes(self, stake_infos) -> Dict[str, bittensor.Balance]:
+        stakes = {hotkey: bittensor.Balance.from_tao(0) for hotkey in self.validator_hotkeys}
+        for stake_info in stake_infos.get(self.coldkey, []):
+            if stake_info.netuid == 0 and stake_info.hotkey_ss58 in stakes:
+                stakes[stake_info.hotkey_ss58] += stake_info.stake
+        return stakes
+
+    async def manual_root_changes(self, from_block: int, to_block: int) -> Dict[str, bittensor.Balance]:
+        """
+        Net root stake each hotkey gained from the coldkey's own stake events
+        in blocks from_block..to_block (inclusive).
+        """
+        changes = {hotkey: bittensor.Balance.from_tao(0) for hotkey in self.validator_hotkeys}
+        per_block = await asyncio.gather(*[
+            self.helper.get_stake_events(block, coldkey_ss58=self.coldkey, hotkeys=self.validator_hotkeys)
+            for block in range(from_block, to_block + 1)
+        ])
+        for events in per_block:
+            for event in events:
+                if event.netuid == 0:
+                    changes[event.hotkey_ss58] += event.alpha
+        return changes
+
+    async def poll(self, block: Optional[int] = None) -> Dict[str, bittensor.Balance]:
+        """
+        Reads every hotkey's root stake and the blocks' stake events, and adds
+        this block's dividends to the pending amounts. Returns {hotkey: pending dividend}.
+        """
+        if block is None:
+            block = await self.subtensor.get_current_block()
+        if self.last_block is not None and block <= self.last_block:
+            return dict(self.pending)
+
+        catch_up = self.last_block is not None and block - self.last_block <= self.max_catch_up_blocks
+        if catch_up:
+            try:
+                stake_infos, manual = await asyncio.gather(
+                    self.helper.get_stake_info_for_coldkeys([self.coldkey], block=block),
+                    self.manual_root_changes(self.last_block + 1, block)
+                )
+            except ValueError as e:
+                # An unexplained stake change could be a manual stake; never reinvest it as dividends
+                logger.warning(f"[DividendHarvester] {e}; restarting from block {block} without attributing dividends.")
+                catch_up = False
+        elif self.last_block is not None:
+            logger.info(f"[DividendHarvester] {block - self.last_block} blocks since last poll; restarting from block {block}.")
+        if not catch_up:
+            stake_infos, manual = await self.helper.get_stake_info_for_coldkeys([self.coldkey], block=block), {}
+
+        stakes = self._root_stakes(stake_infos)
+        if catch_up:
+            for hotkey, stake in stakes.items():
+                dividend = stake - self.root_stakes[hotkey] - manual[hotkey]
+                if dividend > bittensor.Balance(0):
+                    self.pending[hotkey] += dividend
+        self.root_stakes = stakes
+        self.last_block = block
+        return dict(self.pending)
+
+    def plan(self) -> Dict[str, Dict[int, float]]:
+        """
+        {hotkey: {netuid: tao}} for every hotkey whose pending dividend reached the minimum.
+        """
+        return {
+            hotkey: {netuid: float(pending.tao) * weight for netuid, weight in self.allocation_for(hotkey).items()}
+            for hotkey, pending in self.pending.items()
+            if pending.tao > 0 and pending.tao >= self.min_dividends
+        }
+
+    async def reinvest(self):
+        """
+        Buys the planned amounts for every ready hotkey in one batch.
+        Returns (plan, {netuid: (old_alpha, new_alpha)}). The plan is empty when
+        nothing was ready; when the batch failed the plan is returned with empty
+        results and the dividends stay pending for the next attempt.
+        """
+        plan = self.plan()
+        if not plan:
+            return {}, {}
+
+        tao_by_netuid = defaultdict(float)
+        for per_netuid in plan.values():
+            for netuid, tao in per_netuid.items():
+                tao_by_netuid[netuid] += tao
+
+        results = await self.staker.buy_alpha_batch(dict(tao_by_netuid))
+        if not results:
+            return plan, {}
+
+        for hotkey in plan:
+            self.pending[hotkey] = bittensor.Balance.from_tao(0)
+        return plan, results
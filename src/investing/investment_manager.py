@@ -1,19 +1,48 @@
 import asyncio
-from typing import Dict, List
+from typing import Dict, List, Optional
 import bittensor
 from bittensor import AsyncSubtensor
-from tabulate import tabulate
-from colorama import Fore, Style
 from src.shared.subnet_staker import SubnetStaker
 from src.shared.dtao_helper import DTAOHelper
-from src.utils.colors import color_diff, color_value
+from src.shared.dca_journal import DcaJournal
+from src.shared.extrinsic_signer import ExtrinsicSigner
+from src.shared.trade_ledger import TradeLedger
+from src.utils.output import Output
+
+
+def trade_row(netuid: int, old_stake, new_stake, alpha_diff: float, price, action: str) -> dict:
+    """
+    One executed stake/unstake as an output row (Balances become floats when rendered).
+    """
+    return {
+        "netuid": netuid,
+        "old_alpha": old_stake,
+        "new_alpha": new_stake,
+        "alpha_diff": alpha_diff,
+        "price": price,
+        "action": action,
+    }
 
 
 class InvestmentManager:
-    def __init__(self, wallet: bittensor.wallet, subtensor: AsyncSubtensor):
+    def __init__(
+        self,
+        wallet: bittensor.wallet,
+        subtensor: AsyncSubtensor,
+        ledger: Optional[TradeLedger] = None,
+        signer: Optional[ExtrinsicSigner] = None,
+        output: Optional[Output] = None,
+        journal: Optional[DcaJournal] = None
+    ):
         self.wallet = wallet
         self.subtensor = subtensor
-        self.staker = SubnetStaker(wallet=self.wallet, subtensor=self.subtensor)
+        # Colored tables unless the caller asks for JSONL records
+        self.output = output if output is not None else Output()
+        # With a journal, `dca` survives a crash: every stake is journaled and a restart resumes the plan
+        self.journal = journal
+        self.staker = SubnetStaker(
+            wallet=self.wallet, subtensor=self.subtensor, ledger=ledger, signer=signer, journal=journal
+        )
         self.helper = DTAOHelper(subtensor=subtensor)
 
     async def dca(
@@ -28,17 +57,50 @@ class InvestmentManager:
         stake_info: Dict[int, bittensor.Balance] = {}
         current_spent = 0.0
         iterations = 0
+        # Netuids already staked in the iteration a crash interrupted
+        staked_netuids = set()
+
+        if self.journal is not None:
+            params = {
+                "strategy": "dca",
+                "coldkey": self.wallet.coldkeypub.ss58_address,
+                "netuids": list(target_netuids),
+                "total": total_stake,
+                "increment": increment
+            }
+            progress = await self.journal.resume(params, self.staker.account_next_index, self.staker.extrinsic_outcomes)
+            if progress is None:
+                self.journal.start(params)
+            else:
+                # The interrupted iteration is finished first, without the subnets that already landed in it
+                iterations = progress["iteration"]
+                current_spent = progress["spent"] + progress["partial"]
+                staked_netuids = set(progress["staked_netuids"])
+                stake_info = {netuid: bittensor.Balance.from_tao(alpha) for netuid, alpha in progress["alpha"].items()}
+                self.output.event(
+                    "dca_resume",
+                    message=f"Resuming DCA from the journal after iteration #{iterations} (Spent so far: {current_spent:.9f}/{total_stake:.9f})",
+                    iteration=iterations,
+                    spent=current_spent,
+                    total=total_stake
+                )
 
         while current_spent < total_stake:
             iterations += 1
-            table_rows = []
-            iteration_header = f"DCA Iteration #{iterations} (Spending so far: {current_spent:.9f}/{total_stake:.9f})"
-            print(f"{Fore.YELLOW}{iteration_header}{Style.RESET_ALL}")
+            self.output.event(
+                "dca_iteration",
+                message=f"DCA Iteration #{iterations} (Spending so far: {current_spent:.9f}/{total_stake:.9f})",
+                iteration=iterations,
+                spent=current_spent,
+                total=total_stake
+            )
 
             tasks = []
             for netuid in target_netuids:
                 if current_spent >= total_stake:
                     break
+                if netuid in staked_netuids:
+                    continue
                 old_stake = stake_info.get(netuid, bittensor.Balance.from_tao(0))
                 tasks.append(asyncio.create_task(
                     self._stake_and_fetch(netuid, increment, old_stake)
@@ -46,40 +108,32 @@ class InvestmentManager:
                 current_spent += increment
 
             results = await asyncio.gather(*tasks)
+            staked_netuids = set()
 
+            rows = []
             for row in results:
                 # row = (netuid, old_stake, new_stake, alpha_diff, price)
                 netuid, old_stake, new_stake, alpha_diff, price = row
                 stake_info[netuid] = new_stake
-
-                table_rows.append([
-                    netuid,
-                    f"{float(old_stake.tao):.9f}",
-                    color_value(float(new_stake.tao), decimals=9),
-                    color_diff(alpha_diff),
-                    f"{float(price):.9f}",
-                    "Staked"
-                ])
-
-            if table_rows:
-                headers = [
-                    "NetUID",
-                    "Old Alpha",
-                    "New Alpha",
-                    "Alpha Diff",
-                    "Price",
-                    "Action"
-                ]
-                print(tabulate(table_rows, headers=headers, tablefmt="fancy_grid"))
+                rows.append(trade_row(netuid, old_stake, new_stake, alpha_diff, price, "Staked"))
+            if rows:
+                self.output.event("stakes", rows=rows, iteration=iterations)
 
             tao_balance = await self.helper.get_balance(address=self.wallet.coldkeypub.ss58_address)
-            print(
-                f"Wallet TAO Balance after iteration #{iterations}: "
-                f"{color_value(float(tao_balance.tao), decimals=9)}\n"
+            self.output.event(
+                "balance",
+                message=f"Wallet TAO Balance after iteration #{iterations}: {float(tao_balance.tao):.9f}\n",
+                iteration=iterations,
+                tao=tao_balance
             )
 
+            if self.journal is not None:
+                self.journal.checkpoint(iterations, current_spent, 0.0, stake_info)
+
             await self.staker.subtensor.wait_for_block()
 
+        if self.journal is not None:
+            self.journal.finish()
         return stake_info
 
     async def _stake_and_fetch(
@@ -116,9 +170,13 @@ class InvestmentManager:
         for netuid in subnets_and_percentages:
             alpha_per_subnet[netuid] = await self.staker.get_alpha_balance(netuid)
 
-        print("Subnet Stakes (before selling):")
-        for netuid, alpha in alpha_per_subnet.items():
-            print(f"  NetUID {netuid}: {alpha}")
+        self.output.event(
+            "sell_start",
+            message="Subnet Stakes (before selling):\n" + "\n".join(
+                f"  NetUID {netuid}: {alpha}" for netuid, alpha in alpha_per_subnet.items()
+            ),
+            alpha={netuid: alpha for netuid, alpha in alpha_per_subnet.items()}
+        )
 
         # How much alpha each netuid wants to keep after all sells
         # (i.e. total alpha minus the portion to sell)
@@ -133,9 +191,7 @@ class InvestmentManager:
 
         while True:
             iteration += 1
-            table_rows = []
-            iteration_header = f"Sell DCA Iteration #{iteration}"
-            print(f"{Fore.MAGENTA}{iteration_header}{Style.RESET_ALL}")
+            self.output.event("sell_iteration", message=f"Sell DCA Iteration #{iteration}", iteration=iteration)
 
             # Update alpha balances
             for netuid in subnets_and_percentages:
@@ -168,41 +224,31 @@ class InvestmentManager:
 
             # If no tasks, we are done
             if not tasks:
-                print("All subnets have reached or are below their target alpha. Stopping.\n")
+                self.output.event(
+                    "sell_done",
+                    message="All subnets have reached or are below their target alpha. Stopping.\n",
+                    iteration=iteration
+                )
                 break
 
             results = await asyncio.gather(*tasks)
 
+            rows = []
             for row in results:
                 # row = (netuid, old_stake, new_stake, alpha_diff, price)
                 netuid, old_stake, new_stake, alpha_diff, price = row
                 stake_info[netuid] = new_stake
                 alpha_per_subnet[netuid] = new_stake
-
-                table_rows.append([
-                    netuid,
-                    f"{float(old_stake.tao):.9f}",
-                    color_value(float(new_stake.tao), decimals=9),
-                    color_diff(alpha_diff),
-                    f"{float(price):.9f}",
-                    "Unstaked"
-                ])
-
-            if table_rows:
-                headers = [
-                    "NetUID",
-                    "Old Alpha",
-                    "New Alpha",
-                    "Alpha Diff",
-                    "Price",
-                    "Action"
-                ]
-                print(tabulate(table_rows, headers=headers, tablefmt="fancy_grid"))
+                rows.append(trade_row(netuid, old_stake, new_stake, alpha_diff, price, "Unstaked"))
+            if rows:
+                self.output.event("unstakes", rows=rows, iteration=iteration)
 
             tao_balance = await self.helper.get_balance(address=self.wallet.coldkeypub.ss58_address)
-            print(
-                f"Wallet TAO Balance after iteration #{iteration}: "
-                f"{color_value(float(tao_balance.tao), decimals=9)}\n"
+            self.output.event(
+                "balance",
+                message=f"Wallet TAO Balance after iteration #{iteration}: {float(tao_balance.tao):.9f}\n",
+                iteration=iteration,
+                tao=tao_balance
             )
 
             # Wait for the next block before the next iteration
@@ -0,0 +1,274 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import bittensor
+from bittensor import AsyncSubtensor
+
+from src.investing.strategy_daemon import StrategyDaemon, load_wallets
+from src.shared.block_clock import BlockClock
+from src.utils.output import Output, configure_logging, make_output
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Strategies without a "wallet" entry
+DEFAULT_WALLET = "default"
+
+
+def shard_strategies(config: Dict[str, Any], processes: int) -> List[Dict[str, Any]]:
+    """
+    Splits config["strategies"] into at most `processes` worker configs.
+    All strategies of one wallet stay in the same worker, so its nonces are
+    handed out by a single NonceManager; wallets are placed largest first on
+    the least loaded worker.
+    """
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for strategy in config.get("strategies", []):
+        groups.setdefault(strategy.get("wallet", DEFAULT_WALLET), []).append(strategy)
+
+    shards: List[List[Dict[str, Any]]] = [[] for _ in range(max(1, processes))]
+    for _, strategies in sorted(groups.items(), key=lambda item: -len(item[1])):
+        shard = min(shards, key=len)
+        shard.extend(strategies)
+    return [dict(config, strategies=strategies) for strategies in shards if strategies]
+
+
+def _compact(result: Any) -> Any:
+    """
+    Strategy results travel back as plain data: {netuid: rao} instead of Balances.
+    """
+    if isinstance(result, Exception):
+        return f"{type(result).__name__}: {result}"
+    if isinstance(result, dict):
+        return {int(netuid): int(balance.rao) for netuid, balance in result.items() if isinstance(balance, bittensor.Balance)}
+    return None
+
+
+def _read_pipe(conn, inbox: asyncio.Queue, tag: Any = None):
+    """
+    Event-loop reader callback: moves every pending message from `conn` into
+    `inbox` (as (tag, message) when tagged). A closed pipe yields message None.
+    """
+    try:
+        while conn.poll():
+            message = conn.recv()
+            inbox.put_nowait(message if tag is None else (tag, message))
+    except (EOFError, OSError):
+        asyncio.get_running_loop().remove_reader(conn.fileno())
+        inbox.put_nowait(None if tag is None else (tag, None))
+
+
+def _send(conn, message: Tuple[str, Any, Any]):
+    try:
+        conn.send(message)
+    except (BrokenPipeError, OSError):
+        pass
+
+
+class PipeSink:
+    """
+    Output sink of a worker: hands each record to the parent, which alone
+    writes to the real sinks, so workers never share stdout.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def emit(self, record: Dict[str, Any], message: Optional[str] = None):
+        _send(self.conn, ("record", message, record))
+
+    def close(self):
+        pass
+
+
+async def _worker(worker_id: int, config: Dict[str, Any], conn):
+    loop = asyncio.get_running_loop()
+    inbox: asyncio.Queue = asyncio.Queue()
+    loop.add_reader(conn.fileno(), _read_pipe, conn, inbox)
+
+    strategies = config["strategies"]
+    wallets = load_wallets(config, sorted({s["wallet"] for s in strategies if "wallet" in s}))
+    default_wallet = None
+    if any("wallet" not in s for s in strategies):
+        from src.utils.get_my_wallet import get_my_wallet
+        default_wallet = get_my_wallet(unlock=True)
+
+    clock = BlockClock(None, follow=False)
+    daemon = StrategyDaemon(
+        config,
+        default_wallet,
+        wallets=wallets,
+        clock=clock,
+        output=Output([PipeSink(conn)]),
+        on_finished=lambda name, result: _send(
+            conn, ("failed" if isinstance(result, Exception) else "result", name, _compact(result))
+        )
+    )
+    run_task = asyncio.create_task(daemon.run())
+    _send(conn, ("started", worker_id, os.getpid()))
+
+    try:
+        while not run_task.done():
+            get_message = asyncio.create_task(inbox.get())
+            await asyncio.wait({run_task, get_message}, return_when=asyncio.FIRST_COMPLETED)
+            if not get_message.done():
+                get_message.cancel()
+                break
+
+            message = get_message.result()
+            if message is None or message[0] == "stop":
+                run_task.cancel()
+                break
+            if message[0] == "block":
+                await clock.advance(message[1])
+        try:
+            await run_task
+        except asyncio.CancelledError:
+            pass
+    finally:
+        # The parent sees the worker exit when the pipe closes
+        loop.remove_reader(conn.fileno())
+
+
+def _worker_main(worker_id: int, config: Dict[str, Any], conn):
+    # A spawned worker starts with unconfigured logging
+    configure_logging()
+    try:
+        asyncio.run(_worker(worker_id, config, conn))
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        # E.g. a wallet that cannot be unlocked: no strategy of this worker ever started.
+        # A None name stands for every strategy of the worker that has not reported yet.
+        _send(conn, ("failed", None, f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+class ShardedRunner:
+    """
+    Runs the strategy daemon's config across several worker processes so the
+    Python-side work (signing, Balance arithmetic, SCALE/JSON decoding) of
+    hundreds of wallets uses every core instead of one.
+
+    The parent owns the only block-head subscription and broadcasts each new
+    block to the workers over pipes; every worker runs a StrategyDaemon with a
+    clock fed from that pipe (plus its own small connection pool) and sends
+    back compact ("result" | "failed", name, payload) messages. Progress
+    records come back as ("record", message, record) too, and only the
+    parent writes them to the config's "output", one whole record at a time.
+    Workers are spawned rather than forked, since a forked child would inherit
+    the parent's event loop and open websockets. A worker that exits without
+    reporting some of its strategies gets them marked as failed.
+    """
+
+    def __init__(self, config: Dict[str, Any], processes: Optional[int] = None):
+        self.config = config
+        self.processes = processes or os.cpu_count() or 1
+        self.shards = shard_strategies(config, self.processes)
+        self.results: Dict[str, Any] = {}
+        self._workers: List[Tuple[multiprocessing.Process, Any]] = []
+        self._live: Dict[int, Any] = {}
+        self._worker_errors: Dict[int, str] = {}
+        self.output = make_output(config.get("output", "jsonl"), config.get("output_file"))
+
+    async def _broadcast(self, block: int):
+        for worker_id, conn in list(self._live.items()):
+            try:
+                conn.send(("block", block))
+            except (BrokenPipeError, OSError):
+                self._live.pop(worker_id, None)
+
+    def _on_message(self, worker_id: int, message: Optional[Tuple[str, Any, Any]]):
+        kind, key, payload = message if message is not None else ("exit", worker_id, None)
+        if kind == "record":
+            self.output.emit(payload, key)
+        elif kind == "result":
+            self.results[key] = {
+                netuid: bittensor.Balance.from_rao(rao).set_unit(netuid) for netuid, rao in (payload or {}).items()
+            }
+            logger.info(f"[ShardedRunner] Strategy '{key}' finished in worker {worker_id}.")
+        elif kind == "failed" and key is None:
+            self._worker_errors[worker_id] = payload
+            logger.error(f"[ShardedRunner] Worker {worker_id} failed: {payload}")
+        elif kind == "failed":
+            self.results[key] = RuntimeError(payload)
+            logger.error(f"[ShardedRunner] Strategy '{key}' failed in worker {worker_id}: {payload}")
+        elif kind == "started":
+            logger.info(f"[ShardedRunner] Worker {worker_id} running as pid {payload}.")
+        elif kind == "exit":
+            self._live.pop(worker_id, None)
+            self._fail_unreported(worker_id)
+
+    def _fail_unreported(self, worker_id: int):
+        error = self._worker_errors.get(worker_id, f"worker {worker_id} exited before the strategy finished")
+        for strategy in self.shards[worker_id]["strategies"]:
+            if strategy["name"] not in self.results:
+                self.results[strategy["name"]] = RuntimeError(error)
+                logger.error(f"[ShardedRunner] Strategy '{strategy['name']}' failed in worker {worker_id}: {error}")
+
+    def _start_workers(self, inbox: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        context = multiprocessing.get_context("spawn")
+        for worker_id, shard in enumerate(self.shards):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_worker_main,
+                args=(worker_id, shard, child_conn),
+                name=f"strategy-worker-{worker_id}",
+                daemon=True
+            )
+            process.start()
+            child_conn.close()
+            self._workers.append((process, parent_conn))
+            self._live[worker_id] = parent_conn
+            loop.add_reader(parent_conn.fileno(), _read_pipe, parent_conn, inbox, worker_id)
+
+    async def _stop_workers(self, timeout: float = 10.0):
+        loop = asyncio.get_running_loop()
+        for process, conn in self._workers:
+            try:
+                loop.remove_reader(conn.fileno())
+                conn.send(("stop", None))
+            except (BrokenPipeError, OSError, ValueError):
+                pass
+        for process, conn in self._workers:
+            await asyncio.to_thread(process.join, timeout)
+            if process.is_alive():
+                process.terminate()
+            conn.close()
+        self._workers = []
+        self._live = {}
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Starts one worker per shard, feeds them blocks until every worker has
+        exited and returns {name: {netuid: Balance} or exception}.
+        """
+        if not self.shards:
+            logger.info("[ShardedRunner] No strategies configured.")
+            self.output.close()
+            return {}
+
+        logger.info(f"[ShardedRunner] {sum(len(s['strategies']) for s in self.shards)} strategies on {len(self.shards)} worker(s).")
+        inbox: asyncio.Queue = asyncio.Queue()
+        subtensor = await AsyncSubtensor(network=self.config.get("network")).initialize()
+        clock = BlockClock(subtensor)
+        clock.subscribe(self._broadcast)
+        try:
+            self._start_workers(inbox)
+            await self._broadcast(await clock.start())
+            while self._live:
+                worker_id, message = await inbox.get()
+                self._on_message(worker_id, message)
+        finally:
+            await clock.stop()
+            await self._stop_workers()
+            await subtensor.close()
+            self.output.close()
+        for worker_id in range(len(self.shards)):
+            self._fail_unreported(worker_id)
+        return self.results
@@ -0,0 +1,260 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import bittensor
+
+from src.investing.dividend_harvester import DividendHarvester, parse_allocations
+from src.investing.investment_manager import InvestmentManager
+from src.investing.tao_n import TaoN
+from src.shared.block_clock import BlockClock
+from src.shared.nonce_manager import NonceManager
+from src.shared.shared_subtensor import SharedSubtensor
+from src.shared.stake_info_cache import StakeInfoCache
+from src.shared.subnet_staker import SubnetStaker
+from src.shared.subtensor_pool import SubtensorPool
+from src.shared.wallet_agent import agent_wallet
+from src.shared.trade_ledger import TradeLedger
+from src.utils.output import Output, make_output
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def load_config(path: str) -> Dict[str, Any]:
+    """
+    Reads the daemon config (JSON):
+
+        {
+          "network": "finney",
+          "pool_size": 4,
+          "ledger": "data/trades.sqlite",
+          "output": "jsonl",
+          "wallets": {"alice": {"name": "alice", "hotkey": "default", "password_env": "ALICE_COLDKEY_PASSWORD"}},
+          "strategies": [
+            {"name": "dca-core", "type": "dca", "netuids": [1, 18], "increment": 0.01, "total": 1.0},
+            {"name": "trim-5", "type": "dca_sell", "subnets_and_percentages": {"5": 0.5}, "sell_percentage": 0.05},
+            {"name": "tao16", "type": "tao_n", "n": 16, "total": 1.0, "days": 1.0},
+            {"name": "root", "type": "root_dividends", "validator_hotkeys": ["5F..."],
+             "min_dividends": 0.01, "allocations": {"default": {"1": 0.5, "18": 0.5}}},
+            {"name": "alice-dca", "type": "dca", "wallet": "alice", "netuids": [5], "increment": 0.01, "total": 0.5}
+          ]
+        }
+
+    Strategies without "wallet" use the wallet from BT_WALLET_NAME / BT_HOTKEY_NAME.
+    Progress is written as JSONL records on stdout ("output": "table" for
+    tables, "output_file" to also append the records to a file).
+    """
+    with open(path, "r") as f:
+        config = json.load(f)
+
+    if config.get("output", "jsonl") not in ("jsonl", "table"):
+        raise ValueError(f"Unknown output {config['output']!r}; expected 'jsonl' or 'table'")
+    strategies = config.get("strategies", [])
+    for i, strategy in enumerate(strategies):
+        if strategy.get("type") not in RUNNERS:
+            raise ValueError(f"Strategy #{i} has unknown type {strategy.get('type')!r}; expected one of {sorted(RUNNERS)}")
+        strategy.setdefault("name", f"{strategy['type']}-{i}")
+        if "wallet" in strategy and strategy["wallet"] not in config.get("wallets", {}):
+            raise ValueError(f"Strategy '{strategy['name']}' uses unknown wallet {strategy['wallet']!r}")
+    names = [strategy["name"] for strategy in strategies]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Strategy names must be unique: {names}")
+    return config
+
+
+def load_wallets(config: Dict[str, Any], names: Optional[List[str]] = None) -> Dict[str, bittensor.wallet]:
+    """
+    Opens and unlocks the named wallets from config["wallets"] (all of them by
+    default). A wallet whose agent is running signs through it; otherwise the
+    coldkey password is read from the environment variable given by
+    "password_env" (default COLDKEY_PASSWORD), never from the config itself.
+    """
+    specs = config.get("wallets", {})
+    wallets = {}
+    for name in (names if names is not None else list(specs)):
+        spec = specs[name]
+        wallet = bittensor.wallet(name=spec.get("name", name), hotkey=spec.get("hotkey"), path=spec.get("path"))
+        served = agent_wallet(wallet, spec.get("agent_socket"))
+        if served is not None:
+            wallets[name] = served
+            continue
+        password = os.getenv(spec.get("password_env", "COLDKEY_PASSWORD"))
+        wallet.coldkey_file.save_password_to_env(password)
+        wallet.unlock_coldkey()
+        wallets[name] = wallet
+    return wallets
+
+
+async def _run_dca(daemon: "StrategyDaemon", wallet: bittensor.wallet, params: Dict[str, Any]):
+    manager = InvestmentManager(wallet, daemon.subtensor, ledger=daemon.ledger, output=daemon.output_for(params))
+    return await manager.dca(
+        target_netuids=[int(netuid) for netuid in params["netuids"]],
+        total_stake=float(params["total"]),
+        increment=float(params["increment"])
+    )
+
+
+async def _run_dca_sell(daemon: "StrategyDaemon", wallet: bittensor.wallet, params: Dict[str, Any]):
+    manager = InvestmentManager(wallet, daemon.subtensor, ledger=daemon.ledger, output=daemon.output_for(params))
+    return await manager.sell_dca(
+        subnets_and_percentages={int(k): float(v) for k, v in params["subnets_and_percentages"].items()},
+        dca_sell_percentage=float(params.get("sell_percentage", 0.05))
+    )
+
+
+async def _run_tao_n(daemon: "StrategyDaemon", wallet: bittensor.wallet, params: Dict[str, Any]):
+    n = int(params.get("n", 16))
+    tao_n = TaoN(
+        wallet=wallet,
+        subtensor=daemon.subtensor,
+        N=n,
+        ledger=daemon.ledger,
+        confirm=False,
+        output=daemon.output_for(params)
+    )
+    return await tao_n.dca_TaoN(total_tao=float(params.get("total", 1.0)), days=float(params.get("days", 1.0)), N=n)
+
+
+async def _run_root_dividends(daemon: "StrategyDaemon", wallet: bittensor.wallet, params: Dict[str, Any]):
+    allocations = parse_allocations(params.get("allocations") or {"default": {"1": 0.25, "277": 0.25, "18": 0.25, "5": 0.25}})
+
+    harvester = DividendHarvester(
+        wallet=wallet,
+        subtensor=daemon.subtensor,
+        validator_hotkeys=params["validator_hotkeys"],
+        allocations=allocations,
+        staker=SubnetStaker(wallet, daemon.subtensor, ledger=daemon.ledger),
+        min_dividends=float(params.get("min_dividends", 0.01))
+    )
+    output = daemon.output_for(params)
+    while True:
+        await daemon.subtensor.wait_for_block()
+        await harvester.poll(daemon.clock.block)
+        plan, results = await harvester.reinvest()
+        if plan and not results:
+            output.event(
+                "reinvest_failed",
+                message=f"[root_dividends] Reinvesting dividends of {len(plan)} hotkey(s) failed; retrying next block.",
+                block=daemon.clock.block,
+                hotkeys=sorted(plan)
+            )
+            continue
+        for hotkey, per_netuid in plan.items():
+            output.event(
+                "reinvested",
+                message=f"[root_dividends] Reinvested {sum(per_netuid.values()):.9f} TAO from {hotkey} into {sorted(per_netuid)}",
+                block=daemon.clock.block,
+                hotkey=hotkey,
+                netuids=per_netuid
+            )
+
+
+RUNNERS: Dict[str, Callable[["StrategyDaemon", bittensor.wallet, Dict[str, Any]], Awaitable[Any]]] = {
+    "dca": _run_dca,
+    "dca_sell": _run_dca_sell,
+    "tao_n": _run_tao_n,
+    "root_dividends": _run_root_dividends,
+}
+
+
+class StrategyDaemon:
+    """
+    Hosts any number of strategy instances in one asyncio process. They all
+    share one SubtensorPool, one BlockClock, one StakeInfoCache, one subnet
+    snapshot per block and one NonceManager (through a SharedSubtensor), and
+    wallets are unlocked once, so five strategies cost about the chain load
+    of one. A strategy that fails is reported without stopping the others.
+
+    `wallet` serves strategies without a "wallet" entry, `wallets` the named
+    ones. Pass a `clock` to drive blocks from outside (see ShardedRunner);
+    `on_finished(name, result)` is called as each strategy ends. Records go
+    to `output`, or to the sinks named by the config's "output" and
+    "output_file".
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        wallet: Optional[bittensor.wallet],
+        wallets: Optional[Dict[str, bittensor.wallet]] = None,
+        clock: Optional[BlockClock] = None,
+        on_finished: Optional[Callable[[str, Any], None]] = None,
+        output: Optional[Output] = None
+    ):
+        self.config = config
+        self.wallet = wallet
+        self.wallets = wallets or {}
+        self.on_finished = on_finished
+        self.pool: Optional[SubtensorPool] = None
+        self.clock: Optional[BlockClock] = clock
+        self.subtensor: Optional[SharedSubtensor] = None
+        ledger_path = config.get("ledger", "data/trades.sqlite")
+        self.ledger = TradeLedger(ledger_path) if ledger_path else None
+        self.results: Dict[str, Any] = {}
+        self.output = output if output is not None else make_output(config.get("output", "jsonl"), config.get("output_file"))
+
+    def output_for(self, strategy: Dict[str, Any]):
+        return self.output.bind(strategy=strategy["name"])
+
+    async def start(self):
+        self.pool = await SubtensorPool(size=int(self.config.get("pool_size", 4)), network=self.config.get("network")).initialize()
+        if self.clock is None:
+            self.clock = BlockClock(self.pool.get())
+        stake_cache = StakeInfoCache(self.pool)
+        for wallet in [self.wallet, *self.wallets.values()]:
+            if wallet is not None:
+                stake_cache.register(wallet.coldkeypub.ss58_address)
+        self.clock.subscribe(stake_cache.refresh)
+        self.subtensor = SharedSubtensor(
+            self.pool, self.clock, stake_cache, NonceManager(),
+            signing_workers=int(self.config.get("signing_workers", 4))
+        )
+        block = await self.clock.start()
+        logger.info(f"[StrategyDaemon] Started at block {block} with {self.pool.size} connection(s).")
+
+    async def stop(self):
+        if self.clock is not None:
+            await self.clock.stop()
+        if self.pool is not None:
+            await self.pool.close()
+        self.output.close()
+
+    def wallet_for(self, strategy: Dict[str, Any]) -> bittensor.wallet:
+        wallet = self.wallets[strategy["wallet"]] if "wallet" in strategy else self.wallet
+        if wallet is None:
+            raise ValueError(f"No wallet available for strategy '{strategy['name']}'")
+        return wallet
+
+    async def _run_strategy(self, strategy: Dict[str, Any]):
+        name = strategy["name"]
+        logger.info(f"[StrategyDaemon] Starting strategy '{name}' ({strategy['type']}).")
+        try:
+            self.results[name] = await RUNNERS[strategy["type"]](self, self.wallet_for(strategy), strategy)
+            logger.info(f"[StrategyDaemon] Strategy '{name}' finished.")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.results[name] = e
+            logger.error(f"[StrategyDaemon] Strategy '{name}' failed: {e}")
+        if self.on_finished is not None:
+            self.on_finished(name, self.results[name])
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Runs every configured strategy until all of them finished (root
+        dividend harvesting runs until cancelled). Returns {name: result or exception}.
+        """
+        strategies: List[Dict[str, Any]] = self.config.get("strategies", [])
+        if not strategies:
+            logger.info("[StrategyDaemon] No strategies configured.")
+            return {}
+
+        await self.start()
+        try:
+            await asyncio.gather(*[self._run_strategy(strategy) for strategy in strategies])
+        finally:
+            await self.stop()
+        return self.results
@@ -1,12 +1,18 @@
 import bittensor
-from typing import Dict
+from typing import Dict, Optional
 import asyncio
-from tabulate import tabulate
-from colorama import Fore, Style
+import logging
 
 from bittensor import AsyncSubtensor
-from src.investing.investment_manager import InvestmentManager
-from src.utils.colors import color_diff, color_value
+from src.investing.investment_manager import InvestmentManager, trade_row
+from src.shared.dca_journal import DcaJournal
+from src.shared.extrinsic_signer import ExtrinsicSigner
+from src.shared.subnet_snapshot import SubnetSnapshot
+from src.shared.trade_ledger import TradeLedger
+from src.utils.output import Output
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
 
 
 class TaoN:
@@ -16,19 +22,32 @@ class TaoN:
         subtensor: AsyncSubtensor,
         N: int = 16,
         block_time_seconds: float = 12.0,
-        minimum_stake: float = 0.0001  # Example guard to prevent micropayment errors
+        minimum_stake: float = 0.0001,  # Example guard to prevent micropayment errors
+        ledger: Optional[TradeLedger] = None,
+        confirm: bool = True,
+        signer: Optional[ExtrinsicSigner] = None,
+        output: Optional[Output] = None,
+        journal: Optional[DcaJournal] = None
     ):
         """
         :param N: pick top N subnets by (price * alpha_out).
         :param block_time_seconds: approximate seconds between blocks (Bittensor ~12s).
         :param minimum_stake: skip subnets if daily stake portion is below this threshold.
+        :param ledger: optional TradeLedger that records every stake.
+        :param confirm: ask for confirmation on stdin before using the computed weights.
+        :param signer: optional ExtrinsicSigner that signs each block's stakes off the event loop.
+        :param output: where progress goes (colored tables by default, or JSONL records).
+        :param journal: optional DcaJournal; `dca_TaoN` then resumes an interrupted plan instead of restarting it.
         """
         self.wallet = wallet
         self.subtensor = subtensor
-        self.manager = InvestmentManager(wallet, subtensor)
+        self.manager = InvestmentManager(wallet, subtensor, ledger=ledger, signer=signer, output=output, journal=journal)
+        self.journal = journal
+        self.output = self.manager.output
         self.N = N
         self.block_time_seconds = block_time_seconds
         self.minimum_stake = minimum_stake
+        self.confirm = confirm
 
     async def get_top_N_emission_weights(self, N: int = None) -> Dict[int, float]:
         """
@@ -38,47 +57,41 @@ class TaoN:
         if N is None:
             N = self.N
 
-        subnets = await self.subtensor.all_subnets()
-        if not subnets:
+        snapshot = SubnetSnapshot.from_dynamic_info(await self.subtensor.all_subnets())
+        if not len(snapshot):
             return {}
 
-        print(
-            f"\n{Fore.GREEN}Explanation:{Style.RESET_ALL} "
-            f"Compute 'market cap' = price(TAO)*alpha_out(TAO). Then pick top {N} subnets, "
-            f"and weight them by their fraction of the sum of these market caps.\n"
-        )
-
-        info_list = []
-        for d in subnets:
-            mcap = float(d.price.tao) * float(d.alpha_out.tao)
-            info_list.append((d.netuid, float(d.price.tao), float(d.alpha_out.tao), mcap))
-
-        # Sort descending by market cap
-        info_list.sort(key=lambda x: x[3], reverse=True)
-        top_n = info_list[:N]
-
-        total_mcap = sum(x[3] for x in top_n)
+        # Top N by market cap, largest first, straight from the snapshot columns
+        top_n = snapshot.top_by_market_cap(N)
+        market_cap = snapshot.market_cap
+        total_mcap = float(market_cap[top_n].sum())
         if total_mcap <= 0:
             return {}
 
-        table_rows = []
+        rows = []
         weights = {}
-        for (netuid, price_val, alpha_out_val, mcap) in top_n:
-            weight = mcap / total_mcap
+        for netuid in top_n.tolist():
+            weight = float(market_cap[netuid]) / total_mcap
             weights[netuid] = weight
-            table_rows.append([
-                netuid,
-                f"{price_val:.9f}",
-                f"{alpha_out_val:.9f}",
-                f"{mcap:.9f}",
-                f"{weight:.6f}"
-            ])
-
-        headers = ["NetUID", "Price (TAO)", "Alpha Out (TAO)", "Market Cap", "Weight"]
-        print(tabulate(table_rows, headers=headers, tablefmt="fancy_grid"))
-
-        print(f"\nFinal Weights Dict (top {N}): {weights}\n")
-        input("Press Enter to proceed or Ctrl+C to cancel and inspect weights... ")
+            rows.append({
+                "netuid": netuid,
+                "price": float(snapshot.price[netuid]),
+                "alpha_out": float(snapshot.alpha_out[netuid]),
+                "market_cap": float(market_cap[netuid]),
+                "weight": weight,
+            })
+
+        self.output.event(
+            "weights",
+            message=(
+                f"\nExplanation: Compute 'market cap' = price(TAO)*alpha_out(TAO). Then pick top {N} subnets, "
+                f"and weight them by their fraction of the sum of these market caps.\n"
+            ),
+            rows=rows,
+            n=N
+        )
+        if self.confirm:
+            input("Press Enter to proceed or Ctrl+C to cancel and inspect weights... ")
 
         return weights
 
@@ -101,23 +114,24 @@ class TaoN:
             N = self.N
 
         start_balance = await self.manager.helper.get_balance(self.wallet.coldkeypub.ss58_address)
-        print(f"Starting TAO balance: {start_balance}")
-
-        print(
-            f"\nWill stake a total of {total_tao} TAO, spread evenly across ~{days} days. "
-            f"One iteration per block (~{self.block_time_seconds}s)."
+        self.output.event(
+            "dca_start",
+            message=(
+                f"Starting TAO balance: {start_balance}\n"
+                f"\nWill stake a total of {total_tao} TAO, spread evenly across ~{days} days. "
+                f"One iteration per block (~{self.block_time_seconds}s)."
+            ),
+            tao=start_balance,
+            total=total_tao,
+            days=days,
+            n=N
         )
 
         # Number of blocks in the specified days
         blocks_per_day = int((24 * 3600) / self.block_time_seconds)
         total_blocks = int(blocks_per_day * days)
         if total_blocks < 1:
-            print(f"Days={days} too small; no blocks to iterate. Aborting.")
-            return {}
-
-        weights = await self.get_top_N_emission_weights(N)
-        if not weights:
-            print("No subnets or zero total market cap. Aborting.")
+            logger.warning(f"Days={days} too small; no blocks to iterate. Aborting.")
             return {}
 
         # We will stake `stake_per_block` each block, plus leftover on final iteration
@@ -126,24 +140,81 @@ class TaoN:
 
         stake_info: Dict[int, bittensor.Balance] = {}
         spent_so_far = 0.0
+        first_block = 0
+        # Subnets (and their TAO) already staked in the block a crash interrupted
+        staked_netuids = set()
+        already_staked = 0.0
+
+        progress = None
+        if self.journal is not None:
+            params = {
+                "strategy": "tao_n",
+                "coldkey": self.wallet.coldkeypub.ss58_address,
+                "total": total_tao,
+                "days": days,
+                "n": N,
+                "block_time_seconds": self.block_time_seconds
+            }
+            progress = await self.journal.resume(
+                params, self.manager.staker.account_next_index, self.manager.staker.extrinsic_outcomes
+            )
 
-        for block_index in range(total_blocks):
+        if progress is not None:
+            # Keep the weights the plan started with
+            weights = {int(netuid): w for netuid, w in progress["plan"]["weights"].items()}
+            first_block = progress["iteration"]
+            spent_so_far = progress["spent"] + progress["partial"]
+            leftover = progress["leftover"]
+            stake_info = {netuid: bittensor.Balance.from_tao(alpha) for netuid, alpha in progress["alpha"].items()}
+            # The interrupted block is finished first, without the subnets that already landed in it
+            staked_netuids = set(progress["staked_netuids"])
+            already_staked = progress["partial"]
+            self.output.event(
+                "dca_resume",
+                message=(
+                    f"Resuming Tao{N} DCA from the journal at iteration #{first_block+1} / {total_blocks} "
+                    f"(Spent so far: {spent_so_far:.9f}/{total_tao:.9f})"
+                ),
+                iteration=first_block + 1,
+                iterations=total_blocks,
+                spent=spent_so_far,
+                total=total_tao
+            )
+        else:
+            weights = await self.get_top_N_emission_weights(N)
+            if not weights:
+                logger.warning("No subnets or zero total market cap. Aborting.")
+                return {}
+            if self.journal is not None:
+                self.journal.start(params, weights=weights)
+
+        for block_index in range(first_block, total_blocks):
             # For the last iteration, add leftover so we fully use total_tao
             if block_index == total_blocks - 1:
                 stake_to_spend = stake_per_block + leftover
             else:
                 stake_to_spend = stake_per_block
 
-            iteration_header = (
-                f"DCA Iteration #{block_index+1} / {total_blocks} "
-                f"(Spent so far: {spent_so_far:.9f}/{total_tao:.9f})"
+            self.output.event(
+                "dca_iteration",
+                message=(
+                    f"DCA Iteration #{block_index+1} / {total_blocks} "
+                    f"(Spent so far: {spent_so_far:.9f}/{total_tao:.9f})"
+                ),
+                iteration=block_index + 1,
+                iterations=total_blocks,
+                spent=spent_so_far,
+                total=total_tao
             )
-            print(f"{Fore.YELLOW}{iteration_header}{Style.RESET_ALL}")
 
+            # One all_subnets() call per iteration gives every price and owner hotkey
+            snapshot = SubnetSnapshot.from_dynamic_info(await self.subtensor.all_subnets())
             tasks = []
             allocated_this_block = 0.0
 
             for netuid, w in weights.items():
+                if netuid in staked_netuids:
+                    continue
                 portion = stake_to_spend * w
                 if portion < self.minimum_stake:
                     # Skip if portion is below the minimum stake threshold
@@ -159,42 +230,41 @@ class TaoN:
                 old_stake = stake_info.get(netuid, bittensor.Balance.from_tao(0))
                 tasks.append(
                     asyncio.create_task(
-                        self._stake_and_fetch(netuid, portion, old_stake)
+                        self._stake_and_fetch(netuid, portion, old_stake, snapshot)
                     )
                 )
                 allocated_this_block += portion
 
             # leftover from this block’s plan if we skip minuscule allocations
-            leftover_block = stake_to_spend - allocated_this_block
+            leftover_block = stake_to_spend - allocated_this_block - already_staked
             leftover += leftover_block
 
             # Perform all stakings in parallel
             results = await asyncio.gather(*tasks)
 
-            # Update stake_info and show a table of changes
-            table_rows = []
+            # Update stake_info and report the changes
+            rows = []
             for row in results:
                 netuid, old_stake, new_stake, alpha_diff, price = row
                 stake_info[netuid] = new_stake
-                table_rows.append([
-                    netuid,
-                    f"{float(old_stake.tao):.9f}",
-                    color_value(float(new_stake.tao), decimals=9),
-                    color_diff(alpha_diff),
-                    f"{float(price.tao):.9f}",
-                    "Staked"
-                ])
+                rows.append(trade_row(netuid, old_stake, new_stake, alpha_diff, price, "Staked"))
 
             spent_so_far += allocated_this_block
+            staked_netuids = set()
+            already_staked = 0.0
+
+            if rows:
+                self.output.event("stakes", rows=rows, iteration=block_index + 1)
 
-            if table_rows:
-                headers = ["NetUID", "Old Alpha", "New Alpha", "Alpha Diff", "Price", "Action"]
-                print(tabulate(table_rows, headers=headers, tablefmt="fancy_grid"))
+            if self.journal is not None:
+                self.journal.checkpoint(block_index + 1, spent_so_far, leftover, stake_info)
 
             tao_balance = await self.manager.helper.get_balance(self.wallet.coldkeypub.ss58_address)
-            print(
-                f"Wallet TAO Balance after iteration #{block_index+1}: "
-                f"{color_value(float(tao_balance.tao), decimals=9)}\n"
+            self.output.event(
+                "balance",
+                message=f"Wallet TAO Balance after iteration #{block_index+1}: {float(tao_balance.tao):.9f}\n",
+                iteration=block_index + 1,
+                tao=tao_balance
             )
 
             # Wait for the next block
@@ -202,12 +272,21 @@ class TaoN:
 
             # If we've basically staked the entire total already, we can stop early
             if spent_so_far >= total_tao - 1e-12:
-                print("We have staked the full allocation. Breaking early.\n")
+                logger.info("We have staked the full allocation. Breaking early.")
                 break
 
-        print(
-            f"Finished DCA over ~{days} days ({total_blocks} blocks). "
-            f"Final staked amount ~ {spent_so_far:.9f} / {total_tao:.9f}"
+        if self.journal is not None:
+            self.journal.finish()
+
+        self.output.event(
+            "dca_done",
+            message=(
+                f"Finished DCA over ~{days} days ({total_blocks} blocks). "
+                f"Final staked amount ~ {spent_so_far:.9f} / {total_tao:.9f}"
+            ),
+            spent=spent_so_far,
+            total=total_tao,
+            iterations=total_blocks
         )
         return stake_info
 
@@ -215,11 +294,12 @@ class TaoN:
         self,
         netuid: int,
         amount: float,
-        old_stake: bittensor.Balance
+        old_stake: bittensor.Balance,
+        snapshot: SubnetSnapshot
     ):
-        subnet_info = await self.subtensor.subnet(netuid)
+        hotkey = snapshot.owner_hotkey(netuid)
         # Actually call the chain to stake
-        await self.manager.staker.buy_alpha(netuid=netuid, tao_amount=amount)
-        new_stake = await self.manager.staker.get_alpha_balance(netuid)
+        await self.manager.staker.buy_alpha(netuid=netuid, tao_amount=amount, hotkey=hotkey)
+        new_stake = await self.manager.staker.get_alpha_balance(netuid, hotkey)
         alpha_diff = float(new_stake.tao) - float(old_stake.tao)
-        return netuid, old_stake, new_stake, alpha_diff, subnet_info.price
+        return netuid, old_stake, new_stake, alpha_diff, bittensor.Balance.from_tao(float(snapshot.price[netuid]))
@@ -1,8 +1,10 @@
+import html
 import logging
+import threading
 from abc import ABC, abstractmethod
 from typing import List
 
-from triggers import Alert
+from src.monitoring.triggers import Alert
 from src.shared.email_sender import EmailSender
 
 logger = logging.getLogger(__name__)
@@ -54,3 +56,69 @@ class EmailAction(Action):
         </html>
         """
         return html
+
+
+class EmailDigestAction(EmailAction):
+    """
+    Email action that groups alerts arriving within `window_seconds` into a
+    single digest message per recipient. The first alert of a window starts
+    a timer; when it fires, everything collected so far goes out together over
+    the sender's shared SMTP session. Call `flush()` on shutdown to send what
+    is still pending.
+    """
+
+    def __init__(self, email_sender: EmailSender, recipients: List[str], window_seconds: float = 30.0):
+        super().__init__(email_sender, recipients)
+        self.window_seconds = window_seconds
+        self._pending: List[Alert] = []
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def execute(self, alert: Alert) -> None:
+        with self._lock:
+            self._pending.append(alert)
+            if self._timer is None:
+                self._timer = threading.Timer(self.window_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        with self._lock:
+            alerts, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = None
+
+        if not alerts:
+            return
+
+        if len(alerts) == 1:
+            subject = alerts[0].title
+        else:
+            titles = sorted({a.title for a in alerts})
+            subject = f"{len(alerts)} alerts: {', '.join(titles)}"
+        logger.info(f"Sending digest of {len(alerts)} alert(s) to {', '.join(self.recipients)}")
+        self.email_sender.send_email(
+            subject=subject,
+            html_message=self._format_digest_body(alerts),
+            to_emails=self.recipients
+        )
+
+    def _format_digest_body(self, alerts: List[Alert]) -> str:
+        sections = "".join(
+            f"""
+            <h3>{html.escape(alert.title)}</h3>
+            <p>{html.escape(alert.message)}</p>
+            <ul>{"".join(f"<li><strong>{k}:</strong> {v}</li>" for k, v in alert.details.items())}</ul>
+            <p><em>Timestamp: {alert.timestamp}</em></p>
+            """
+            for alert in alerts
+        )
+        return f"""
+        <html>
+          <body>
+            <h2>{len(alerts)} alert(s)</h2>
+            {sections}
+          </body>
+        </html>
+        """
@@ -0,0 +1,122 @@
+import json
+import logging
+import os
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from src.monitoring.threshold_index import ABOVE, BELOW
+
+if TYPE_CHECKING:
+    from src.monitoring.triggers import Alert
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Entry layout, kept as a flat list so thousands of keys stay small in memory and on disk
+_ARMED, _LAST_FIRED, _THRESHOLD, _DIRECTION, _KEY = range(5)
+
+
+class AlertStateStore:
+    """
+    Remembers, per (trigger, alert key, threshold), whether an alert is armed,
+    so a condition that stays true notifies once instead of on every block.
+
+    - An armed condition fires, then disarms.
+    - It re-arms once the observed value moves back past the threshold by the
+      hysteresis band (or, without an observed value, once the condition is
+      no longer reported).
+    - `cooldown_seconds` is the minimum time between two notifications of the
+      same condition, even if it re-armed in between.
+
+    Only disarmed or cooling-down entries are stored, and the store is
+    persisted to a JSON file so restarts do not re-send every active alert.
+    """
+
+    def __init__(self, path: Optional[str] = "data/alert_state.json"):
+        self.path = path
+        self.entries: Dict[str, list] = {}
+        self._dirty = False
+        self.load()
+
+    @staticmethod
+    def _entry_id(trigger_id: str, alert: "Alert") -> str:
+        threshold = "" if alert.threshold is None else repr(float(alert.threshold))
+        return f"{trigger_id}|{alert.key}|{threshold}"
+
+    def filter(
+        self,
+        trigger_id: str,
+        alerts: List["Alert"],
+        observed: Optional[Dict[str, float]] = None,
+        hysteresis_pct: float = 0.0,
+        cooldown_seconds: float = 0.0,
+        now: Optional[float] = None
+    ) -> List["Alert"]:
+        """
+        Returns the subset of `alerts` that should notify now and updates the
+        state of every condition of `trigger_id`. `observed` maps alert keys
+        to their current values and drives the hysteresis re-arm.
+        """
+        now = time.time() if now is None else now
+        observed = observed or {}
+        firing = {self._entry_id(trigger_id, alert): alert for alert in alerts}
+        to_notify = []
+
+        for entry_id, alert in firing.items():
+            entry = self.entries.get(entry_id)
+            if entry is not None and not entry[_ARMED]:
+                continue
+            if entry is not None and now - entry[_LAST_FIRED] < cooldown_seconds:
+                continue
+            self.entries[entry_id] = [0, now, alert.threshold, alert.direction, alert.key]
+            self._dirty = True
+            to_notify.append(alert)
+
+        prefix = f"{trigger_id}|"
+        for entry_id in [e for e in self.entries if e.startswith(prefix) and e not in firing]:
+            entry = self.entries[entry_id]
+            if not entry[_ARMED] and self._cleared(entry, observed.get(entry[_KEY]), hysteresis_pct):
+                entry[_ARMED] = 1
+                self._dirty = True
+            if entry[_ARMED] and now - entry[_LAST_FIRED] >= cooldown_seconds:
+                # Armed and out of cooldown is the default state: no need to keep it
+                del self.entries[entry_id]
+                self._dirty = True
+
+        return to_notify
+
+    @staticmethod
+    def _cleared(entry: list, value: Optional[float], hysteresis_pct: float) -> bool:
+        threshold, direction = entry[_THRESHOLD], entry[_DIRECTION]
+        if value is None or threshold is None or direction is None:
+            return True
+        band = abs(threshold) * hysteresis_pct / 100.0
+        if direction == ABOVE:
+            return value < threshold - band
+        if direction == BELOW:
+            return value > threshold + band
+        return True
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"[AlertStateStore] Could not read {self.path} ({e}); starting with empty state.")
+            self.entries = {}
+
+    def save(self):
+        """
+        Writes the state atomically, only if it changed since the last save.
+        """
+        if not self.path or not self._dirty:
+            return
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+        self._dirty = False
@@ -0,0 +1,80 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from bittensor.core.chain_data import StakeInfo
+
+
+class BalanceTable:
+    """
+    Free TAO and per-subnet alpha of many coldkeys at one block, as NumPy
+    arrays: `tao[row]` and `alpha[row, netuid]` (summed over hotkeys), with
+    `staked[row, netuid]` marking positions that exist. Rows follow the order
+    of `coldkeys`. Triggers query it column-wise instead of looping over wallets.
+    """
+
+    def __init__(self, coldkeys: Iterable[str], block: Optional[int] = None, netuid_capacity: int = 0):
+        self.block = block
+        self.coldkeys: List[str] = list(dict.fromkeys(coldkeys))
+        self.rows: Dict[str, int] = {coldkey: row for row, coldkey in enumerate(self.coldkeys)}
+        self.tao = np.zeros(len(self.coldkeys), dtype=np.float64)
+        self.alpha = np.zeros((len(self.coldkeys), netuid_capacity), dtype=np.float64)
+        self.staked = np.zeros((len(self.coldkeys), netuid_capacity), dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.coldkeys)
+
+    def __contains__(self, coldkey: str) -> bool:
+        return coldkey in self.rows
+
+    def _ensure_netuid(self, netuid: int):
+        if netuid < self.alpha.shape[1]:
+            return
+        extra = netuid + 1 - self.alpha.shape[1]
+        self.alpha = np.hstack([self.alpha, np.zeros((len(self), extra))])
+        self.staked = np.hstack([self.staked, np.zeros((len(self), extra), dtype=bool)])
+
+    def set_tao(self, balances: Dict[str, float]):
+        for coldkey, balance in balances.items():
+            row = self.rows.get(coldkey)
+            if row is not None:
+                self.tao[row] = float(balance)
+
+    def set_stakes(self, stake_infos: Dict[str, List[StakeInfo]]):
+        for coldkey, infos in stake_infos.items():
+            row = self.rows.get(coldkey)
+            if row is None:
+                continue
+            self.alpha[row] = 0.0
+            self.staked[row] = False
+            for stake_info in infos:
+                self._ensure_netuid(stake_info.netuid)
+                self.alpha[row, stake_info.netuid] += float(stake_info.stake.tao)
+                self.staked[row, stake_info.netuid] = True
+
+    def tao_of(self, coldkey: str) -> float:
+        return float(self.tao[self.rows[coldkey]])
+
+    def alpha_of(self, coldkey: str) -> Dict[int, float]:
+        """
+        {netuid: alpha} for every position of `coldkey`.
+        """
+        row = self.rows[coldkey]
+        return {int(netuid): float(self.alpha[row, netuid]) for netuid in np.flatnonzero(self.staked[row])}
+
+    def tao_below(self, threshold: float) -> List[Tuple[str, float]]:
+        return [(self.coldkeys[row], float(self.tao[row])) for row in np.flatnonzero(self.tao < threshold)]
+
+    def alpha_below(self, threshold: float, netuids: Optional[Iterable[int]] = None) -> List[Tuple[str, int, float]]:
+        """
+        (coldkey, netuid, alpha) for every existing position under `threshold`,
+        optionally restricted to some netuids.
+        """
+        mask = self.staked & (self.alpha < threshold)
+        if netuids is not None:
+            columns = np.zeros(mask.shape[1], dtype=bool)
+            columns[[n for n in netuids if 0 <= n < mask.shape[1]]] = True
+            mask &= columns
+        return [
+            (self.coldkeys[row], int(netuid), float(self.alpha[row, netuid]))
+            for row, netuid in zip(*np.nonzero(mask))
+        ]
@@ -0,0 +1,124 @@
+import asyncio
+import inspect
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from src.monitoring.actions import Action
+    from src.monitoring.triggers import Alert
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+DROP_NEWEST = "drop_newest"
+DROP_OLDEST = "drop_oldest"
+
+
+class ActionDispatcher:
+    """
+    Runs trigger actions off the monitoring loop.
+
+    Alerts are pushed onto a bounded asyncio queue and handled by `workers`
+    worker tasks. Actions whose `execute` is a coroutine function are awaited;
+    blocking ones (e.g. EmailAction's SMTP calls) run in a thread pool.
+    `submit` never blocks: when the queue is full the alert is dropped
+    according to `overflow` and counted in the metrics.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        queue_size: int = 1000,
+        executor_threads: Optional[int] = None,
+        overflow: str = DROP_NEWEST
+    ):
+        if overflow not in (DROP_NEWEST, DROP_OLDEST):
+            raise ValueError(f"overflow must be '{DROP_NEWEST}' or '{DROP_OLDEST}', got {overflow!r}")
+        self.workers = workers
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.executor_threads = executor_threads or workers
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self.metrics: Dict[str, Any] = {
+            "submitted": 0,
+            "processed": 0,
+            "failed": 0,
+            "dropped": 0,
+            "max_queue_depth": 0,
+            "total_action_seconds": 0.0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self):
+        if self.running:
+            return
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.executor = ThreadPoolExecutor(max_workers=self.executor_threads, thread_name_prefix="monitor-action")
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def stop(self, drain: bool = True):
+        """
+        Stops the workers, first waiting for queued alerts if `drain` is True.
+        """
+        if not self.running:
+            return
+        if drain:
+            await self.queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.executor.shutdown(wait=drain)
+
+    def submit(self, action: "Action", alert: "Alert") -> bool:
+        """
+        Queues `action.execute(alert)`. Returns False if the alert was dropped.
+        """
+        self.metrics["submitted"] += 1
+        item: Tuple["Action", "Alert"] = (action, alert)
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.metrics["dropped"] += 1
+            if self.overflow == DROP_NEWEST:
+                logger.warning(f"Action queue full ({self.queue_size}); dropped alert '{alert.title}'.")
+                return False
+            dropped_action, dropped_alert = self.queue.get_nowait()
+            self.queue.task_done()
+            logger.warning(f"Action queue full ({self.queue_size}); dropped oldest alert '{dropped_alert.title}'.")
+            self.queue.put_nowait(item)
+
+        self.metrics["max_queue_depth"] = max(self.metrics["max_queue_depth"], self.queue.qsize())
+        return True
+
+    def snapshot_metrics(self) -> Dict[str, Any]:
+        metrics = dict(self.metrics)
+        metrics["queue_depth"] = self.queue.qsize() if self.queue is not None else 0
+        return metrics
+
+    async def _worker(self, worker_id: int):
+        loop = asyncio.get_running_loop()
+        while True:
+            action, alert = await self.queue.get()
+            start = time.perf_counter()
+            try:
+                if inspect.iscoroutinefunction(action.execute):
+                    await action.execute(alert)
+                else:
+                    await loop.run_in_executor(self.executor, action.execute, alert)
+                self.metrics["processed"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.metrics["failed"] += 1
+                logger.error(f"[worker {worker_id}] {type(action).__name__} failed for '{alert.title}': {e}")
+            finally:
+                self.metrics["total_action_seconds"] += time.perf_counter() - start
+                self.queue.task_done()
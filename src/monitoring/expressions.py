@@ -0,0 +1,176 @@
+import ast
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.shared.subnet_snapshot import SubnetSnapshot
+
+Columns = Dict[str, np.ndarray]
+Node = Callable[[Columns, Optional[int]], np.ndarray]
+
+
+class ExpressionError(ValueError):
+    """
+    Raised when a trigger expression cannot be parsed or uses unsupported syntax.
+    """
+
+
+class _Ema:
+    """
+    Per-subnet exponential moving average kept as one array. It advances at
+    most once per block, so evaluating an expression twice in the same block
+    does not skew it.
+    """
+
+    def __init__(self, period: float):
+        if period < 1:
+            raise ExpressionError("ema period must be >= 1")
+        self.alpha = 2.0 / (period + 1.0)
+        self.values: Optional[np.ndarray] = None
+        self.block: Optional[int] = None
+
+    def update(self, x: np.ndarray, block: Optional[int]) -> np.ndarray:
+        if self.values is not None and block is not None and block == self.block:
+            return self.values
+        if self.values is None:
+            self.values = x.astype(np.float64, copy=True)
+        else:
+            if len(self.values) < len(x):
+                # New subnets start their average at their current value
+                self.values = np.concatenate([self.values, x[len(self.values):]])
+            self.values = self.values[:len(x)]
+            self.values += self.alpha * (x - self.values)
+        self.block = block
+        return self.values
+
+
+_BIN_OPS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: lambda a, b: np.divide(a, b, out=np.zeros(np.broadcast(a, b).shape), where=np.asarray(b) != 0),
+}
+
+_COMPARE_OPS = {
+    ast.Gt: np.greater,
+    ast.GtE: np.greater_equal,
+    ast.Lt: np.less,
+    ast.LtE: np.less_equal,
+    ast.Eq: np.equal,
+    ast.NotEq: np.not_equal,
+}
+
+_ELEMENTWISE_FUNCTIONS = {
+    "abs": (1, np.abs),
+    "min": (2, np.minimum),
+    "max": (2, np.maximum),
+}
+
+
+class CompiledExpression:
+    """
+    A trigger condition such as
+
+        price > 1.2 * ema(price, 100) and tao_in < 500
+
+    parsed once into a tree of NumPy operations. Each evaluation runs over the
+    struct-of-arrays columns of a SubnetSnapshot, so one call covers every
+    subnet. Names refer to snapshot columns (see SubnetSnapshot.columns);
+    supported syntax is numbers, + - * /, comparisons, and/or/not, and the
+    functions abs, min, max and ema(x, period).
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        try:
+            tree = ast.parse(source.strip(), mode="eval")
+        except SyntaxError as e:
+            raise ExpressionError(f"Invalid expression {source!r}: {e.msg}") from e
+        self.names: List[str] = []
+        self._root = self._compile(tree.body)
+
+    def evaluate(self, snapshot: SubnetSnapshot) -> np.ndarray:
+        """
+        Returns a boolean mask indexed by netuid; absent subnets are always False.
+        """
+        columns = snapshot.columns()
+        missing = [name for name in self.names if name not in columns]
+        if missing:
+            raise ExpressionError(f"Unknown column(s) in {self.source!r}: {', '.join(missing)}")
+        with np.errstate(invalid="ignore"):
+            result = np.asarray(self._root(columns, snapshot.block), dtype=bool)
+        return np.broadcast_to(result, snapshot.present.shape) & snapshot.present
+
+    def matching_netuids(self, snapshot: SubnetSnapshot) -> List[int]:
+        return np.flatnonzero(self.evaluate(snapshot)).tolist()
+
+    def _compile(self, node: ast.AST) -> Node:
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            value = float(node.value)
+            return lambda columns, block: value
+
+        if isinstance(node, ast.Name):
+            name = node.id
+            if name not in self.names:
+                self.names.append(name)
+            return lambda columns, block: columns[name]
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            operand = self._compile(node.operand)
+            return lambda columns, block: np.negative(operand(columns, block))
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            operand = self._compile(node.operand)
+            return lambda columns, block: np.logical_not(operand(columns, block))
+
+        if isinstance(node, ast.BinOp) and type(node.op) in _BIN_OPS:
+            op = _BIN_OPS[type(node.op)]
+            left, right = self._compile(node.left), self._compile(node.right)
+            return lambda columns, block: op(left(columns, block), right(columns, block))
+
+        if isinstance(node, ast.BoolOp):
+            combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            operands = [self._compile(v) for v in node.values]
+
+            def bool_op(columns, block):
+                result = operands[0](columns, block)
+                for operand in operands[1:]:
+                    result = combine(result, operand(columns, block))
+                return result
+            return bool_op
+
+        if isinstance(node, ast.Compare):
+            if any(type(op) not in _COMPARE_OPS for op in node.ops):
+                raise ExpressionError(f"Unsupported comparison in {self.source!r}")
+            ops = [_COMPARE_OPS[type(op)] for op in node.ops]
+            operands = [self._compile(node.left)] + [self._compile(c) for c in node.comparators]
+
+            def compare(columns, block):
+                values = [operand(columns, block) for operand in operands]
+                result = ops[0](values[0], values[1])
+                for i in range(1, len(ops)):
+                    result = np.logical_and(result, ops[i](values[i], values[i + 1]))
+                return result
+            return compare
+
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+            return self._compile_call(node.func.id, node.args)
+
+        raise ExpressionError(f"Unsupported syntax in {self.source!r}: {ast.dump(node)}")
+
+    def _compile_call(self, name: str, args: List[ast.AST]) -> Node:
+        if name == "ema":
+            if len(args) != 2 or not isinstance(args[1], ast.Constant):
+                raise ExpressionError("ema() takes a value and a constant period, e.g. ema(price, 100)")
+            value = self._compile(args[0])
+            ema = _Ema(float(args[1].value))
+            return lambda columns, block: ema.update(np.asarray(value(columns, block), dtype=np.float64), block)
+
+        if name in _ELEMENTWISE_FUNCTIONS:
+            arity, fn = _ELEMENTWISE_FUNCTIONS[name]
+            if len(args) != arity:
+                raise ExpressionError(f"{name}() takes {arity} argument(s)")
+            operands = [self._compile(a) for a in args]
+            return lambda columns, block: fn(*[operand(columns, block) for operand in operands])
+
+        raise ExpressionError(f"Unknown function {name}() in {self.source!r}")
@@ -1,86 +1,239 @@
+import asyncio
+import logging
+import os
 from dataclasses import dataclass, field
-from typing import Dict
+from typing import Dict, List, Optional
 
-from triggers import PriceAlertTrigger, LowTaoBalanceTrigger, LowAlphaBalanceTrigger
-from actions import EmailAction
+import bittensor
+from bittensor import AsyncSubtensor
+
+from src.monitoring.triggers import Trigger, PriceAlertTrigger, LowTaoBalanceTrigger, LowAlphaBalanceTrigger
+from src.monitoring.actions import EmailDigestAction
+from src.monitoring.alert_state import AlertStateStore
+from src.monitoring.balance_table import BalanceTable
+from src.monitoring.dispatcher import ActionDispatcher
+from src.monitoring.rolling import RollingFeatures
+from src.shared.block_clock import BlockClock
+from src.shared.dtao_helper import DTAOHelper
 from src.shared.email_sender import EmailSender
-from bittensor.core.chain_data import DynamicInfo
+from src.shared.snapshot_diff import SnapshotDelta, SnapshotDiffer
+from src.shared.subnet_snapshot import SubnetSnapshot
+from src.utils.get_my_wallet import get_my_wallet
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
 
 
 @dataclass
 class MonitorData:
     """
     This is the data class your monitor receives each iteration.
-    - alpha_balances: e.g., user accounts -> alpha tokens
-    - tao_balance: the user's total TAO balance
-    - subnets_info: dict of subnet_name -> SubnetInfo
+    - block: the block every field below was read at
+    - balances: free TAO and per-subnet alpha of every watched coldkey
+    - alpha_balances: netuid -> alpha staked by the primary coldkey (summed over hotkeys)
+    - tao_balance: the primary coldkey's free TAO balance
+    - snapshot: every subnet from a single all_subnets() call, as compact
+      NumPy columns indexed by netuid (price, reserves, owner hotkey ids)
+    - delta: netuids whose price, reserves or owner changed since the
+      previous block the monitor saw (None outside the monitor loop)
+    - features: rolling per-block history (price, reserves, balances), already
+      updated with this block
     """
-    alpha_balances: Dict[str, float] = field(default_factory=dict)
+    block: Optional[int] = None
+    balances: Optional[BalanceTable] = None
+    alpha_balances: Dict[int, float] = field(default_factory=dict)
     tao_balance: float = 0.0
-    subnets_info: Dict[str, DynamicInfo] = field(default_factory=dict)
+    snapshot: Optional[SubnetSnapshot] = None
+    delta: Optional[SnapshotDelta] = None
+    features: Optional[RollingFeatures] = None
     # Add more fields if needed for other triggers or reporting.
 
 
 class Monitor:
     """
     Main Monitor class that knows how to gather data and run triggers.
+
+    Once per new block it collects one shared MonitorData snapshot with
+    concurrent batched queries (all_subnets, then stake infos and free balances
+    of every watched coldkey in chunks of `batch_size`, at most
+    `max_concurrency` in flight) and evaluates every trigger against it, so
+    the chain cost per block depends neither on the number of triggers nor,
+    beyond a few round trips, on the number of wallets.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        subtensor: AsyncSubtensor,
+        coldkey_ss58: str,
+        triggers: Optional[List[Trigger]] = None,
+        history_blocks: int = 300,
+        dispatcher: Optional[ActionDispatcher] = None,
+        alert_state: Optional[AlertStateStore] = None,
+        coldkeys: Optional[List[str]] = None,
+        batch_size: int = 128,
+        max_concurrency: int = 8
+    ):
+        self.subtensor = subtensor
+        self.helper = DTAOHelper(subtensor)
+        self.coldkey_ss58 = coldkey_ss58
+        # The primary coldkey always comes first; extra coldkeys are watched too
+        self.coldkeys = list(dict.fromkeys([coldkey_ss58, *(coldkeys or [])]))
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.triggers = triggers if triggers is not None else self.default_triggers()
+        self.features = RollingFeatures(window=history_blocks)
+        self.differ = SnapshotDiffer()
+        # Actions run on the dispatcher's workers, never inline in the block loop
+        self.dispatcher = dispatcher if dispatcher is not None else ActionDispatcher()
+        # Alerts notify once per crossing; the state survives restarts
+        self.alert_state = alert_state if alert_state is not None else AlertStateStore(
+            os.getenv("ALERT_STATE_FILE", "data/alert_state.json")
+        )
+        names = [trigger.state_name for trigger in self.triggers]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Triggers share alert state {duplicates}; give them distinct `name`s.")
+
+    @staticmethod
+    def default_triggers() -> List[Trigger]:
         # Create your email sender and any default actions you want
         email_sender = EmailSender()  # Adjust if your EmailSender needs arguments
-        email_action = EmailAction(
+        recipients = [e.strip() for e in os.getenv("EMAIL_ADMINS", "").split(",") if e.strip()]
+        # Alerts within 30s are grouped into one digest email per recipient
+        email_action = EmailDigestAction(
             email_sender=email_sender,
-            recipients=["example@yourdomain.com"]
+            recipients=recipients or ["example@yourdomain.com"],
+            window_seconds=30.0
         )
 
         # Example triggers:
-        self.triggers = [
-            # PriceAlertTrigger: check if alpha_price in a subnet >= threshold
+        return [
+            # PriceAlertTrigger: check if the alpha price of a subnet >= threshold,
+            # re-armed once the price falls 2% back below it
             PriceAlertTrigger(
-                price_thresholds={"subnetA": 10.0, "subnetB": 9.0},
-                actions=[email_action]
+                price_thresholds={1: 10.0, 18: 9.0},
+                actions=[email_action],
+                hysteresis_pct=2.0
             ),
             # LowTaoBalanceTrigger: checks if user's TAO balance < threshold
             LowTaoBalanceTrigger(
                 tao_threshold=50.0,
-                actions=[email_action]
+                actions=[email_action],
+                hysteresis_pct=5.0,
+                cooldown_seconds=3600.0
             ),
-            # LowAlphaBalanceTrigger: checks if alpha balances in any account < threshold
+            # LowAlphaBalanceTrigger: checks if alpha balances on any subnet < threshold
             LowAlphaBalanceTrigger(
                 alpha_threshold=5.0,
-                actions=[email_action]
+                actions=[email_action],
+                hysteresis_pct=5.0,
+                cooldown_seconds=3600.0
             )
         ]
 
-    def get_monitor_data(self) -> MonitorData:
+    async def get_monitor_data(self, block: Optional[int] = None) -> MonitorData:
         """
-        Fetch or compute the data you need for monitoring.
-        For demonstration, we hardcode some values.
+        Collects everything the triggers need at `block` in one batched pass.
         """
-        # In real scenarios, you'd pull these from APIs, databases, or on-chain data, etc.
+        if block is None:
+            block = await self.subtensor.get_current_block()
+
+        subnets, balances = await asyncio.gather(
+            self.helper.all_subnets(block_number=block),
+            self.get_balance_table(block)
+        )
+
         return MonitorData(
-            alpha_balances={
-                "account1": 3.2,
-                "account2": 12.0,
-            },
-            tao_balance=45.0,  # Suppose the user’s TAO balance is 45.0
-            subnets_info={
-                "subnetA": DynamicInfo(price=12.5),
-                "subnetB": DynamicInfo(price=8.5),
-            }
+            block=block,
+            balances=balances,
+            alpha_balances=balances.alpha_of(self.coldkey_ss58),
+            tao_balance=balances.tao_of(self.coldkey_ss58),
+            snapshot=SubnetSnapshot.from_dynamic_info(subnets, block=block)
         )
 
-    def run(self):
+    async def get_balance_table(self, block: int) -> BalanceTable:
         """
-        Call this to run the monitoring loop once. It fetches fresh data,
-        then passes it to each trigger to evaluate.
+        Free balances and stake infos of every watched coldkey at `block`.
+        Each chunk of `batch_size` coldkeys costs one balance query and one
+        stake-info query; all chunks run concurrently, bounded by `max_concurrency`.
         """
-        data = self.get_monitor_data()
+        table = BalanceTable(self.coldkeys, block=block)
+        block_hash = await self.subtensor.get_block_hash(block)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch_balances(chunk: List[str]):
+            async with semaphore:
+                balances = await self.helper.get_balances(chunk, block_hash=block_hash)
+            table.set_tao({coldkey: balance.tao for coldkey, balance in balances.items()})
+
+        async def fetch_stakes(chunk: List[str]):
+            async with semaphore:
+                stake_infos = await self.helper.get_stake_info_for_coldkeys(chunk, block=block)
+            table.set_stakes(stake_infos)
+
+        chunks = [self.coldkeys[i:i + self.batch_size] for i in range(0, len(self.coldkeys), self.batch_size)]
+        await asyncio.gather(*[fetch(chunk) for chunk in chunks for fetch in (fetch_balances, fetch_stakes)])
+        return table
+
+    async def run_once(self, block: Optional[int] = None) -> MonitorData:
+        """
+        Fetches fresh data once, then passes it to each trigger to evaluate.
+        Resulting actions are queued on the dispatcher.
+        """
+        await self.dispatcher.start()
+        data = await self.get_monitor_data(block)
+        data.delta = await self.differ.publish(data.snapshot)
+        self.features.update(data)
+        data.features = self.features
         for trigger in self.triggers:
-            trigger.run(data)
+            try:
+                trigger.run(data, dispatcher=self.dispatcher, state=self.alert_state)
+            except Exception as e:
+                logger.error(f"Trigger {type(trigger).__name__} failed at block {data.block}: {e}")
+        try:
+            self.alert_state.save()
+        except OSError as e:
+            logger.error(f"Could not persist alert state: {e}")
+        return data
+
+    async def run(self):
+        """
+        Runs the monitoring loop forever, once per new block. If one pass takes
+        longer than a block, the next pass jumps to the newest block.
+        """
+        clock = BlockClock(self.subtensor)
+        block = await clock.start()
+        try:
+            while True:
+                try:
+                    await self.run_once(block)
+                except Exception as e:
+                    logger.error(f"Monitoring pass failed at block {block}: {e}")
+                metrics = self.dispatcher.snapshot_metrics()
+                if metrics["dropped"] or metrics["queue_depth"] > self.dispatcher.queue_size // 2:
+                    logger.warning(f"Action dispatcher under pressure at block {block}: {metrics}")
+                next_block = await clock.wait_for_block_after(block)
+                if next_block > block + 1:
+                    logger.info(f"Skipped {next_block - block - 1} block(s); monitoring block {next_block}.")
+                block = next_block
+        finally:
+            await clock.stop()
+            await self.dispatcher.stop()
+            # Send whatever digest actions are still holding
+            for action in {id(a): a for t in self.triggers for a in t.actions}.values():
+                if hasattr(action, "flush"):
+                    action.flush()
+
+
+async def main():
+    logging.basicConfig(level=logging.INFO)
+    subtensor = await bittensor.async_subtensor().initialize()
+    wallet = get_my_wallet()
+    # Extra coldkeys (comma separated) to watch besides the local wallet
+    coldkeys = [ck.strip() for ck in os.getenv("MONITOR_COLDKEYS", "").split(",") if ck.strip()]
+    monitor = Monitor(subtensor=subtensor, coldkey_ss58=wallet.coldkeypub.ss58_address, coldkeys=coldkeys)
+    await monitor.run()
 
 
 if __name__ == "__main__":
-    monitor = Monitor()
-    monitor.run()
+    asyncio.run(main())
@@ -0,0 +1,181 @@
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from src.monitoring.monitor import MonitorData
+
+
+class RollingWindow:
+    """
+    Fixed-size NumPy ring buffer holding the last `window` values of many
+    series (one row per series). Every push is O(1) per series:
+
+    - sum / mean and EMA are updated incrementally,
+    - min / max come from monotonic deques (amortized O(1)),
+    - change over a lookback reads one slot of the ring,
+    - falling / rising streaks are counters.
+
+    Rows are added on demand; a new row only has the values pushed after it appeared.
+    """
+
+    def __init__(self, window: int, ema_period: Optional[float] = None):
+        if window < 2:
+            raise ValueError("RollingWindow needs a window of at least 2.")
+        self.window = window
+        self.ema_alpha = 2.0 / ((ema_period or window) + 1.0)
+        self.pos = 0  # next slot to write
+        self.data = np.zeros((0, window), dtype=np.float64)
+        self.count = np.zeros(0, dtype=np.int64)
+        self.sum = np.zeros(0, dtype=np.float64)
+        self.ema = np.zeros(0, dtype=np.float64)
+        self.falling_streak = np.zeros(0, dtype=np.int64)
+        self.rising_streak = np.zeros(0, dtype=np.int64)
+        self._ticks = 0
+        self._min: List[Deque[Tuple[int, float]]] = []
+        self._max: List[Deque[Tuple[int, float]]] = []
+
+    def __len__(self) -> int:
+        return len(self.count)
+
+    def _grow(self, rows: int):
+        extra = rows - len(self)
+        if extra <= 0:
+            return
+        self.data = np.vstack([self.data, np.zeros((extra, self.window))])
+        self.count = np.concatenate([self.count, np.zeros(extra, dtype=np.int64)])
+        self.sum = np.concatenate([self.sum, np.zeros(extra)])
+        self.ema = np.concatenate([self.ema, np.zeros(extra)])
+        self.falling_streak = np.concatenate([self.falling_streak, np.zeros(extra, dtype=np.int64)])
+        self.rising_streak = np.concatenate([self.rising_streak, np.zeros(extra, dtype=np.int64)])
+        self._min.extend(deque() for _ in range(extra))
+        self._max.extend(deque() for _ in range(extra))
+
+    def push(self, values: np.ndarray, mask: Optional[np.ndarray] = None):
+        """
+        Appends one value per row. Rows where `mask` is False (e.g. a subnet
+        missing from this block's snapshot) repeat their last value, or stay
+        empty if they have no history yet.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        self._grow(len(values))
+        if len(values) < len(self):
+            # Rows beyond the pushed values count as missing; the pushed ones are kept
+            supplied = np.ones(len(values), dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+            mask = np.concatenate([supplied, np.zeros(len(self) - len(values), dtype=bool)])
+            values = np.concatenate([values, np.zeros(len(self) - len(values))])
+        active = np.ones(len(self), dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+
+        # Rows with history that miss one update hold their last value, so
+        # every started row advances with the ring and evictions stay aligned
+        previous = self.data[:, (self.pos - 1) % self.window]
+        held = ~active & (self.count > 0)
+        values = np.where(held, previous, values)
+        active = active | held
+
+        full = active & (self.count >= self.window)
+        evicted = self.data[:, self.pos]
+        had_previous = active & (self.count > 0)
+
+        self.sum = np.where(full, self.sum - evicted, self.sum)
+        self.sum = np.where(active, self.sum + values, self.sum)
+        self.ema = np.where(
+            active & (self.count == 0), values,
+            np.where(active, self.ema + self.ema_alpha * (values - self.ema), self.ema)
+        )
+        self.falling_streak = np.where(
+            had_previous, np.where(values < previous, self.falling_streak + 1, 0), self.falling_streak
+        )
+        self.rising_streak = np.where(
+            had_previous, np.where(values > previous, self.rising_streak + 1, 0), self.rising_streak
+        )
+        self.data[:, self.pos] = np.where(active, values, self.data[:, self.pos])
+        self.count = np.where(active, np.minimum(self.count + 1, self.window), self.count)
+
+        tick = self._ticks
+        for row in np.flatnonzero(active):
+            value = float(values[row])
+            for dq, keep in ((self._min[row], lambda old: old < value), (self._max[row], lambda old: old > value)):
+                while dq and not keep(dq[-1][1]):
+                    dq.pop()
+                dq.append((tick, value))
+                if dq[0][0] <= tick - self.window:
+                    dq.popleft()
+
+        self.pos = (self.pos + 1) % self.window
+        self._ticks += 1
+
+    def latest(self) -> np.ndarray:
+        return self.data[:, (self.pos - 1) % self.window]
+
+    def mean(self) -> np.ndarray:
+        return np.divide(self.sum, self.count, out=np.zeros_like(self.sum), where=self.count > 0)
+
+    def minimum(self) -> np.ndarray:
+        return np.array([dq[0][1] if dq else np.nan for dq in self._min])
+
+    def maximum(self) -> np.ndarray:
+        return np.array([dq[0][1] if dq else np.nan for dq in self._max])
+
+    def pct_change(self, lookback: Optional[int] = None) -> np.ndarray:
+        """
+        Percent change between the latest value and the one `lookback` pushes
+        earlier (default: the oldest value in the window). NaN where a row
+        does not have that much history yet.
+        """
+        lookback = self.window - 1 if lookback is None else lookback
+        if not 1 <= lookback < self.window:
+            raise ValueError(f"lookback must be between 1 and {self.window - 1}")
+        latest = self.latest()
+        past = self.data[:, (self.pos - 1 - lookback) % self.window]
+        ready = (self.count > lookback) & (past != 0)
+        change = np.divide(latest - past, past, out=np.full_like(latest, np.nan), where=ready)
+        return change * 100.0
+
+
+class RollingFeatures:
+    """
+    Per-block rolling history the monitor keeps next to MonitorData:
+    subnet price and reserves (rows indexed by netuid) and balances
+    (rows per named account, "tao" for the free balance, "alpha:<netuid>" for stake).
+    """
+
+    def __init__(self, window: int = 300, ema_period: Optional[float] = None):
+        self.window = window
+        self.price = RollingWindow(window, ema_period)
+        self.tao_in = RollingWindow(window, ema_period)
+        self.alpha_in = RollingWindow(window, ema_period)
+        self.balances = RollingWindow(window, ema_period)
+        self.balance_rows: Dict[Hashable, int] = {}
+        self.block: Optional[int] = None
+
+    def balance_row(self, key: Hashable) -> int:
+        if key not in self.balance_rows:
+            self.balance_rows[key] = len(self.balance_rows)
+        return self.balance_rows[key]
+
+    def update(self, data: "MonitorData"):
+        """
+        Pushes one block of data. Calling it again for the same block is a no-op.
+        """
+        if data.block is not None and data.block == self.block:
+            return
+        snapshot = data.snapshot
+        if snapshot is not None:
+            self.price.push(snapshot.price, snapshot.present)
+            self.tao_in.push(snapshot.tao_in, snapshot.present)
+            self.alpha_in.push(snapshot.alpha_in, snapshot.present)
+
+        observed = {"tao": data.tao_balance}
+        observed.update({f"alpha:{netuid}": alpha for netuid, alpha in data.alpha_balances.items()})
+        for key in observed:
+            self.balance_row(key)
+        values = np.zeros(len(self.balance_rows))
+        mask = np.zeros(len(self.balance_rows), dtype=bool)
+        for key, value in observed.items():
+            row = self.balance_rows[key]
+            values[row] = value
+            mask[row] = True
+        self.balances.push(values, mask)
+        self.block = data.block
@@ -0,0 +1,99 @@
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+ABOVE = "above"
+BELOW = "below"
+
+
+class ThresholdIndex:
+    """
+    Thresholds compiled into one sorted NumPy array per key (e.g. per netuid
+    or per account), so finding every threshold a value has crossed is a
+    single `searchsorted` plus a slice, regardless of how many rules exist.
+
+    - direction="above": a threshold is crossed when value >= threshold
+    - direction="below": a threshold is crossed when value < threshold
+    """
+
+    def __init__(self, direction: str = ABOVE):
+        if direction not in (ABOVE, BELOW):
+            raise ValueError(f"direction must be '{ABOVE}' or '{BELOW}', got {direction!r}")
+        self.direction = direction
+        self._pending: Dict[Hashable, List[Tuple[float, Any]]] = {}
+        self._thresholds: Dict[Hashable, np.ndarray] = {}
+        self._rule_ids: Dict[Hashable, List[Any]] = {}
+
+    @classmethod
+    def from_mapping(
+        cls,
+        thresholds: Dict[Hashable, Union[float, Iterable[float]]],
+        direction: str = ABOVE
+    ) -> "ThresholdIndex":
+        """
+        Builds an index from {key: threshold} or {key: [threshold, ...]}.
+        """
+        index = cls(direction)
+        for key, values in thresholds.items():
+            if isinstance(values, (int, float)):
+                values = [values]
+            for threshold in values:
+                index.add(key, threshold)
+        return index.compile()
+
+    def add(self, key: Hashable, threshold: float, rule_id: Any = None) -> "ThresholdIndex":
+        self._pending.setdefault(key, []).append((float(threshold), rule_id))
+        return self
+
+    def compile(self) -> "ThresholdIndex":
+        """
+        Merges added rules into the sorted per-key arrays. Call after add().
+        """
+        for key, rules in self._pending.items():
+            if key in self._thresholds:
+                rules = list(zip(self._thresholds[key].tolist(), self._rule_ids[key])) + rules
+            rules.sort(key=lambda rule: rule[0])
+            self._thresholds[key] = np.fromiter((r[0] for r in rules), dtype=np.float64, count=len(rules))
+            self._rule_ids[key] = [r[1] for r in rules]
+        self._pending = {}
+        return self
+
+    def keys(self) -> Iterable[Hashable]:
+        return self._thresholds.keys()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._thresholds
+
+    def __len__(self) -> int:
+        return sum(len(t) for t in self._thresholds.values())
+
+    def crossed(self, key: Hashable, value: float) -> List[Tuple[float, Any]]:
+        """
+        Returns every (threshold, rule_id) of `key` crossed by `value`,
+        ordered from the threshold closest to `value` to the furthest.
+        """
+        thresholds = self._thresholds.get(key)
+        if thresholds is None:
+            return []
+        i = int(np.searchsorted(thresholds, value, side="right"))
+        rule_ids = self._rule_ids[key]
+        if self.direction == ABOVE:
+            return [(float(thresholds[j]), rule_ids[j]) for j in range(i - 1, -1, -1)]
+        return [(float(thresholds[j]), rule_ids[j]) for j in range(i, len(thresholds))]
+
+    def crossed_many(
+        self,
+        values: Dict[Hashable, float],
+        keys: Optional[Iterable[Hashable]] = None
+    ) -> Dict[Hashable, List[Tuple[float, Any]]]:
+        """
+        Evaluates many keys at once; only keys with at least one crossing are returned.
+        """
+        result = {}
+        for key in (keys if keys is not None else values.keys()):
+            if key not in self._thresholds or key not in values:
+                continue
+            hits = self.crossed(key, values[key])
+            if hits:
+                result[key] = hits
+        return result
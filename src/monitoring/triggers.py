@@ -1,21 +1,49 @@
+import hashlib
+import json
 import time
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any, List
+from typing import TYPE_CHECKING, Optional, Dict, Any, Hashable, Iterable, List, Union
 
-from monitor import MonitorData  # import the MonitorData class
-from actions import Action       # import the base Action class (e.g., EmailAction)
+import numpy as np
+
+from src.monitoring.expressions import CompiledExpression
+from src.monitoring.threshold_index import ThresholdIndex, ABOVE, BELOW
+
+if TYPE_CHECKING:
+    # Type hints only: monitor.py and actions.py both import this module
+    from src.monitoring.monitor import MonitorData
+    from src.monitoring.actions import Action
+    from src.monitoring.dispatcher import ActionDispatcher
+    from src.monitoring.alert_state import AlertStateStore
 
 
 class Alert:
     """
     Simple Alert class capturing relevant details. You can customize
     this based on your requirements (severity, etc.).
+
+    key identifies the watched series (e.g. "price:18"); with value, threshold
+    and direction it lets AlertStateStore deduplicate the alert and re-arm it
+    once the value moves back across the threshold.
     """
 
-    def __init__(self, title: str, message: str, details: Dict[str, Any]):
+    def __init__(
+        self,
+        title: str,
+        message: str,
+        details: Dict[str, Any],
+        key: Optional[str] = None,
+        value: Optional[float] = None,
+        threshold: Optional[float] = None,
+        direction: Optional[str] = None
+    ):
         self.title = title
         self.message = message
         self.details = details
+        self.key = key if key is not None else title
+        self.value = value
+        self.threshold = threshold
+        self.direction = direction
         self.timestamp = time.time()
 
 
@@ -23,102 +51,455 @@ class Trigger(ABC):
     """
     Base class for all triggers. Each trigger can optionally have one or more
     actions that will be executed if the trigger condition is met.
+
+    When run with an AlertStateStore, a condition notifies once and then stays
+    quiet until it clears: the watched value must move back past the threshold
+    by `hysteresis_pct` percent of it, and `cooldown_seconds` must have passed
+    since the last notification. The stored state is keyed by `state_name`:
+    `name` if given, otherwise one derived from the trigger's type and
+    `parameters()`, so it survives restarts and reordering of the triggers.
     """
 
-    def __init__(self, actions: Optional[List[Action]] = None):
+    def __init__(
+        self,
+        actions: Optional[List["Action"]] = None,
+        cooldown_seconds: float = 0.0,
+        hysteresis_pct: float = 0.0,
+        name: Optional[str] = None
+    ):
         self.actions = actions if actions else []
+        self.cooldown_seconds = cooldown_seconds
+        self.hysteresis_pct = hysteresis_pct
+        self.name = name
+
+    def parameters(self) -> Dict[str, Any]:
+        """
+        What this trigger watches (thresholds, lookbacks...); two triggers of
+        the same type with the same parameters share alert state.
+        """
+        return {}
+
+    @property
+    def state_name(self) -> str:
+        if self.name is not None:
+            return self.name
+        digest = hashlib.sha1(json.dumps(self.parameters(), sort_keys=True, default=str).encode()).hexdigest()
+        return f"{type(self).__name__}:{digest[:12]}"
 
     @abstractmethod
-    def check(self, data: MonitorData) -> Optional[Alert]:
+    def check(self, data: "MonitorData") -> Optional[Alert]:
         """
         Evaluate whether this trigger condition is met. If it is,
         return an Alert; otherwise return None.
         """
         pass
 
-    def run(self, data: MonitorData):
+    def check_all(self, data: "MonitorData") -> List[Alert]:
         """
-        Call `check`. If it returns an Alert, pass it on to the attached actions.
+        Evaluate every condition of this trigger and return one Alert per
+        condition met. Triggers with many thresholds override this; the
+        default wraps `check`.
         """
         alert = self.check(data)
-        if alert:
+        return [alert] if alert else []
+
+    def observe(self, data: "MonitorData") -> Dict[str, float]:
+        """
+        Current value of every series this trigger watches, by alert key.
+        Used to re-arm alerts with hysteresis; without it an alert re-arms as
+        soon as its condition is no longer met.
+        """
+        return {}
+
+    def run(
+        self,
+        data: "MonitorData",
+        dispatcher: Optional["ActionDispatcher"] = None,
+        state: Optional["AlertStateStore"] = None
+    ):
+        """
+        Call `check_all` and pass every returned Alert on to the attached actions.
+        With a dispatcher the actions are queued instead of executed inline,
+        so a slow action never holds up the caller. With a state store, alerts
+        that already notified and have not cleared yet are dropped.
+        """
+        alerts = self.check_all(data)
+        if state is not None:
+            alerts = state.filter(
+                self.state_name,
+                alerts,
+                observed=self.observe(data),
+                hysteresis_pct=self.hysteresis_pct,
+                cooldown_seconds=self.cooldown_seconds
+            )
+        for alert in alerts:
             for action in self.actions:
-                action.execute(alert)
+                if dispatcher is not None:
+                    dispatcher.submit(action, alert)
+                else:
+                    action.execute(alert)
 
 
 class PriceAlertTrigger(Trigger):
     """
-    Example trigger: checks if any subnet's alpha_price is >= a defined threshold.
+    Example trigger: checks if any subnet's alpha price is >= a defined threshold.
     If so, it creates an Alert to be handled by the attached actions (e.g., email).
+    price_thresholds is a dict: {netuid: threshold in TAO} or {netuid: [thresholds]}.
+    Thresholds are compiled into a ThresholdIndex, so thousands of them cost one
+    binary search per subnet. With a snapshot delta only subnets whose state
+    changed are searched again; the others keep their previous result.
     """
 
-    def __init__(self, price_thresholds: Dict[str, float], actions: Optional[List[Action]] = None):
-        super().__init__(actions)
+    def __init__(
+        self,
+        price_thresholds: Dict[int, Union[float, Iterable[float]]],
+        actions: Optional[List["Action"]] = None,
+        **state_options
+    ):
+        super().__init__(actions, **state_options)
         self.price_thresholds = price_thresholds
+        self.index = ThresholdIndex.from_mapping(price_thresholds, direction=ABOVE)
+        self._alerts_by_netuid: Dict[int, List[Alert]] = {}
+        self._block: Optional[int] = None
+
+    def parameters(self) -> Dict[str, Any]:
+        return {"price_thresholds": {str(netuid): value for netuid, value in self.price_thresholds.items()}}
 
-    def check(self, data: MonitorData) -> Optional[Alert]:
-        for subnet_name, threshold in self.price_thresholds.items():
-            # Each subnet has SubnetInfo; get it from data.subnets_info
-            subnet_info = data.subnets_info.get(subnet_name)
-            if subnet_info is None:
+    def check(self, data: "MonitorData") -> Optional[Alert]:
+        alerts = self.check_all(data)
+        return alerts[0] if alerts else None
+
+    def check_all(self, data: "MonitorData") -> List[Alert]:
+        snapshot = data.snapshot
+        if snapshot is None:
+            return []
+
+        delta = data.delta
+        if delta is not None and delta.previous_block is not None and delta.previous_block == self._block:
+            netuids = [netuid for netuid in delta.changed.tolist() if netuid in self.index]
+        else:
+            self._alerts_by_netuid = {}
+            netuids = self.index.keys()
+        self._block = snapshot.block
+
+        for netuid in netuids:
+            alerts = []
+            self._alerts_by_netuid[netuid] = alerts
+            if not snapshot.has(netuid):
                 continue
 
-            current_price = subnet_info.alpha_price
-            if current_price >= threshold:
-                return Alert(
+            current_price = float(snapshot.price[netuid])
+            for threshold, _ in self.index.crossed(netuid, current_price):
+                alerts.append(Alert(
                     title="Price Threshold Exceeded",
-                    message=f"Subnet '{subnet_name}' price is {current_price:.2f}, exceeding threshold {threshold:.2f}",
+                    message=f"Subnet {netuid} price is {current_price:.4f}, exceeding threshold {threshold:.4f}",
                     details={
-                        "subnet_name": subnet_name,
+                        "netuid": netuid,
                         "current_price": current_price,
                         "threshold": threshold
-                    }
-                )
-        return None
+                    },
+                    key=f"price:{netuid}",
+                    value=current_price,
+                    threshold=threshold,
+                    direction=ABOVE
+                ))
+        return [alert for alerts in self._alerts_by_netuid.values() for alert in alerts]
+
+    def observe(self, data: "MonitorData") -> Dict[str, float]:
+        snapshot = data.snapshot
+        if snapshot is None:
+            return {}
+        return {
+            f"price:{netuid}": float(snapshot.price[netuid])
+            for netuid in self.index.keys() if snapshot.has(netuid)
+        }
 
 
 class LowTaoBalanceTrigger(Trigger):
     """
     Checks if the user's TAO balance is below a certain threshold.
+    When the monitor watches several coldkeys (data.balances), every one of
+    them is checked in one vectorized comparison.
     """
 
-    def __init__(self, tao_threshold: float, actions: Optional[List[Action]] = None):
-        super().__init__(actions)
+    def __init__(self, tao_threshold: float, actions: Optional[List["Action"]] = None, **state_options):
+        super().__init__(actions, **state_options)
         self.tao_threshold = tao_threshold
 
-    def check(self, data: MonitorData) -> Optional[Alert]:
-        if data.tao_balance < self.tao_threshold:
-            return Alert(
+    def parameters(self) -> Dict[str, Any]:
+        return {"tao_threshold": self.tao_threshold}
+
+    def check(self, data: "MonitorData") -> Optional[Alert]:
+        alerts = self.check_all(data)
+        return alerts[0] if alerts else None
+
+    def check_all(self, data: "MonitorData") -> List[Alert]:
+        if data.balances is None:
+            below = [(None, data.tao_balance)] if data.tao_balance < self.tao_threshold else []
+        else:
+            below = data.balances.tao_below(self.tao_threshold)
+
+        return [
+            Alert(
                 title="Low TAO Balance",
-                message=f"TAO balance {data.tao_balance:.4f} is below threshold {self.tao_threshold:.4f}",
+                message=(
+                    f"{'TAO balance' if coldkey is None else f'Coldkey {coldkey} TAO balance'} "
+                    f"{balance:.4f} is below threshold {self.tao_threshold:.4f}"
+                ),
                 details={
-                    "tao_balance": data.tao_balance,
+                    "coldkey": coldkey,
+                    "tao_balance": balance,
                     "threshold": self.tao_threshold
-                }
+                },
+                key="tao" if coldkey is None else f"tao:{coldkey}",
+                value=balance,
+                threshold=self.tao_threshold,
+                direction=BELOW
             )
-        return None
+            for coldkey, balance in below
+        ]
+
+    def observe(self, data: "MonitorData") -> Dict[str, float]:
+        if data.balances is None:
+            return {"tao": data.tao_balance}
+        return {f"tao:{coldkey}": float(tao) for coldkey, tao in zip(data.balances.coldkeys, data.balances.tao)}
 
 
 class LowAlphaBalanceTrigger(Trigger):
     """
     Checks if alpha balances in the user's watched accounts are below a certain threshold.
-    alpha_balances is a dict: {account_id: balance}, or whichever key system you prefer.
+    alpha_balances is a dict: {netuid: balance}, or whichever key system you prefer.
+    account_thresholds optionally gives accounts their own threshold(s); the
+    others use alpha_threshold. With data.balances every position of every
+    watched coldkey is checked, accounts being netuids.
     """
 
-    def __init__(self, alpha_threshold: float, actions: Optional[List[Action]] = None):
-        super().__init__(actions)
+    def __init__(
+        self,
+        alpha_threshold: float,
+        actions: Optional[List["Action"]] = None,
+        account_thresholds: Optional[Dict[Hashable, Union[float, Iterable[float]]]] = None,
+        **state_options
+    ):
+        super().__init__(actions, **state_options)
         self.alpha_threshold = alpha_threshold
+        self.account_thresholds = account_thresholds or {}
+        self.index = ThresholdIndex.from_mapping(self.account_thresholds, direction=BELOW)
 
-    def check(self, data: MonitorData) -> Optional[Alert]:
-        for account, balance in data.alpha_balances.items():
-            if balance < self.alpha_threshold:
-                return Alert(
-                    title="Low Alpha Balance",
-                    message=f"Account '{account}' alpha balance {balance:.4f} is below threshold {self.alpha_threshold:.4f}",
-                    details={
-                        "account": account,
-                        "alpha_balance": balance,
-                        "threshold": self.alpha_threshold
-                    }
+    def parameters(self) -> Dict[str, Any]:
+        return {
+            "alpha_threshold": self.alpha_threshold,
+            "account_thresholds": {str(account): value for account, value in self.account_thresholds.items()}
+        }
+
+    def check(self, data: "MonitorData") -> Optional[Alert]:
+        alerts = self.check_all(data)
+        return alerts[0] if alerts else None
+
+    def _positions_below(self, data: "MonitorData") -> List[tuple]:
+        """
+        (coldkey, account, balance, threshold) for every crossed threshold.
+        """
+        if data.balances is None:
+            hits = []
+            for account, balance in data.alpha_balances.items():
+                if account in self.index:
+                    thresholds = [threshold for threshold, _ in self.index.crossed(account, balance)]
+                else:
+                    thresholds = [self.alpha_threshold] if balance < self.alpha_threshold else []
+                hits.extend((None, account, balance, threshold) for threshold in thresholds)
+            return hits
+
+        table = data.balances
+        custom = [netuid for netuid in self.index.keys() if isinstance(netuid, int) and netuid < table.staked.shape[1]]
+        default_netuids = np.setdiff1d(np.arange(table.staked.shape[1]), custom)
+        hits = [
+            (coldkey, netuid, balance, self.alpha_threshold)
+            for coldkey, netuid, balance in table.alpha_below(self.alpha_threshold, default_netuids.tolist())
+        ]
+        for netuid in custom:
+            for row in np.flatnonzero(table.staked[:, netuid]):
+                balance = float(table.alpha[row, netuid])
+                hits.extend(
+                    (table.coldkeys[row], netuid, balance, threshold)
+                    for threshold, _ in self.index.crossed(netuid, balance)
                 )
-        return None
+        return hits
+
+    def check_all(self, data: "MonitorData") -> List[Alert]:
+        alerts = []
+        for coldkey, account, balance, threshold in self._positions_below(data):
+            owner = "" if coldkey is None else f"Coldkey {coldkey} "
+            alerts.append(Alert(
+                title="Low Alpha Balance",
+                message=f"{owner}Account '{account}' alpha balance {balance:.4f} is below threshold {threshold:.4f}",
+                details={
+                    "coldkey": coldkey,
+                    "account": account,
+                    "alpha_balance": balance,
+                    "threshold": threshold
+                },
+                key=f"alpha:{account}" if coldkey is None else f"alpha:{coldkey}:{account}",
+                value=balance,
+                threshold=threshold,
+                direction=BELOW
+            ))
+        return alerts
+
+    def observe(self, data: "MonitorData") -> Dict[str, float]:
+        if data.balances is None:
+            return {f"alpha:{account}": balance for account, balance in data.alpha_balances.items()}
+        table = data.balances
+        return {
+            f"alpha:{table.coldkeys[row]}:{netuid}": float(table.alpha[row, netuid])
+            for row, netuid in zip(*np.nonzero(table.staked))
+        }
+
+
+class ExpressionTrigger(Trigger):
+    """
+    Fires for every subnet matching an expression such as
+    "price > 1.2 * ema(price, 100) and tao_in < 500".
+    The expression is compiled once and evaluated column-wise over all subnets.
+    """
+
+    def __init__(
+        self,
+        expression: str,
+        actions: Optional[List["Action"]] = None,
+        title: Optional[str] = None,
+        **state_options
+    ):
+        super().__init__(actions, **state_options)
+        self.expression = CompiledExpression(expression)
+        self.title = title or "Subnet Condition Met"
+
+    def parameters(self) -> Dict[str, Any]:
+        return {"expression": self.expression.source}
+
+    def check(self, data: "MonitorData") -> Optional[Alert]:
+        alerts = self.check_all(data)
+        return alerts[0] if alerts else None
+
+    def check_all(self, data: "MonitorData") -> List[Alert]:
+        snapshot = data.snapshot
+        if snapshot is None:
+            return []
+
+        alerts = []
+        for netuid in self.expression.matching_netuids(snapshot):
+            price = float(snapshot.price[netuid])
+            alerts.append(Alert(
+                title=self.title,
+                message=f"Subnet {netuid} matches '{self.expression.source}' (price {price:.4f})",
+                details={
+                    "netuid": netuid,
+                    "expression": self.expression.source,
+                    "current_price": price,
+                    "tao_in": float(snapshot.tao_in[netuid])
+                },
+                key=f"subnet:{netuid}",
+                value=price
+            ))
+        return alerts
+
+
+class PriceChangeTrigger(Trigger):
+    """
+    Fires for every subnet whose price moved by at least `change_pct` percent
+    over the last `lookback` blocks, e.g. change_pct=-10, lookback=50 for
+    "price dropped 10% in 50 blocks". Reads the monitor's rolling features,
+    so no history is recomputed.
+    """
+
+    def __init__(self, change_pct: float, lookback: int, actions: Optional[List["Action"]] = None, **state_options):
+        super().__init__(actions, **state_options)
+        self.change_pct = change_pct
+        self.lookback = lookback
+
+    def parameters(self) -> Dict[str, Any]:
+        return {"change_pct": self.change_pct, "lookback": self.lookback}
+
+    def check(self, data: "MonitorData") -> Optional[Alert]:
+        alerts = self.check_all(data)
+        return alerts[0] if alerts else None
+
+    def check_all(self, data: "MonitorData") -> List[Alert]:
+        if data.features is None or len(data.features.price) == 0:
+            return []
+        window = data.features.price
+        change = window.pct_change(self.lookback)
+        with np.errstate(invalid="ignore"):
+            if self.change_pct < 0:
+                hits = np.flatnonzero(change <= self.change_pct)
+            else:
+                hits = np.flatnonzero(change >= self.change_pct)
+
+        latest = window.latest()
+        return [
+            Alert(
+                title="Price Change",
+                message=(
+                    f"Subnet {netuid} price changed {change[netuid]:+.2f}% over {self.lookback} blocks "
+                    f"(now {latest[netuid]:.4f})"
+                ),
+                details={
+                    "netuid": int(netuid),
+                    "change_pct": float(change[netuid]),
+                    "lookback_blocks": self.lookback,
+                    "current_price": float(latest[netuid]),
+                    "threshold": self.change_pct
+                },
+                key=f"change:{int(netuid)}",
+                value=float(change[netuid]),
+                threshold=self.change_pct,
+                direction=BELOW if self.change_pct < 0 else ABOVE
+            )
+            for netuid in hits
+        ]
+
+    def observe(self, data: "MonitorData") -> Dict[str, float]:
+        if data.features is None or len(data.features.price) == 0:
+            return {}
+        change = data.features.price.pct_change(self.lookback)
+        return {f"change:{netuid}": float(change[netuid]) for netuid in np.flatnonzero(~np.isnan(change))}
+
+
+class BalanceTrendTrigger(Trigger):
+    """
+    Fires when a balance series has been falling for `min_blocks` consecutive
+    blocks, e.g. account="tao", min_blocks=300 for "TAO balance falling for an hour".
+    Accounts follow RollingFeatures naming: "tao" or "alpha:<netuid>".
+    """
+
+    def __init__(self, account: str, min_blocks: int, actions: Optional[List["Action"]] = None, **state_options):
+        super().__init__(actions, **state_options)
+        self.account = account
+        self.min_blocks = min_blocks
+
+    def parameters(self) -> Dict[str, Any]:
+        return {"account": self.account, "min_blocks": self.min_blocks}
+
+    def check(self, data: "MonitorData") -> Optional[Alert]:
+        features = data.features
+        if features is None or self.account not in features.balance_rows:
+            return None
+        row = features.balance_rows[self.account]
+        streak = int(features.balances.falling_streak[row])
+        if streak < self.min_blocks:
+            return None
+        balance = float(features.balances.latest()[row])
+        return Alert(
+            title="Falling Balance",
+            message=f"Balance '{self.account}' has been falling for {streak} blocks (now {balance:.4f})",
+            details={
+                "account": self.account,
+                "falling_blocks": streak,
+                "balance": balance,
+                "threshold": self.min_blocks
+            },
+            key=f"trend:{self.account}",
+            value=streak,
+            threshold=self.min_blocks,
+            direction=ABOVE
+        )
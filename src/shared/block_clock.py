@@ -0,0 +1,106 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+from bittensor import AsyncSubtensor
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class BlockClock:
+    """
+    Follows the chain head with a single background task, so any number of
+    consumers can wait for (or subscribe to) new blocks without each of them
+    polling the chain on their own.
+
+    With `follow=False` the clock does not subscribe to the chain; blocks are
+    pushed in with `advance` instead (e.g. from a parent process that owns the
+    subscription).
+    """
+
+    def __init__(self, subtensor: Optional[AsyncSubtensor], retry_seconds: float = 5.0, follow: bool = True):
+        self.subtensor = subtensor
+        self.retry_seconds = retry_seconds
+        self.follow = follow
+        self.block: Optional[int] = None
+        self._condition = asyncio.Condition()
+        self._subscribers: List[Callable[[int], Awaitable[None]]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> int:
+        """
+        Reads the current block and starts following the chain head (without
+        `follow`, waits for the first pushed block). Calling it more than once is harmless.
+        """
+        if not self.follow:
+            if self.block is None:
+                await self.wait_for_block_after(-1)
+            return self.block
+        if self._task is None:
+            self.block = await self.subtensor.get_current_block()
+            self._task = asyncio.create_task(self._follow())
+        return self.block
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def subscribe(self, callback: Callable[[int], Awaitable[None]]):
+        """
+        Registers a coroutine function called with the block number every time
+        a new block lands. Callbacks run sequentially, in subscription order.
+        """
+        self._subscribers.append(callback)
+
+    async def wait_for_block_after(self, block: int, timeout: Optional[float] = None) -> int:
+        """
+        Waits until the clock has seen a block strictly greater than `block`
+        (or until `timeout` seconds pass) and returns the latest known block.
+        """
+        async with self._condition:
+            try:
+                await asyncio.wait_for(
+                    self._condition.wait_for(lambda: self.block is not None and self.block > block),
+                    timeout
+                )
+            except asyncio.TimeoutError:
+                pass
+        return self.block
+
+    async def _follow(self):
+        while True:
+            try:
+                await self.subtensor.wait_for_block()
+                block = await self.subtensor.get_current_block()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[BlockClock] Error following chain head: {e}")
+                await asyncio.sleep(self.retry_seconds)
+                continue
+
+            await self.advance(block)
+
+    async def advance(self, block: int):
+        """
+        Publishes `block` to waiters and subscribers; blocks not newer than the
+        current one are ignored.
+        """
+        if self.block is not None and block <= self.block:
+            return
+
+        self.block = block
+        async with self._condition:
+            self._condition.notify_all()
+
+        for callback in list(self._subscribers):
+            try:
+                await callback(block)
+            except Exception as e:
+                logger.error(f"[BlockClock] Subscriber error at block {block}: {e}")
@@ -0,0 +1,283 @@
+import json
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import bittensor
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class DcaJournal:
+    """
+    Write-ahead journal of a DCA plan, so a crashed `dca.py` / `tao_n.py`
+    resumes where it stopped instead of investing the whole plan again.
+
+    One JSON record per line, fsync'd before the call it describes goes on:
+
+      - plan:       the plan's parameters (and weights), written once per plan
+      - intent:     a signed stake about to be submitted (block, netuid,
+                    hotkey, amount, nonce, tx hash)
+      - done:       its outcome (block, success, tx hash, alpha after)
+      - reconciled: the outcome of an intent that had no "done" when the
+                    process died, settled once on restart from the
+                    coldkey's `account_nextIndex` and the extrinsic's events
+      - checkpoint: the running totals after each iteration, with the byte
+                    offset of its plan record
+      - finished:   the plan completed; the next run starts a new one
+
+    On restart only the tail is read: backwards from the end of the file up
+    to the last checkpoint (or plan) record, plus the plan record it points
+    to. Nothing is replayed.
+
+    An intent is written once its extrinsic is signed, so it carries the
+    nonce and tx hash. If the chain's next index for the coldkey has not
+    moved past that nonce, the extrinsic never reached the chain and is
+    retried. Otherwise its outcome is looked up by tx hash in the blocks
+    following the intent: a stake whose dispatch failed is retried too. A
+    used nonce whose extrinsic is not found (still in the pool, or a
+    transaction sent from elsewhere with that nonce) counts as landed,
+    since sending it again could invest it twice.
+    """
+
+    _CHUNK = 1 << 16
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        self._terminate_torn_line()
+        self._next_id = 0
+        self.plan_offset: Optional[int] = None
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _append(self, record: Dict[str, Any]) -> int:
+        """
+        Appends one record and makes it durable. Returns its byte offset.
+        """
+        offset = os.lseek(self._fd, 0, os.SEEK_END)
+        os.write(self._fd, (json.dumps(record, separators=(",", ":")) + "\n").encode())
+        os.fsync(self._fd)
+        return offset
+
+    def _terminate_torn_line(self):
+        # A crash mid-write can leave a line without its newline; never append onto it
+        with open(self.path, "rb") as f:
+            if f.seek(0, os.SEEK_END) == 0:
+                return
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                os.write(self._fd, b"\n")
+
+    def _read_line_at(self, offset: int) -> Dict[str, Any]:
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def _tail(self) -> List[Dict[str, Any]]:
+        """
+        Records from the last checkpoint/plan/finished record to the end of
+        the file, reading the file backwards in chunks.
+        """
+        records: List[Dict[str, Any]] = []
+        with open(self.path, "rb") as f:
+            position = f.seek(0, os.SEEK_END)
+            partial = b""
+            while position > 0:
+                size = min(self._CHUNK, position)
+                position -= size
+                f.seek(position)
+                lines = (f.read(size) + partial).split(b"\n")
+                # The first piece may be cut mid-line unless we reached the start
+                partial = lines.pop(0) if position > 0 else b""
+                for line in reversed(lines):
+                    record = self._parse(line)
+                    if record is None:
+                        continue
+                    records.append(record)
+                    if record["type"] in ("checkpoint", "plan", "finished"):
+                        return records[::-1]
+            record = self._parse(partial)
+            if record is not None:
+                records.append(record)
+        return records[::-1]
+
+    @staticmethod
+    def _parse(line: bytes) -> Optional[Dict[str, Any]]:
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            return json.loads(line)
+        except ValueError:
+            # A record torn by the crash was never acknowledged; ignore it
+            return None
+
+    async def resume(
+        self,
+        params: Dict[str, Any],
+        next_index: Callable[[], Awaitable[int]],
+        extrinsic_outcomes: Callable[[List[str], int], Awaitable[Dict[str, bool]]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Returns the progress of the unfinished plan started with the same
+        `params`, or None if there is none (then call `start`):
+
+            {"plan", "iteration", "spent", "leftover", "alpha", "partial", "staked_netuids"}
+
+        "iteration" counts checkpointed iterations. The iteration after it
+        was under way at the crash: "partial" is the TAO of it already
+        invested, in "staked_netuids", which resuming must not stake again.
+        Stakes that were in flight are settled here, once, by comparing their
+        nonce with `next_index()` (the coldkey's `account_nextIndex`) and
+        reading `extrinsic_outcomes(tx_hashes, from_block)` ({tx hash:
+        dispatch succeeded} for those found on chain).
+        """
+        tail = self._tail() if os.path.getsize(self.path) else []
+        anchor = tail[0] if tail else None
+        if anchor is None or anchor["type"] == "finished":
+            return None
+
+        if anchor["type"] == "plan":
+            plan_offset = anchor["offset"]
+            stored_plan = anchor
+            progress = {"iteration": 0, "spent": 0.0, "leftover": 0.0, "alpha": {}}
+        else:
+            plan_offset = anchor["plan_offset"]
+            stored_plan = self._read_line_at(plan_offset)
+            progress = {key: anchor[key] for key in ("iteration", "spent", "leftover", "alpha")}
+
+        if stored_plan["params"] != json.loads(json.dumps(params)):
+            logger.warning(f"[DcaJournal] {self.path} holds an unfinished plan with other parameters; starting a new plan.")
+            return None
+
+        self.plan_offset = plan_offset
+        self._next_id = max([anchor.get("next_id", 0)] + [record["id"] + 1 for record in tail if "id" in record])
+        intents = {record["id"]: record for record in tail if record["type"] == "intent"}
+        settled = {record["id"]: record for record in tail if record["type"] in ("done", "reconciled")}
+
+        in_flight = [intent for intent_id, intent in intents.items() if intent_id not in settled]
+        if in_flight:
+            chain_next = await next_index()
+            used = [intent for intent in in_flight if chain_next > intent["nonce"]]
+            outcomes = {}
+            if used:
+                outcomes = await extrinsic_outcomes(
+                    [intent["tx_hash"] for intent in used], min(intent["block"] for intent in used)
+                )
+            for intent in in_flight:
+                settled[intent["id"]] = self._reconcile(intent, chain_next, outcomes.get(intent["tx_hash"]))
+
+        partial = 0.0
+        staked_netuids = []
+        for intent_id, intent in intents.items():
+            outcome = settled[intent_id]
+            if outcome["success"]:
+                partial += intent["amount"]
+                staked_netuids.append(intent["netuid"])
+                if outcome.get("alpha_after") is not None:
+                    progress["alpha"][str(intent["netuid"])] = outcome["alpha_after"]
+
+        progress["plan"] = stored_plan
+        progress["partial"] = partial
+        progress["staked_netuids"] = staked_netuids
+        progress["alpha"] = {int(netuid): alpha for netuid, alpha in progress["alpha"].items()}
+        logger.info(
+            f"[DcaJournal] Resuming after iteration {progress['iteration']}: "
+            f"{progress['spent'] + partial:.9f} TAO already invested."
+        )
+        return progress
+
+    def _reconcile(self, intent: Dict[str, Any], chain_next: int, dispatched: Optional[bool]) -> Dict[str, Any]:
+        """
+        `dispatched` is the extrinsic's outcome if it was found on chain, None otherwise.
+        """
+        if chain_next <= intent["nonce"]:
+            success, verdict = False, "nonce unused, not on chain; will be retried"
+        elif dispatched is None:
+            success, verdict = True, "nonce used but the extrinsic was not found; counted as landed, unverified"
+        elif dispatched:
+            success, verdict = True, "included and succeeded"
+        else:
+            success, verdict = False, "included but failed; will be retried"
+        record = {
+            "type": "reconciled",
+            "id": intent["id"],
+            "netuid": intent["netuid"],
+            "success": success,
+            "verified": dispatched is not None,
+            "nonce": intent["nonce"],
+            "chain_next": chain_next
+        }
+        self._append(record)
+        logger.info(
+            f"[DcaJournal] Stake #{intent['id']} of {intent['amount']:.9f} TAO into netuid={intent['netuid']} "
+            f"(nonce {intent['nonce']}, tx {intent['tx_hash']}) was in flight at the crash: {verdict}."
+        )
+        return record
+
+    def start(self, params: Dict[str, Any], **extra):
+        """
+        Starts a new plan; `extra` (e.g. the weights) is stored with it and
+        returned as part of `resume(...)["plan"]`.
+        """
+        offset = os.lseek(self._fd, 0, os.SEEK_END)
+        self.plan_offset = self._append({"type": "plan", "offset": offset, "params": params, **extra})
+        self._next_id = 0
+
+    def intent(
+        self,
+        block: int,
+        netuid: int,
+        hotkey: str,
+        amount: float,
+        nonce: int,
+        tx_hash: str
+    ) -> int:
+        """
+        Records a signed stake before it is submitted. Returns the id to pass to `done`.
+        """
+        intent_id = self._next_id
+        self._next_id += 1
+        self._append({
+            "type": "intent",
+            "id": intent_id,
+            "block": block,
+            "netuid": netuid,
+            "hotkey": hotkey,
+            "amount": amount,
+            "nonce": nonce,
+            "tx_hash": tx_hash
+        })
+        return intent_id
+
+    def done(self, intent_id: int, block: int, netuid: int, success: bool, tx_hash: Optional[str], alpha_after: float):
+        self._append({
+            "type": "done",
+            "id": intent_id,
+            "block": block,
+            "netuid": netuid,
+            "success": bool(success),
+            "tx_hash": tx_hash,
+            "alpha_after": alpha_after
+        })
+
+    def checkpoint(self, iteration: int, spent: float, leftover: float, alpha: Dict[int, bittensor.Balance]):
+        self._append({
+            "type": "checkpoint",
+            "plan_offset": self.plan_offset,
+            "iteration": iteration,
+            "next_id": self._next_id,
+            "spent": spent,
+            "leftover": leftover,
+            "alpha": {str(netuid): float(balance.tao) for netuid, balance in alpha.items()}
+        })
+
+    def finish(self):
+        self._append({"type": "finished", "plan_offset": self.plan_offset})
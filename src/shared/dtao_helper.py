@@ -1,8 +1,71 @@
 # dtao_helper.py
 
 import bittensor
-from typing import Union, Optional
+from dataclasses import dataclass
+from typing import Dict, List, Union, Optional
 from bittensor import AsyncSubtensor
+from bittensor.core.chain_data import StakeInfo
+from bittensor.core.chain_data.utils import decode_account_id
+
+
+@dataclass
+class StakeEvent:
+    """
+    One stake movement of a coldkey in a block, from a SubtensorModule event.
+    `alpha` is signed: positive when stake was added to (hotkey, netuid),
+    negative when it left it. A move or transfer yields two StakeEvents.
+    """
+    block: int
+    event_id: str
+    coldkey_ss58: str
+    hotkey_ss58: str
+    netuid: int
+    alpha: bittensor.Balance
+    extrinsic_idx: Optional[int] = None
+
+
+STAKE_EVENT_IDS = ("StakeAdded", "StakeRemoved", "StakeMoved", "StakeTransferred", "StakeSwapped")
+
+
+def _ss58(account) -> str:
+    return account if isinstance(account, str) else decode_account_id(account)
+
+
+def _parse_stake_event(block: int, event_id: str, attributes, extrinsic_idx: Optional[int]) -> List[StakeEvent]:
+    """
+    Maps one SubtensorModule event to StakeEvents. Layouts follow the dTAO runtime:
+      StakeAdded/StakeRemoved(coldkey, hotkey, tao, alpha, netuid)
+      StakeMoved(coldkey, origin_hotkey, origin_netuid, destination_hotkey, destination_netuid, amount)
+      StakeTransferred(origin_coldkey, destination_coldkey, hotkey, origin_netuid, destination_netuid, amount)
+      StakeSwapped(coldkey, hotkey, origin_netuid, destination_netuid, amount)
+    Moves only report one amount, which is exact for root (netuid 0) where alpha is TAO.
+    Attributes may be decoded as a sequence or as a dict of named fields (in
+    declaration order). A stake event in any other layout raises ValueError
+    rather than being skipped, since a missed event would be counted as dividends.
+    """
+    if isinstance(attributes, dict):
+        a = list(attributes.values())
+    elif isinstance(attributes, (list, tuple)):
+        a = list(attributes)
+    else:
+        a = []
+
+    def event(coldkey, hotkey, netuid, rao) -> StakeEvent:
+        return StakeEvent(block, event_id, _ss58(coldkey), _ss58(hotkey), int(netuid), bittensor.Balance.from_rao(int(rao)), extrinsic_idx)
+
+    if event_id == "StakeAdded" and len(a) >= 5:
+        return [event(a[0], a[1], a[4], a[3])]
+    if event_id == "StakeRemoved" and len(a) >= 5:
+        return [event(a[0], a[1], a[4], -int(a[3]))]
+    if event_id == "StakeMoved" and len(a) >= 6:
+        return [event(a[0], a[1], a[2], -int(a[5])), event(a[0], a[3], a[4], a[5])]
+    if event_id == "StakeTransferred" and len(a) >= 6:
+        return [event(a[0], a[2], a[3], -int(a[5])), event(a[1], a[2], a[4], a[5])]
+    if event_id == "StakeSwapped" and len(a) >= 5:
+        return [event(a[0], a[1], a[2], -int(a[4])), event(a[0], a[1], a[3], a[4])]
+    if event_id in STAKE_EVENT_IDS:
+        raise ValueError(f"unexpected attributes {attributes!r}")
+    return []
 
 
 class DTAOHelper:
@@ -55,6 +118,37 @@ class DTAOHelper:
             netuid=netuid
         )
 
+    async def get_stake_info_for_coldkeys(
+        self,
+        coldkey_ss58_list: List[str],
+        block: Optional[int] = None
+    ) -> Dict[str, List[StakeInfo]]:
+        """
+        Returns {coldkey_ss58: [StakeInfo, ...]} for many coldkeys from a single
+        runtime API call, instead of one get_stake_info_for_coldkey per wallet.
+        """
+        if not coldkey_ss58_list:
+            return {}
+
+        batched = getattr(self.subtensor, "get_stake_info_for_coldkeys", None)
+        if batched is not None:
+            result = await batched(coldkey_ss58_list=coldkey_ss58_list, block=block)
+            return result or {}
+
+        result = await self.subtensor.query_runtime_api(
+            runtime_api="StakeInfoRuntimeApi",
+            method="get_stake_info_for_coldkeys",
+            params=[coldkey_ss58_list],
+            block=block
+        )
+        if result is None:
+            return {}
+
+        return {
+            decode_account_id(coldkey): [s for s in StakeInfo.list_from_dicts(stake_infos) if s.stake > 0]
+            for coldkey, stake_infos in result
+        }
+
     async def all_subnets(
         self,
         block_number: Optional[int] = None
@@ -72,10 +166,62 @@ class DTAOHelper:
     async def get_balance(
         self,
         address: str,
+        block: Optional[int] = None
     ) -> bittensor.Balance:
-        addresses_balances_dict = await self.subtensor.get_balance(address)
+        addresses_balances_dict = await self.subtensor.get_balance(address, block=block)
         return addresses_balances_dict
 
+    async def get_balances(
+        self,
+        addresses: List[str],
+        block: Optional[int] = None,
+        block_hash: Optional[str] = None
+    ) -> Dict[str, bittensor.Balance]:
+        """
+        Returns {address: free balance} for many addresses from one batched
+        storage query. Pass `block_hash` when making several calls for the
+        same block to skip resolving it each time.
+        """
+        if not addresses:
+            return {}
+        # AsyncSubtensor.get_balances only honours block_hash, not block
+        if block_hash is None and block is not None:
+            block_hash = await self.subtensor.get_block_hash(block)
+        return await self.subtensor.get_balances(*addresses, block_hash=block_hash)
+
+    async def get_stake_events(
+        self,
+        block: int,
+        coldkey_ss58: Optional[str] = None,
+        hotkeys: Optional[List[str]] = None
+    ) -> List[StakeEvent]:
+        """
+        Stake movements in `block` from one System.Events read, optionally
+        filtered to a coldkey and/or hotkeys.
+
+        Subtensor emits no event when emission or root dividends are credited
+        to a delegator, so dividends are the stake change that these events do
+        not explain. A stake event that cannot be parsed raises ValueError:
+        skipping it would make that stake change look like dividends.
+        """
+        block_hash = await self.subtensor.get_block_hash(block)
+        stake_events = []
+        for record in await self.subtensor.substrate.get_events(block_hash=block_hash):
+            event = record["event"]
+            if event["module_id"] != "SubtensorModule":
+                continue
+            try:
+                parsed = _parse_stake_event(block, event["event_id"], event["attributes"], record.get("extrinsic_idx"))
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Could not parse {event['event_id']} in block {block}: {e}") from e
+            for stake_event in parsed:
+                if coldkey_ss58 is not None and stake_event.coldkey_ss58 != coldkey_ss58:
+                    continue
+                if hotkeys is not None and stake_event.hotkey_ss58 not in hotkeys:
+                    continue
+                stake_events.append(stake_event)
+        return stake_events
+
     async def metagraph(
         self,
         netuid: int,
@@ -3,8 +3,11 @@ import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.image import MIMEImage
+from email.utils import formataddr
 import logging
 import os
+import threading
+import time
 from dotenv import load_dotenv
 import ssl
 
@@ -12,18 +15,97 @@ load_dotenv()
 
 
 class EmailSender:
-    def __init__(self):
+    """
+    Sends HTML emails over one long-lived SMTP_SSL session.
+
+    The session is opened on first use, health-checked with NOOP once it has
+    been idle for a while, and re-opened (once per send) if the server dropped
+    it. A message is built and serialized once, then reused for every
+    recipient. The session is guarded by a lock, so worker threads can share
+    one sender.
+    """
+
+    def __init__(self, idle_check_seconds: float = 60.0):
         self.from_email = os.getenv("EMAIL_USER")
         self.from_password = os.getenv("EMAIL_PASS")
+        self.from_name = os.getenv("SMTP_FROM_NAME")
+        self.host = os.getenv("SMTP_HOST") or os.getenv("EMAIL_SERVER")
+        self.port = int(os.getenv("SMTP_PORT") or os.getenv("EMAIL_PORT") or 465)
+        self.idle_check_seconds = idle_check_seconds
 
         if not self.from_email or not self.from_password:
             raise ValueError("EMAIL_USER and EMAIL_PASS must be set in the environment.")
 
+        self._server = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        context = ssl.create_default_context()
+        server = smtplib.SMTP_SSL(self.host, self.port, context=context)
+        server.login(self.from_email, self.from_password)
+        logging.info("SMTP server login successful.")
+        self._server = server
+
+    def _session(self):
+        if self._server is not None and time.monotonic() - self._last_used > self.idle_check_seconds:
+            try:
+                status, _ = self._server.noop()
+                if status != 250:
+                    self._drop_session()
+            except OSError:  # includes smtplib.SMTPException
+                self._drop_session()
+        if self._server is None:
+            self._connect()
+        return self._server
+
+    def _drop_session(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+        self._server = None
+
+    def close(self):
+        with self._lock:
+            self._drop_session()
+
+    def build_message(self, subject, html_message, attachments=None, from_email=None) -> MIMEMultipart:
+        """
+        Builds the MIME message once, without a To header.
+
+        attachments: A list of tuples like [('image1', image_bytes)] where 'image1'
+                     is the CID (Content-ID) and image_bytes are the binary content.
+        """
+        sender = from_email or self.from_email
+        msg = MIMEMultipart('related')
+        msg["From"] = formataddr((self.from_name, sender)) if self.from_name and not from_email else sender
+        msg["Subject"] = subject
+
+        # Create alternative MIME part for HTML
+        alternative_part = MIMEMultipart('alternative')
+        msg.attach(alternative_part)
+
+        # HTML part
+        html_part = MIMEText(html_message, "html")
+        alternative_part.attach(html_part)
+
+        # Attach images or other attachments if provided
+        if attachments:
+            for cid, content in attachments:
+                image = MIMEImage(content)
+                image.add_header('Content-ID', f'<{cid}>')
+                msg.attach(image)
+
+        return msg
+
     def send_email(self, to_emails, subject, html_message, attachments=None, from_email=None):
         """
-        Send an email with optional attachments.
+        Send an email with optional attachments, one copy per recipient, over
+        the shared SMTP session.
 
-        attachments: A list of tuples like [('image1', image_bytes)] where 'image1' 
+        attachments: A list of tuples like [('image1', image_bytes)] where 'image1'
                      is the CID (Content-ID) and image_bytes are the binary content.
         """
         if not to_emails:
@@ -31,38 +113,36 @@ class EmailSender:
             return
 
         logging.info(f"Attempting to send email to: {', '.join(to_emails)}")
-        context = ssl.create_default_context()
 
-        try:
-            with smtplib.SMTP_SSL(os.getenv("EMAIL_SERVER"), os.getenv("EMAIL_PORT"), context=context) as server:
-                server.login(self.from_email, self.from_password)
-                logging.info("SMTP server login successful.")
-
-                for recipient in to_emails:
-                    msg = MIMEMultipart('related')
-                    msg["From"] = self.from_email if not from_email else from_email
-                    msg["To"] = recipient
-                    msg["Subject"] = subject
-
-                    # Create alternative MIME part for HTML
-                    alternative_part = MIMEMultipart('alternative')
-                    msg.attach(alternative_part)
-
-                    # HTML part
-                    html_part = MIMEText(html_message, "html")
-                    alternative_part.attach(html_part)
-
-                    # Attach images or other attachments if provided
-                    if attachments:
-                        for cid, content in attachments:
-                            image = MIMEImage(content)
-                            image.add_header('Content-ID', f'<{cid}>')
-                            msg.attach(image)
-
-                    server.sendmail(self.from_email, recipient, msg.as_string())
-                    logging.info(f"Email sent successfully to {recipient}")
-
-        except smtplib.SMTPException as smtp_error:
-            logging.error(f"SMTP error occurred: {smtp_error}")
-        except Exception as e:
-            logging.error(f"An error occurred while sending emails: {e}")
+        # Serialized once; each recipient only gets its own To header prepended
+        body = self.build_message(subject, html_message, attachments, from_email).as_string()
+
+        with self._lock:
+            for recipient in to_emails:
+                recipient = recipient.strip()
+                if "\r" in recipient or "\n" in recipient:
+                    # Would inject headers into the raw message below
+                    logging.error(f"Skipping recipient with a line break in its address: {recipient!r}")
+                    continue
+                message = f"To: {recipient}\n{body}"
+                for attempt in range(2):
+                    try:
+                        self._session().sendmail(self.from_email, recipient, message)
+                        self._last_used = time.monotonic()
+                        logging.info(f"Email sent successfully to {recipient}")
+                        break
+                    except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError) as conn_error:
+                        self._drop_session()
+                        if attempt == 1:
+                            logging.error(f"SMTP connection failed while sending to {recipient}: {conn_error}")
+                    except smtplib.SMTPException as smtp_error:
+                        logging.error(f"SMTP error occurred: {smtp_error}")
+                        break
+                    except OSError as conn_error:
+                        # Socket/TLS level failure: reconnect and retry once
+                        self._drop_session()
+                        if attempt == 1:
+                            logging.error(f"SMTP connection failed while sending to {recipient}: {conn_error}")
+                    except Exception as e:
+                        logging.error(f"An error occurred while sending emails: {e}")
+                        break
@@ -0,0 +1,191 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+import bittensor
+from bittensor import AsyncSubtensor
+from bittensor.utils import format_error_message
+from async_substrate_interface.errors import SubstrateRequestException
+
+from src.shared.nonce_manager import NonceManager
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class ExtrinsicSigner:
+    """
+    Signs and submits extrinsics with the sr25519 signature computed in a
+    thread pool, so gathering dozens of stakes does not serialize their
+    signing on the event loop thread.
+
+    Per extrinsic: the nonce comes from a NonceManager (concurrent submissions
+    get consecutive nonces), the signature payload is SCALE-encoded on the
+    loop (it awaits cached genesis/era block hashes on the connection), the
+    keypair signs it in the executor, and the extrinsic is assembled with the
+    precomputed signature.
+
+    `signing_seconds` (wall time in the executor, queueing included) and
+    `encoding_seconds` (payload and extrinsic encoding on the loop) are
+    tracked separately.
+    """
+
+    def __init__(
+        self,
+        subtensor: AsyncSubtensor,
+        max_workers: int = 4,
+        nonces: Optional[NonceManager] = None
+    ):
+        self.subtensor = subtensor
+        self.nonces = nonces if nonces is not None else NonceManager()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="signer")
+        self.signed = 0
+        self.signing_seconds = 0.0
+        self.max_signing_seconds = 0.0
+        self.encoding_seconds = 0.0
+
+    @property
+    def substrate(self):
+        return self.subtensor.substrate
+
+    def metrics(self) -> Dict[str, float]:
+        return {
+            "signed": self.signed,
+            "signing_seconds": self.signing_seconds,
+            "avg_signing_ms": 1000 * self.signing_seconds / self.signed if self.signed else 0.0,
+            "max_signing_ms": 1000 * self.max_signing_seconds,
+            "encoding_seconds": self.encoding_seconds,
+        }
+
+    async def _sign_in_executor(self, keypair, payload) -> bytes:
+        start = time.perf_counter()
+        signature = await asyncio.get_running_loop().run_in_executor(self.executor, keypair.sign, payload)
+        elapsed = time.perf_counter() - start
+        self.signed += 1
+        self.signing_seconds += elapsed
+        self.max_signing_seconds = max(self.max_signing_seconds, elapsed)
+        return signature
+
+    async def create_signed_extrinsic(self, call, keypair, nonce: int, period: Optional[int] = None):
+        era = None
+        if period is not None:
+            finalized = await self.substrate.get_chain_finalised_head()
+            era = {"period": period, "current": await self.substrate.get_block_number(finalized)}
+
+        start = time.perf_counter()
+        payload = await self.substrate.generate_signature_payload(call=call, era=era, nonce=nonce)
+        self.encoding_seconds += time.perf_counter() - start
+
+        signature = await self._sign_in_executor(keypair, payload)
+
+        start = time.perf_counter()
+        extrinsic = await self.substrate.create_signed_extrinsic(
+            call=call, keypair=keypair, era=era, nonce=nonce, signature=signature
+        )
+        self.encoding_seconds += time.perf_counter() - start
+        return extrinsic
+
+    async def sign_and_send_extrinsic(
+        self,
+        call,
+        wallet: bittensor.wallet,
+        wait_for_inclusion: bool = True,
+        wait_for_finalization: bool = False,
+        sign_with: str = "coldkey",
+        period: Optional[int] = None
+    ) -> Tuple[bool, str]:
+        success, error, _ = await self._submit(call, wallet, wait_for_inclusion, wait_for_finalization, sign_with, period)
+        return success, error
+
+    async def _submit(
+        self,
+        call,
+        wallet: bittensor.wallet,
+        wait_for_inclusion: bool,
+        wait_for_finalization: bool,
+        sign_with: str,
+        period: Optional[int],
+        on_signed: Optional[Callable[[int, str], None]] = None
+    ) -> Tuple[bool, str, Optional[str]]:
+        keypair = getattr(wallet, sign_with)
+        address = keypair.ss58_address
+        nonce = await self.nonces.next_nonce(address, self.substrate)
+        extrinsic_hash = None
+
+        try:
+            extrinsic = await self.create_signed_extrinsic(call, keypair, nonce, period=period)
+            extrinsic_hash = f"0x{extrinsic.extrinsic_hash.hex()}"
+            if on_signed is not None:
+                on_signed(nonce, extrinsic_hash)
+            response = await self.substrate.submit_extrinsic(
+                extrinsic,
+                wait_for_inclusion=wait_for_inclusion,
+                wait_for_finalization=wait_for_finalization
+            )
+            if not wait_for_finalization and not wait_for_inclusion:
+                return True, "", extrinsic_hash
+            if await response.is_success:
+                return True, "", extrinsic_hash
+            error = format_error_message(await response.error_message)
+        except SubstrateRequestException as e:
+            error = format_error_message(e)
+        except BaseException:
+            # Connection drops, timeouts, encoding errors, cancellation: the nonce may be unused
+            self.nonces.invalidate(address)
+            raise
+
+        # A rejected or failed extrinsic may leave the local nonce ahead of the chain
+        self.nonces.invalidate(address)
+        return False, error, extrinsic_hash
+
+    async def stake(
+        self,
+        wallet: bittensor.wallet,
+        call_function: str,
+        hotkey_ss58: str,
+        netuid: int,
+        amount: bittensor.Balance,
+        wait_for_inclusion: bool = True,
+        wait_for_finalization: bool = False
+    ) -> bool:
+        """
+        Submits SubtensorModule.add_stake or remove_stake signed by the coldkey.
+        """
+        success, _ = await self.stake_with_hash(
+            wallet, call_function, hotkey_ss58, netuid, amount, wait_for_inclusion, wait_for_finalization
+        )
+        return success
+
+    async def stake_with_hash(
+        self,
+        wallet: bittensor.wallet,
+        call_function: str,
+        hotkey_ss58: str,
+        netuid: int,
+        amount: bittensor.Balance,
+        wait_for_inclusion: bool = True,
+        wait_for_finalization: bool = False,
+        on_signed: Optional[Callable[[int, str], None]] = None
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Like `stake`, but also returns the extrinsic hash ("0x...", None if it
+        was never signed) so callers can journal it. `on_signed(nonce, hash)`
+        runs between signing and submitting; if it raises, nothing is sent.
+        """
+        amount_param = "amount_staked" if call_function == "add_stake" else "amount_unstaked"
+        call = await self.substrate.compose_call(
+            call_module="SubtensorModule",
+            call_function=call_function,
+            call_params={"hotkey": hotkey_ss58, amount_param: amount.rao, "netuid": netuid}
+        )
+        success, error, extrinsic_hash = await self._submit(
+            call, wallet, wait_for_inclusion, wait_for_finalization, "coldkey", None, on_signed
+        )
+        if not success:
+            logger.error(f"[ExtrinsicSigner] {call_function} on netuid={netuid} failed: {error}")
+        return success, extrinsic_hash
+
+    def close(self):
+        self.executor.shutdown(wait=False)
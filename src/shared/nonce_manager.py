@@ -0,0 +1,45 @@
+import asyncio
+import time
+from typing import Dict
+
+
+class NonceManager:
+    """
+    Hands out account nonces locally, one per extrinsic, so several
+    strategies signing with the same coldkey can submit in the same block
+    without racing on `account_nextIndex`.
+
+    The first nonce of an account is read from the chain (which already
+    counts transactions waiting in the pool); after a failed submission call
+    `invalidate` so the next one re-syncs instead of leaving a gap.
+
+    Transactions sent from elsewhere with the same coldkey (btcli, another
+    script) move the chain ahead of the local counter, so once the counter is
+    older than `max_age_seconds` (about a block) the chain is asked again and
+    the larger of the two is used.
+    """
+
+    def __init__(self, max_age_seconds: float = 12.0):
+        self.max_age_seconds = max_age_seconds
+        self._next: Dict[str, int] = {}
+        self._synced_at: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.resyncs = 0
+
+    async def next_nonce(self, address: str, substrate) -> int:
+        lock = self._locks.setdefault(address, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            if address not in self._next or now - self._synced_at[address] >= self.max_age_seconds:
+                response = await substrate.rpc_request("account_nextIndex", [address])
+                chain_next = int(response["result"])
+                if chain_next > self._next.get(address, -1):
+                    self._next[address] = chain_next
+                    self.resyncs += 1
+                self._synced_at[address] = now
+            nonce = self._next[address]
+            self._next[address] = nonce + 1
+            return nonce
+
+    def invalidate(self, address: str):
+        self._next.pop(address, None)
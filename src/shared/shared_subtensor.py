@@ -0,0 +1,175 @@
+import asyncio
+from typing import Dict, List, Optional, Union
+
+import bittensor
+from bittensor.core.chain_data import DynamicInfo, StakeInfo
+
+from src.shared.block_clock import BlockClock
+from src.shared.extrinsic_signer import ExtrinsicSigner
+from src.shared.nonce_manager import NonceManager
+from src.shared.stake_info_cache import StakeInfoCache
+from src.shared.subnet_snapshot import SubnetSnapshot
+from src.shared.subtensor_pool import SubtensorPool
+
+
+class SharedSubtensor:
+    """
+    Stands in for an AsyncSubtensor so existing strategies (InvestmentManager,
+    TaoN, SubnetStaker, DividendHarvester) can run side by side in one process
+    while sharing the chain cost:
+
+    - reads are spread over a SubtensorPool,
+    - `get_current_block` / `wait_for_block` come from one BlockClock,
+    - `all_subnets` / `subnet` are served from one all_subnets() call per block,
+    - `get_stake` and batched stake infos come from one StakeInfoCache query per block,
+    - extrinsics are signed on one connection with nonces from a shared NonceManager,
+      so strategies using the same coldkey can submit in the same block, and
+      their signatures are computed in an ExtrinsicSigner thread pool.
+
+    Anything else is forwarded to a pooled connection.
+    """
+
+    def __init__(
+        self,
+        pool: SubtensorPool,
+        clock: BlockClock,
+        stake_cache: StakeInfoCache,
+        nonces: Optional[NonceManager] = None,
+        signing_workers: int = 4
+    ):
+        self.pool = pool
+        self.clock = clock
+        self.stake_cache = stake_cache
+        self.nonces = nonces if nonces is not None else NonceManager()
+        # Extrinsics are composed and signed on one connection (one metadata/runtime view)
+        self.signer = pool.connections[0]
+        self.extrinsics = ExtrinsicSigner(self.signer, max_workers=signing_workers, nonces=self.nonces)
+        self._subnets: Dict[int, List[DynamicInfo]] = {}
+        self._snapshots: Dict[int, SubnetSnapshot] = {}
+        self._subnets_lock = asyncio.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.pool.get(), name)
+
+    @property
+    def substrate(self):
+        return self.signer.substrate
+
+    async def _block(self) -> int:
+        if self.clock.block is None:
+            await self.clock.start()
+        return self.clock.block
+
+    async def get_current_block(self) -> int:
+        return await self._block()
+
+    async def wait_for_block(self, block: Optional[int] = None) -> bool:
+        target = (await self._block()) + 1 if block is None else block
+        while self.clock.block < target:
+            await self.clock.wait_for_block_after(target - 1)
+        return True
+
+    async def all_subnets(self, block_number: Optional[int] = None) -> List[DynamicInfo]:
+        block = block_number if block_number is not None else await self._block()
+        async with self._subnets_lock:
+            if block not in self._subnets:
+                self._subnets[block] = await self.pool.get().all_subnets(block) or []
+                # Keep the latest couple of blocks only
+                for old in sorted(self._subnets)[:-2]:
+                    del self._subnets[old]
+                    self._snapshots.pop(old, None)
+            return self._subnets[block]
+
+    async def snapshot(self, block_number: Optional[int] = None) -> SubnetSnapshot:
+        block = block_number if block_number is not None else await self._block()
+        subnets = await self.all_subnets(block)
+        if block not in self._snapshots:
+            self._snapshots[block] = SubnetSnapshot.from_dynamic_info(subnets, block=block)
+        return self._snapshots[block]
+
+    async def subnet(self, netuid: int, block_number: Optional[int] = None) -> Optional[DynamicInfo]:
+        for subnet_info in await self.all_subnets(block_number):
+            if subnet_info.netuid == netuid:
+                return subnet_info
+        return None
+
+    async def get_stake_info_for_coldkeys(
+        self,
+        coldkey_ss58_list: List[str],
+        block: Optional[int] = None
+    ) -> Dict[str, List[StakeInfo]]:
+        block = block if block is not None else await self._block()
+        stakes = await asyncio.gather(*[self.stake_cache.get(coldkey, block) for coldkey in coldkey_ss58_list])
+        return dict(zip(coldkey_ss58_list, stakes))
+
+    async def get_stake(
+        self,
+        coldkey_ss58: str,
+        hotkey_ss58: str,
+        netuid: int,
+        block: Optional[int] = None,
+        **kwargs
+    ) -> bittensor.Balance:
+        block = block if block is not None else await self._block()
+        stake = bittensor.Balance.from_rao(0)
+        for stake_info in await self.stake_cache.get(coldkey_ss58, block):
+            if stake_info.netuid == netuid and stake_info.hotkey_ss58 == hotkey_ss58:
+                stake += stake_info.stake
+        return stake.set_unit(netuid)
+
+    async def sign_and_send_extrinsic(
+        self,
+        call,
+        wallet: bittensor.wallet,
+        wait_for_inclusion: bool = True,
+        wait_for_finalization: bool = False,
+        sign_with: str = "coldkey",
+        use_nonce: bool = False,
+        period: Optional[int] = None,
+        nonce_key: str = "hotkey"
+    ) -> tuple:
+        """
+        Same contract as AsyncSubtensor.sign_and_send_extrinsic, but the nonce
+        always comes from the shared NonceManager (keyed by the signing account)
+        and the signature is computed off the event loop.
+        """
+        return await self.extrinsics.sign_and_send_extrinsic(
+            call,
+            wallet,
+            wait_for_inclusion=wait_for_inclusion,
+            wait_for_finalization=wait_for_finalization,
+            sign_with=sign_with,
+            period=period
+        )
+
+    async def add_stake(
+        self,
+        wallet: bittensor.wallet,
+        hotkey_ss58: str,
+        netuid: int,
+        amount: Union[bittensor.Balance, float],
+        **kwargs
+    ) -> bool:
+        if not isinstance(amount, bittensor.Balance):
+            amount = bittensor.Balance.from_tao(amount)
+        return await self.extrinsics.stake(
+            wallet, "add_stake", hotkey_ss58, netuid, amount,
+            wait_for_inclusion=kwargs.get("wait_for_inclusion", True),
+            wait_for_finalization=kwargs.get("wait_for_finalization", False)
+        )
+
+    async def unstake(
+        self,
+        wallet: bittensor.wallet,
+        hotkey_ss58: str,
+        netuid: int,
+        amount: Union[bittensor.Balance, float],
+        **kwargs
+    ) -> bool:
+        if not isinstance(amount, bittensor.Balance):
+            amount = bittensor.Balance.from_tao(amount)
+        return await self.extrinsics.stake(
+            wallet, "remove_stake", hotkey_ss58, netuid, amount,
+            wait_for_inclusion=kwargs.get("wait_for_inclusion", True),
+            wait_for_finalization=kwargs.get("wait_for_finalization", False)
+        )
@@ -0,0 +1,129 @@
+import inspect
+import logging
+from typing import Awaitable, Callable, List, Optional, Union
+
+import numpy as np
+
+from src.shared.subnet_snapshot import SubnetSnapshot
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def _padded(array: np.ndarray, size: int) -> np.ndarray:
+    if len(array) >= size:
+        return array
+    return np.concatenate([array, np.zeros(size - len(array), dtype=array.dtype)])
+
+
+class SnapshotDelta:
+    """
+    What changed between two consecutive subnet snapshots, as boolean masks
+    indexed by netuid. `previous_block` is None for the first snapshot, in
+    which case every present subnet counts as added.
+    """
+
+    __slots__ = ("block", "previous_block", "price", "reserves", "owner", "added", "removed")
+
+    def __init__(self, block: Optional[int], previous_block: Optional[int], size: int):
+        self.block = block
+        self.previous_block = previous_block
+        self.price = np.zeros(size, dtype=bool)
+        self.reserves = np.zeros(size, dtype=bool)
+        self.owner = np.zeros(size, dtype=bool)
+        self.added = np.zeros(size, dtype=bool)
+        self.removed = np.zeros(size, dtype=bool)
+
+    @property
+    def mask(self) -> np.ndarray:
+        return self.price | self.reserves | self.owner | self.added | self.removed
+
+    @property
+    def changed(self) -> np.ndarray:
+        """
+        Netuids with any change, in ascending order.
+        """
+        return np.flatnonzero(self.mask)
+
+    def __contains__(self, netuid: int) -> bool:
+        return 0 <= netuid < len(self.price) and bool(self.mask[netuid])
+
+    def __len__(self) -> int:
+        return int(self.mask.sum())
+
+
+def diff_snapshots(
+    previous: Optional[SubnetSnapshot],
+    current: SubnetSnapshot,
+    rel_tolerance: float = 0.0
+) -> SnapshotDelta:
+    """
+    Compares two snapshots column-wise. Price and reserve moves smaller than
+    `rel_tolerance` (relative to the previous value) are ignored.
+    """
+    size = len(current.present) if previous is None else max(len(current.present), len(previous.present))
+    delta = SnapshotDelta(current.block, previous.block if previous is not None else None, size)
+    now_present = _padded(current.present, size)
+    if previous is None:
+        delta.added = now_present.copy()
+        return delta
+
+    was_present = _padded(previous.present, size)
+    both = was_present & now_present
+    delta.added = now_present & ~was_present
+    delta.removed = was_present & ~now_present
+
+    def moved(column: str) -> np.ndarray:
+        old = _padded(getattr(previous, column), size)
+        new = _padded(getattr(current, column), size)
+        return both & (np.abs(new - old) > rel_tolerance * np.abs(old))
+
+    delta.price = moved("price")
+    delta.reserves = moved("tao_in") | moved("alpha_in") | moved("alpha_out")
+    # Ids from different hotkey tables are not comparable: compare the hotkeys then
+    if previous.hotkeys is current.hotkeys:
+        delta.owner = both & (_padded(previous.owner_id, size) != _padded(current.owner_id, size))
+    else:
+        for netuid in np.flatnonzero(both):
+            delta.owner[netuid] = previous.owner_hotkey(netuid) != current.owner_hotkey(netuid)
+    return delta
+
+
+DeltaCallback = Callable[[SubnetSnapshot, SnapshotDelta], Union[None, Awaitable[None]]]
+
+
+class SnapshotDiffer:
+    """
+    Diffs every published snapshot against the previous one and hands the
+    delta to its subscribers, so they only redo work for subnets that changed.
+    Publishing the same block twice is a no-op.
+    """
+
+    def __init__(self, rel_tolerance: float = 0.0):
+        self.rel_tolerance = rel_tolerance
+        self.previous: Optional[SubnetSnapshot] = None
+        self.last_delta: Optional[SnapshotDelta] = None
+        self._subscribers: List[DeltaCallback] = []
+
+    def subscribe(self, callback: DeltaCallback):
+        """
+        Registers a function (plain or coroutine) called with (snapshot, delta)
+        for every new snapshot. Callbacks run sequentially, in subscription order.
+        """
+        self._subscribers.append(callback)
+
+    async def publish(self, snapshot: SubnetSnapshot) -> SnapshotDelta:
+        if self.previous is not None and snapshot.block is not None and snapshot.block == self.previous.block:
+            return self.last_delta
+
+        delta = diff_snapshots(self.previous, snapshot, self.rel_tolerance)
+        self.previous = snapshot
+        self.last_delta = delta
+        for callback in self._subscribers:
+            try:
+                result = callback(snapshot, delta)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"[SnapshotDiffer] Subscriber {getattr(callback, '__qualname__', callback)} failed: {e}")
+        return delta
@@ -0,0 +1,111 @@
+import asyncio
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from bittensor.core.chain_data import StakeInfo
+
+from src.shared.dtao_helper import DTAOHelper
+from src.shared.subtensor_pool import SubtensorPool
+
+
+class StakeInfoCache:
+    """
+    Holds the StakeInfo list of every registered coldkey for the latest block.
+    A refresh covers all registered coldkeys with one batched query, so the
+    cost per block does not grow with the number of wallets being served.
+
+    Coldkeys registered explicitly stay for good. Coldkeys that are only
+    registered by `get` (e.g. a web client asking for an arbitrary address)
+    are ad hoc: they are dropped once unused for `adhoc_ttl_blocks`, and at
+    most `max_adhoc` of them are kept (least recently used go first).
+    Callbacks passed to `subscribe_evictions` are told about every dropped
+    coldkey, so per-coldkey state kept elsewhere can go with it.
+    """
+
+    def __init__(self, pool: SubtensorPool, max_adhoc: int = 256, adhoc_ttl_blocks: int = 300):
+        self.pool = pool
+        self.max_adhoc = max_adhoc
+        self.adhoc_ttl_blocks = adhoc_ttl_blocks
+        self.block: Optional[int] = None
+        self.coldkeys: List[str] = []
+        self._pinned = set()
+        # ad-hoc coldkey -> last block it was asked for, least recently used first
+        self._adhoc: "OrderedDict[str, int]" = OrderedDict()
+        self._stakes: Dict[str, List[StakeInfo]] = {}
+        self._lock = asyncio.Lock()
+        self._eviction_callbacks: List[Callable[[str], None]] = []
+
+    def __contains__(self, coldkey_ss58: str) -> bool:
+        return coldkey_ss58 in self._pinned or coldkey_ss58 in self._adhoc
+
+    def is_pinned(self, coldkey_ss58: str) -> bool:
+        return coldkey_ss58 in self._pinned
+
+    def subscribe_evictions(self, callback: Callable[[str], None]):
+        self._eviction_callbacks.append(callback)
+
+    def register(self, coldkey_ss58: str, pinned: bool = True) -> bool:
+        """
+        Adds a coldkey to the batched refresh. Returns True if it was new.
+        """
+        new = coldkey_ss58 not in self._pinned and coldkey_ss58 not in self._adhoc
+        if pinned:
+            self._pinned.add(coldkey_ss58)
+            self._adhoc.pop(coldkey_ss58, None)
+        elif coldkey_ss58 not in self._pinned:
+            self._adhoc[coldkey_ss58] = self.block or 0
+            self._adhoc.move_to_end(coldkey_ss58)
+            while len(self._adhoc) > self.max_adhoc:
+                self._drop(self._adhoc.popitem(last=False)[0])
+        if new:
+            self.coldkeys.append(coldkey_ss58)
+        return new
+
+    def _drop(self, coldkey_ss58: str):
+        self.coldkeys.remove(coldkey_ss58)
+        self._stakes.pop(coldkey_ss58, None)
+        for callback in self._eviction_callbacks:
+            callback(coldkey_ss58)
+
+    def _expire(self, block: int):
+        while self._adhoc:
+            coldkey, last_used = next(iter(self._adhoc.items()))
+            if block - last_used <= self.adhoc_ttl_blocks:
+                break
+            del self._adhoc[coldkey]
+            self._drop(coldkey)
+
+    async def refresh(self, block: int):
+        """
+        Fetches stake info for every registered coldkey at `block`. Meant to be
+        subscribed to a BlockClock; concurrent callers share a single query.
+        """
+        async with self._lock:
+            self._expire(block)
+            if self.block == block:
+                # Same block: only coldkeys registered since the last refresh are missing
+                to_fetch = [ck for ck in self.coldkeys if ck not in self._stakes]
+                stakes_by_coldkey = dict(self._stakes)
+            else:
+                to_fetch = list(self.coldkeys)
+                stakes_by_coldkey = {}
+
+            if to_fetch:
+                helper = DTAOHelper(self.pool.get())
+                stakes = await helper.get_stake_info_for_coldkeys(to_fetch, block=block)
+                for coldkey in to_fetch:
+                    stakes_by_coldkey[coldkey] = stakes.get(coldkey, [])
+
+            self._stakes = stakes_by_coldkey
+            self.block = block
+
+    async def get(self, coldkey_ss58: str, block: int) -> List[StakeInfo]:
+        """
+        Returns the StakeInfo list for `coldkey_ss58` at `block`, registering
+        the coldkey (and refreshing) if it was not covered yet.
+        """
+        self.register(coldkey_ss58, pinned=False)
+        if coldkey_ss58 in self._adhoc:
+            self._adhoc[coldkey_ss58] = block
+        await self.refresh(block)
+        return self._stakes.get(coldkey_ss58, [])
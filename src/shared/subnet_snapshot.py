@@ -0,0 +1,128 @@
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from bittensor.core.chain_data import DynamicInfo
+
+
+class HotkeyTable:
+    """
+    Interns ss58 hotkeys to small integer ids. Snapshots store the ids, so a
+    subnet owner that stays the same across thousands of snapshots is one
+    string in memory instead of one per snapshot.
+    """
+
+    __slots__ = ("_ids", "_hotkeys")
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._hotkeys: List[Optional[str]] = [None]  # id 0 means "no hotkey"
+
+    def intern(self, hotkey: Optional[str]) -> int:
+        if not hotkey:
+            return 0
+        hotkey_id = self._ids.get(hotkey)
+        if hotkey_id is None:
+            hotkey_id = len(self._hotkeys)
+            self._ids[hotkey] = hotkey_id
+            self._hotkeys.append(hotkey)
+        return hotkey_id
+
+    def lookup(self, hotkey_id: int) -> Optional[str]:
+        return self._hotkeys[hotkey_id]
+
+    def __len__(self) -> int:
+        return len(self._hotkeys) - 1
+
+
+# Shared by every snapshot built without an explicit table
+HOTKEYS = HotkeyTable()
+
+
+class SubnetSnapshot:
+    """
+    Numeric view of one `all_subnets()` call as parallel NumPy arrays indexed
+    directly by netuid. Subnets missing from the snapshot have `present=False`
+    and zeros everywhere else. Owner hotkeys are kept as ids into a shared
+    HotkeyTable, so a snapshot holds no per-subnet Python objects.
+    """
+
+    __slots__ = ("block", "hotkeys", "present", "is_dynamic", "price", "tao_in", "alpha_in", "alpha_out", "owner_id")
+
+    def __init__(self, block: Optional[int], size: int, hotkeys: Optional[HotkeyTable] = None):
+        self.block = block
+        self.hotkeys = hotkeys if hotkeys is not None else HOTKEYS
+        self.present = np.zeros(size, dtype=bool)
+        self.is_dynamic = np.zeros(size, dtype=bool)
+        self.price = np.zeros(size, dtype=np.float64)
+        self.tao_in = np.zeros(size, dtype=np.float64)
+        self.alpha_in = np.zeros(size, dtype=np.float64)
+        self.alpha_out = np.zeros(size, dtype=np.float64)
+        self.owner_id = np.zeros(size, dtype=np.uint32)
+
+    @classmethod
+    def from_dynamic_info(
+        cls,
+        subnets: Iterable[DynamicInfo],
+        block: Optional[int] = None,
+        hotkeys: Optional[HotkeyTable] = None
+    ) -> "SubnetSnapshot":
+        subnets = list(subnets or [])
+        size = max((d.netuid for d in subnets), default=-1) + 1
+        snapshot = cls(block, size, hotkeys)
+        for d in subnets:
+            i = d.netuid
+            snapshot.present[i] = True
+            snapshot.is_dynamic[i] = bool(d.is_dynamic)
+            snapshot.price[i] = float(d.price.tao)
+            snapshot.tao_in[i] = float(d.tao_in.tao)
+            snapshot.alpha_in[i] = float(d.alpha_in.tao)
+            snapshot.alpha_out[i] = float(d.alpha_out.tao)
+            snapshot.owner_id[i] = snapshot.hotkeys.intern(getattr(d, "owner_hotkey", None))
+        return snapshot
+
+    @property
+    def netuids(self) -> np.ndarray:
+        return np.flatnonzero(self.present)
+
+    @property
+    def market_cap(self) -> np.ndarray:
+        return self.price * self.alpha_out
+
+    def has(self, netuid: int) -> bool:
+        return 0 <= netuid < len(self.present) and bool(self.present[netuid])
+
+    def owner_hotkey(self, netuid: int) -> Optional[str]:
+        if not self.has(netuid):
+            return None
+        return self.hotkeys.lookup(int(self.owner_id[netuid]))
+
+    def top_by_market_cap(self, n: int) -> np.ndarray:
+        """
+        Netuids of the `n` largest subnets by price * alpha_out, largest first.
+        """
+        netuids = self.netuids
+        order = np.argsort(-self.market_cap[netuids], kind="stable")
+        return netuids[order[:n]]
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """
+        Named numeric columns (all indexed by netuid), e.g. for trigger expressions.
+        """
+        return {
+            "netuid": np.arange(len(self.present), dtype=np.float64),
+            "price": self.price,
+            "tao_in": self.tao_in,
+            "alpha_in": self.alpha_in,
+            "alpha_out": self.alpha_out,
+            "market_cap": self.market_cap,
+        }
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory held by the arrays (the shared hotkey table is not counted).
+        """
+        return sum(getattr(self, name).nbytes for name in self.__slots__[2:])
+
+    def __len__(self) -> int:
+        return int(self.present.sum())
@@ -1,16 +1,106 @@
+import asyncio
+import logging
 import bittensor
 from bittensor import AsyncSubtensor
-from typing import Union
+from bittensor.utils import unlock_key
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from src.shared.dca_journal import DcaJournal
+from src.shared.dtao_helper import DTAOHelper
+from src.shared.extrinsic_signer import ExtrinsicSigner
+from src.shared.subnet_snapshot import SubnetSnapshot
+from src.shared.trade_ledger import TradeLedger
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
 
 
 class SubnetStaker:
-    def __init__(self, wallet: bittensor.wallet, subtensor: AsyncSubtensor):
+    # How many blocks after a journaled stake's intent its extrinsic is looked for on restart
+    EXTRINSIC_SEARCH_BLOCKS = 32
+
+    def __init__(
+        self,
+        wallet: bittensor.wallet,
+        subtensor: AsyncSubtensor,
+        ledger: Optional[TradeLedger] = None,
+        signer: Optional[ExtrinsicSigner] = None,
+        journal: Optional[DcaJournal] = None
+    ):
         """
         SubnetStaker now holds a reference to the wallet (and subtensor)
         so we don't need to pass 'wallet' around to each method.
+        If a TradeLedger is given, every successful stake/unstake is appended to it.
+        If an ExtrinsicSigner is given, stakes are signed in its thread pool
+        instead of through subtensor.add_stake / unstake.
+        If a DcaJournal is given, `buy_alpha` records each stake in it once
+        signed (with its nonce and tx hash) and its outcome afterwards; this
+        needs the ExtrinsicSigner, the only path that knows the nonce before
+        submitting.
         """
+        if journal is not None and signer is None:
+            raise ValueError("A DcaJournal needs an ExtrinsicSigner to record the nonce of each stake.")
         self.wallet = wallet
         self.subtensor = subtensor
+        self.ledger = ledger
+        self.signer = signer
+        self.journal = journal
+
+    async def _submit_stake(
+        self,
+        call_function: str,
+        netuid: int,
+        hotkey: str,
+        amount: bittensor.Balance,
+        on_signed: Optional[Callable[[int, str], None]] = None
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Returns (success, extrinsic hash); the hash is only known (and
+        `on_signed` only called) when signing through the ExtrinsicSigner.
+        """
+        if self.signer is None:
+            submit = self.subtensor.add_stake if call_function == "add_stake" else self.subtensor.unstake
+            return await submit(wallet=self.wallet, netuid=netuid, hotkey_ss58=hotkey, amount=amount), None
+
+        if not (unlock := unlock_key(self.wallet)).success:
+            logger.error(f"[SubnetStaker] {unlock.message}")
+            return False, None
+        return await self.signer.stake_with_hash(self.wallet, call_function, hotkey, netuid, amount, on_signed=on_signed)
+
+    async def account_next_index(self) -> int:
+        """
+        The coldkey's next nonce as the chain sees it, counting transactions still in the pool.
+        """
+        response = await self.subtensor.substrate.rpc_request("account_nextIndex", [self.wallet.coldkeypub.ss58_address])
+        return int(response["result"])
+
+    async def extrinsic_outcomes(self, tx_hashes: List[str], from_block: int) -> Dict[str, bool]:
+        """
+        {tx hash: dispatch succeeded} for those of `tx_hashes` included in the
+        EXTRINSIC_SEARCH_BLOCKS blocks from `from_block`; hashes not found are
+        left out. Each block is read once, however many hashes are wanted.
+        """
+        substrate = self.subtensor.substrate
+        wanted = set(tx_hashes)
+        outcomes: Dict[str, bool] = {}
+        last_block = min(await self.subtensor.get_current_block(), from_block + self.EXTRINSIC_SEARCH_BLOCKS)
+        for block in range(from_block, last_block + 1):
+            if not wanted:
+                break
+            block_hash = await self.subtensor.get_block_hash(block)
+            found = {}
+            for idx, extrinsic in enumerate(await substrate.get_extrinsics(block_hash=block_hash) or []):
+                if extrinsic.extrinsic_hash and f"0x{extrinsic.extrinsic_hash.hex()}" in wanted:
+                    found[idx] = f"0x{extrinsic.extrinsic_hash.hex()}"
+            if not found:
+                continue
+            for record in await substrate.get_events(block_hash=block_hash):
+                tx_hash = found.get(record.get("extrinsic_idx"))
+                event = record["event"]
+                if tx_hash is not None and event["module_id"] == "System" and event["event_id"] in ("ExtrinsicSuccess", "ExtrinsicFailed"):
+                    outcomes[tx_hash] = event["event_id"] == "ExtrinsicSuccess"
+                    wanted.discard(tx_hash)
+        return outcomes
 
     async def buy_alpha(
         self,
@@ -33,26 +123,166 @@ class SubnetStaker:
         if hotkey is None:
             hotkey = subnet_info.owner_hotkey
 
+        if self.ledger is not None:
+            old_alpha = await self.get_alpha_balance(netuid, hotkey)
+
+        intent_id = None
+        on_signed = None
+        if self.journal is not None:
+            intent_block = await self.subtensor.get_current_block()
+
+            def journal_intent(nonce: int, extrinsic_hash: str):
+                # Journaled after signing and before submitting, so a restart can settle it by nonce
+                nonlocal intent_id
+                intent_id = self.journal.intent(
+                    block=intent_block,
+                    netuid=netuid,
+                    hotkey=hotkey,
+                    amount=float(tao_amount.tao),
+                    nonce=nonce,
+                    tx_hash=extrinsic_hash
+                )
+            on_signed = journal_intent
+
         # Perform the stake
-        response = await self.subtensor.add_stake(
-            wallet=self.wallet,
-            netuid=netuid,
-            hotkey_ss58=hotkey,
-            amount=tao_amount
-        )
+        response, tx_hash = await self._submit_stake("add_stake", netuid, hotkey, tao_amount, on_signed=on_signed)
 
         # Wait for the next block (optional)
         await self.subtensor.wait_for_block()
 
         # Fetch updated alpha balance (staked amount)
         new_alpha = await self.get_alpha_balance(netuid, hotkey)
-        print(
+        if intent_id is not None:
+            self.journal.done(
+                intent_id,
+                block=await self.subtensor.get_current_block(),
+                netuid=netuid,
+                success=response,
+                tx_hash=tx_hash,
+                alpha_after=float(new_alpha.tao)
+            )
+        logger.info(
             f"[buy_alpha] Staked {tao_amount} TAO into netuid={netuid}, "
             f"price={subnet_info.price}, new_alpha={new_alpha}, response={response}"
         )
 
+        if self.ledger is not None and response:
+            # Approximate: the alpha change across the block also includes that block's emissions
+            self.ledger.record_stake(
+                block=await self.subtensor.get_current_block(),
+                coldkey=self.wallet.coldkeypub.ss58_address,
+                hotkey=hotkey,
+                netuid=netuid,
+                tao_spent=float(tao_amount.tao),
+                alpha_received=float(new_alpha.tao) - float(old_alpha.tao),
+                price=float(subnet_info.price.tao)
+            )
+
         return new_alpha
 
+    async def buy_alpha_batch(
+        self,
+        tao_by_netuid: Dict[int, float],
+        hotkeys: Optional[Dict[int, str]] = None
+    ) -> Dict[int, Tuple[bittensor.Balance, bittensor.Balance]]:
+        """
+        Stakes into several subnets with a single Utility.batch_all extrinsic,
+        so every buy lands in the same block instead of one block per subnet.
+        Owner hotkeys and prices come from one all_subnets() snapshot; alpha
+        before and after is read with one stake-info query each.
+
+        Returns {netuid: (old_alpha, new_alpha)}, or {} if the batch failed
+        (batch_all is atomic: either every stake goes through or none does).
+        """
+        hotkeys = hotkeys or {}
+        coldkey = self.wallet.coldkeypub.ss58_address
+        helper = DTAOHelper(self.subtensor)
+
+        snapshot = SubnetSnapshot.from_dynamic_info(await self.subtensor.all_subnets())
+        orders = {}
+        for netuid, tao_amount in tao_by_netuid.items():
+            if not snapshot.has(netuid):
+                logger.warning(f"[buy_alpha_batch] Subnet {netuid} not found, skipping.")
+                continue
+            if isinstance(tao_amount, (float, int)):
+                tao_amount = bittensor.Balance.from_tao(tao_amount)
+            if tao_amount.rao <= 0:
+                continue
+            orders[netuid] = (hotkeys.get(netuid) or snapshot.owner_hotkey(netuid), tao_amount)
+        if not orders:
+            return {}
+
+        if not (unlock := unlock_key(self.wallet)).success:
+            logger.error(f"[buy_alpha_batch] {unlock.message}")
+            return {}
+
+        substrate = self.subtensor.substrate
+        stake_calls, before = await asyncio.gather(
+            asyncio.gather(*[
+                substrate.compose_call(
+                    call_module="SubtensorModule",
+                    call_function="add_stake",
+                    call_params={"hotkey": hotkey, "amount_staked": tao_amount.rao, "netuid": netuid}
+                )
+                for netuid, (hotkey, tao_amount) in orders.items()
+            ]),
+            helper.get_stake_info_for_coldkeys([coldkey])
+        )
+        batch_call = await substrate.compose_call(
+            call_module="Utility",
+            call_function="batch_all",
+            call_params={"calls": list(stake_calls)}
+        )
+        if self.signer is not None:
+            success, error = await self.signer.sign_and_send_extrinsic(batch_call, self.wallet, sign_with="coldkey")
+        else:
+            success, error = await self.subtensor.sign_and_send_extrinsic(
+                batch_call,
+                self.wallet,
+                wait_for_inclusion=True,
+                wait_for_finalization=False,
+                sign_with="coldkey",
+                use_nonce=True,
+                nonce_key="coldkeypub"
+            )
+        if not success:
+            logger.error(f"[buy_alpha_batch] Batch of {len(orders)} stakes failed: {error}")
+            return {}
+
+        block, after = await asyncio.gather(
+            self.subtensor.get_current_block(),
+            helper.get_stake_info_for_coldkeys([coldkey])
+        )
+
+        def alpha_of(stake_infos, netuid, hotkey) -> bittensor.Balance:
+            total = bittensor.Balance.from_tao(0)
+            for stake_info in stake_infos.get(coldkey, []):
+                if stake_info.netuid == netuid and stake_info.hotkey_ss58 == hotkey:
+                    total += stake_info.stake
+            return total
+
+        results = {}
+        for netuid, (hotkey, tao_amount) in orders.items():
+            old_alpha = alpha_of(before, netuid, hotkey)
+            new_alpha = alpha_of(after, netuid, hotkey)
+            results[netuid] = (old_alpha, new_alpha)
+            logger.info(
+                f"[buy_alpha_batch] Staked {tao_amount} TAO into netuid={netuid}, "
+                f"price={snapshot.price[netuid]:.9f}, new_alpha={new_alpha}"
+            )
+            if self.ledger is not None:
+                # Approximate, as in buy_alpha
+                self.ledger.record_stake(
+                    block=block,
+                    coldkey=coldkey,
+                    hotkey=hotkey,
+                    netuid=netuid,
+                    tao_spent=float(tao_amount.tao),
+                    alpha_received=float(new_alpha.tao) - float(old_alpha.tao),
+                    price=float(snapshot.price[netuid])
+                )
+        return results
+
     async def sell_alpha(
         self,
         netuid: int,
@@ -73,22 +303,30 @@ class SubnetStaker:
         if hotkey is None:
             hotkey = subnet_info.owner_hotkey
 
-        response = await self.subtensor.unstake(
-            wallet=self.wallet,
-            netuid=netuid,
-            hotkey_ss58=hotkey,
-            amount=alpha_amount,
-        )
+        response, _ = await self._submit_stake("remove_stake", netuid, hotkey, alpha_amount)
 
         await self.subtensor.wait_for_block()
 
         # For verification, check how much alpha remains staked
         remaining_alpha = await self.get_alpha_balance(netuid, hotkey)
-        print(
+        logger.info(
             f"[sell_alpha] Unstaked {alpha_amount} alpha from netuid={netuid}, "
             f"price={subnet_info.price}, remaining_alpha={remaining_alpha}, response={response}"
         )
 
+        if self.ledger is not None and response:
+            # TAO received is estimated from the pre-trade pool (includes slippage)
+            tao_received, _ = subnet_info.alpha_to_tao_with_slippage(alpha_amount)
+            self.ledger.record_unstake(
+                block=await self.subtensor.get_current_block(),
+                coldkey=self.wallet.coldkeypub.ss58_address,
+                hotkey=hotkey,
+                netuid=netuid,
+                alpha_sold=float(alpha_amount.tao),
+                tao_received=float(tao_received.tao),
+                price=float(subnet_info.price.tao)
+            )
+
         return remaining_alpha
 
     async def get_alpha_balance(
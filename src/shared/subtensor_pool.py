@@ -0,0 +1,50 @@
+import itertools
+import logging
+from typing import List, Optional
+
+import bittensor
+from bittensor import AsyncSubtensor
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class SubtensorPool:
+    """
+    A fixed set of AsyncSubtensor connections shared by every consumer in the
+    process. `get()` hands them out round-robin so concurrent queries are
+    spread over a few websockets instead of opening one connection per caller.
+    """
+
+    def __init__(self, size: int = 4, network: Optional[str] = None):
+        if size < 1:
+            raise ValueError("SubtensorPool size must be at least 1.")
+        self.size = size
+        self.network = network
+        self.connections: List[AsyncSubtensor] = []
+        self._cycle = None
+
+    async def initialize(self) -> "SubtensorPool":
+        if not self.connections:
+            for _ in range(self.size):
+                if self.network is None:
+                    subtensor = bittensor.async_subtensor()
+                else:
+                    subtensor = bittensor.async_subtensor(network=self.network)
+                self.connections.append(await subtensor.initialize())
+            self._cycle = itertools.cycle(self.connections)
+        return self
+
+    def get(self) -> AsyncSubtensor:
+        if self._cycle is None:
+            raise RuntimeError("SubtensorPool.initialize() must be awaited before use.")
+        return next(self._cycle)
+
+    async def close(self):
+        for subtensor in self.connections:
+            try:
+                await subtensor.close()
+            except Exception as e:
+                logger.warning(f"[SubtensorPool] Error closing connection: {e}")
+        self.connections = []
+        self._cycle = None
@@ -0,0 +1,212 @@
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+
+def add_ledger_argument(parser):
+    parser.add_argument(
+        "--ledger",
+        type=str,
+        default="data/trades.sqlite",
+        help="SQLite trade ledger to append every stake/unstake to (empty string disables it)."
+    )
+
+
+class TradeLedger:
+    """
+    Append-only SQLite ledger of every stake/unstake made by the scripts.
+
+    Amounts are recorded from the wallet's point of view:
+      - stake:   tao_out (TAO spent)     -> alpha_in (alpha received)
+      - unstake: alpha_out (alpha sold)  -> tao_in (TAO received)
+
+    The scripts measure alpha received as the change of the position across
+    the block the stake landed in, so it is approximate: emissions credited
+    to the position in that block are counted as bought alpha.
+
+    Alongside the raw trades, a `positions` table keeps alpha, cost basis
+    (average-cost method) and realized PnL per (coldkey, hotkey, netuid).
+    It is updated in the same transaction as each insert, so PnL queries
+    never have to replay the trade history.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS trades (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        block INTEGER NOT NULL,
+        timestamp REAL NOT NULL,
+        coldkey TEXT NOT NULL,
+        hotkey TEXT NOT NULL,
+        netuid INTEGER NOT NULL,
+        side TEXT NOT NULL CHECK (side IN ('stake', 'unstake')),
+        tao_in REAL NOT NULL DEFAULT 0,
+        tao_out REAL NOT NULL DEFAULT 0,
+        alpha_in REAL NOT NULL DEFAULT 0,
+        alpha_out REAL NOT NULL DEFAULT 0,
+        price REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_trades_netuid_block ON trades (netuid, block);
+    CREATE INDEX IF NOT EXISTS idx_trades_block ON trades (block);
+
+    CREATE TABLE IF NOT EXISTS positions (
+        coldkey TEXT NOT NULL,
+        hotkey TEXT NOT NULL,
+        netuid INTEGER NOT NULL,
+        alpha REAL NOT NULL DEFAULT 0,
+        cost_basis REAL NOT NULL DEFAULT 0,
+        realized_pnl REAL NOT NULL DEFAULT 0,
+        last_block INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (coldkey, hotkey, netuid)
+    );
+    CREATE INDEX IF NOT EXISTS idx_positions_netuid ON positions (netuid);
+    """
+
+    def __init__(self, path: str = "data/trades.sqlite"):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def record_stake(
+        self,
+        block: int,
+        coldkey: str,
+        hotkey: str,
+        netuid: int,
+        tao_spent: float,
+        alpha_received: float,
+        price: float
+    ) -> int:
+        """
+        Appends a stake and adds it to the position's alpha and cost basis.
+        """
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO trades (block, timestamp, coldkey, hotkey, netuid, side, tao_out, alpha_in, price) "
+                "VALUES (?, ?, ?, ?, ?, 'stake', ?, ?, ?)",
+                (block, time.time(), coldkey, hotkey, netuid, tao_spent, alpha_received, price)
+            )
+            self.conn.execute(
+                "INSERT INTO positions (coldkey, hotkey, netuid, alpha, cost_basis, last_block) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (coldkey, hotkey, netuid) DO UPDATE SET "
+                "alpha = alpha + excluded.alpha, "
+                "cost_basis = cost_basis + excluded.cost_basis, "
+                "last_block = excluded.last_block",
+                (coldkey, hotkey, netuid, alpha_received, tao_spent, block)
+            )
+        return cursor.lastrowid
+
+    def record_unstake(
+        self,
+        block: int,
+        coldkey: str,
+        hotkey: str,
+        netuid: int,
+        alpha_sold: float,
+        tao_received: float,
+        price: float
+    ) -> int:
+        """
+        Appends an unstake, releases the proportional share of the cost basis
+        and books the difference to realized PnL.
+        """
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO trades (block, timestamp, coldkey, hotkey, netuid, side, tao_in, alpha_out, price) "
+                "VALUES (?, ?, ?, ?, ?, 'unstake', ?, ?, ?)",
+                (block, time.time(), coldkey, hotkey, netuid, tao_received, alpha_sold, price)
+            )
+            row = self.conn.execute(
+                "SELECT alpha, cost_basis FROM positions WHERE coldkey = ? AND hotkey = ? AND netuid = ?",
+                (coldkey, hotkey, netuid)
+            ).fetchone()
+            alpha, cost_basis = (row["alpha"], row["cost_basis"]) if row else (0.0, 0.0)
+
+            # Alpha bought before the ledger existed has no recorded cost
+            fraction = min(1.0, alpha_sold / alpha) if alpha > 0 else 0.0
+            cost_released = cost_basis * fraction
+            self.conn.execute(
+                "INSERT INTO positions (coldkey, hotkey, netuid, alpha, cost_basis, realized_pnl, last_block) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (coldkey, hotkey, netuid) DO UPDATE SET "
+                "alpha = excluded.alpha, "
+                "cost_basis = excluded.cost_basis, "
+                "realized_pnl = realized_pnl + ?, "
+                "last_block = excluded.last_block",
+                (
+                    coldkey, hotkey, netuid,
+                    max(0.0, alpha - alpha_sold), cost_basis - cost_released,
+                    tao_received - cost_released, block,
+                    tao_received - cost_released
+                )
+            )
+        return cursor.lastrowid
+
+    def trades(
+        self,
+        netuid: Optional[int] = None,
+        from_block: Optional[int] = None,
+        to_block: Optional[int] = None,
+        coldkey: Optional[str] = None
+    ) -> List[sqlite3.Row]:
+        query = "SELECT * FROM trades WHERE 1 = 1"
+        params = []
+        if netuid is not None:
+            query += " AND netuid = ?"
+            params.append(netuid)
+        if from_block is not None:
+            query += " AND block >= ?"
+            params.append(from_block)
+        if to_block is not None:
+            query += " AND block <= ?"
+            params.append(to_block)
+        if coldkey is not None:
+            query += " AND coldkey = ?"
+            params.append(coldkey)
+        return self.conn.execute(query + " ORDER BY block, id", params).fetchall()
+
+    def positions(self, coldkey: Optional[str] = None) -> Dict[int, Dict[str, float]]:
+        """
+        Returns {netuid: {alpha, cost_basis, realized_pnl}} summed over hotkeys.
+        """
+        query = (
+            "SELECT netuid, SUM(alpha) AS alpha, SUM(cost_basis) AS cost_basis, "
+            "SUM(realized_pnl) AS realized_pnl FROM positions"
+        )
+        params = []
+        if coldkey is not None:
+            query += " WHERE coldkey = ?"
+            params.append(coldkey)
+        rows = self.conn.execute(query + " GROUP BY netuid", params).fetchall()
+        return {
+            row["netuid"]: {
+                "alpha": row["alpha"],
+                "cost_basis": row["cost_basis"],
+                "realized_pnl": row["realized_pnl"],
+            }
+            for row in rows
+        }
+
+    def pnl(self, prices: Dict[int, float], coldkey: Optional[str] = None) -> Dict[int, Dict[str, float]]:
+        """
+        Adds unrealized PnL (alpha * price - cost_basis) to `positions()` using
+        the given {netuid: price in TAO}.
+        """
+        result = self.positions(coldkey)
+        for netuid, position in result.items():
+            price = prices.get(netuid)
+            if price is None:
+                position["unrealized_pnl"] = None
+            else:
+                position["unrealized_pnl"] = position["alpha"] * price - position["cost_basis"]
+        return result
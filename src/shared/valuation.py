@@ -0,0 +1,110 @@
+from typing import TYPE_CHECKING, Dict, Hashable, Optional, Set, Tuple
+
+import numpy as np
+
+from src.shared.subnet_snapshot import SubnetSnapshot
+
+if TYPE_CHECKING:
+    from src.shared.snapshot_diff import SnapshotDelta
+
+
+def value_holdings(
+    snapshot: SubnetSnapshot,
+    alpha_by_netuid: Dict[int, float],
+    tao_price_usd: Optional[float] = None
+) -> Dict[int, Dict[str, Optional[float]]]:
+    """
+    Values alpha holdings against a single subnet snapshot in one vectorized pass.
+
+    - tao_value: alpha * spot price.
+    - liquidation_tao_value: TAO actually received when unstaking everything,
+      i.e. the constant-product swap tao_in * alpha / (alpha_in + alpha).
+      Non-dynamic subnets (root) have no pool, so it equals tao_value.
+    - usd fields are only filled when `tao_price_usd` is given.
+    """
+    if not alpha_by_netuid:
+        return {}
+
+    netuids = np.fromiter(alpha_by_netuid.keys(), dtype=np.int64)
+    alpha = np.fromiter(alpha_by_netuid.values(), dtype=np.float64)
+
+    known = netuids < len(snapshot.present)
+    idx = np.where(known, netuids, 0)
+    known &= snapshot.present[idx]
+
+    price = np.where(known, snapshot.price[idx], 0.0)
+    tao_in = np.where(known, snapshot.tao_in[idx], 0.0)
+    alpha_in = np.where(known, snapshot.alpha_in[idx], 0.0)
+    dynamic = known & snapshot.is_dynamic[idx]
+
+    tao_value = alpha * price
+    pool_depth = alpha_in + alpha
+    swapped = np.divide(tao_in * alpha, pool_depth, out=np.zeros_like(alpha), where=pool_depth > 0)
+    liquidation_value = np.where(dynamic, swapped, tao_value)
+
+    if tao_price_usd is not None:
+        usd_value = tao_value * tao_price_usd
+        liquidation_usd = liquidation_value * tao_price_usd
+
+    valuations = {}
+    for i, netuid in enumerate(netuids.tolist()):
+        valuations[netuid] = {
+            "price": float(price[i]),
+            "tao_value": float(tao_value[i]),
+            "liquidation_tao_value": float(liquidation_value[i]),
+            "usd_value": float(usd_value[i]) if tao_price_usd is not None else None,
+            "liquidation_usd_value": float(liquidation_usd[i]) if tao_price_usd is not None else None,
+        }
+    return valuations
+
+
+class ValuationCache:
+    """
+    Keeps the last valuation of several portfolios (e.g. one per coldkey) and,
+    on each new snapshot, only re-values positions whose subnet changed (fed
+    by SnapshotDiffer deltas through `on_delta`) or whose alpha changed.
+    Subscribe `on_delta` to the differ that publishes the snapshots passed to
+    `value`, so no delta is missed.
+    """
+
+    def __init__(self, tao_price_usd: Optional[float] = None):
+        self.tao_price_usd = tao_price_usd
+        # key -> (alpha_by_netuid, valuations, dirty netuids)
+        self._entries: Dict[Hashable, Tuple[Dict[int, float], Dict[int, Dict[str, Optional[float]]], Set[int]]] = {}
+        self.revalued = 0
+
+    def on_delta(self, snapshot: SubnetSnapshot, delta: "SnapshotDelta"):
+        if delta.previous_block is None:
+            self._entries.clear()
+            return
+        changed = set(delta.changed.tolist())
+        if changed:
+            for _, _, dirty in self._entries.values():
+                dirty.update(changed)
+
+    def value(
+        self,
+        key: Hashable,
+        snapshot: SubnetSnapshot,
+        alpha_by_netuid: Dict[int, float]
+    ) -> Dict[int, Dict[str, Optional[float]]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            stale = alpha_by_netuid
+            valuations = {}
+        else:
+            old_alpha, valuations, dirty = entry
+            valuations = {netuid: v for netuid, v in valuations.items() if netuid in alpha_by_netuid}
+            stale = {
+                netuid: alpha for netuid, alpha in alpha_by_netuid.items()
+                if netuid in dirty or netuid not in valuations or old_alpha.get(netuid) != alpha
+            }
+
+        if stale:
+            valuations.update(value_holdings(snapshot, stale, tao_price_usd=self.tao_price_usd))
+            self.revalued += len(stale)
+        self._entries[key] = (dict(alpha_by_netuid), valuations, set())
+        return dict(valuations)
+
+    def forget(self, key: Hashable):
+        self._entries.pop(key, None)
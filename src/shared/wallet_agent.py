@@ -0,0 +1,221 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import struct
+from typing import Optional
+
+import bittensor
+from bittensor_wallet import Keypair
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# One socket per wallet name, in a directory only the owner can enter
+AGENT_DIR = os.path.expanduser(os.getenv("WALLET_AGENT_DIR", "~/.bittensor/agent"))
+
+
+def default_socket_path(wallet_name: str) -> str:
+    return os.path.join(AGENT_DIR, f"{wallet_name or 'default'}.sock")
+
+
+class WalletAgentError(Exception):
+    pass
+
+
+class WalletAgent:
+    """
+    Keeps one unlocked coldkey in memory and signs payloads for other local
+    processes over a Unix domain socket, so short-lived scripts don't pay the
+    keyfile KDF on every start.
+
+    The socket is created 0600 inside a 0700 directory, and connections from
+    another uid are refused (SO_PEERCRED). The private key never leaves the
+    agent: clients can only ask for the public key and for signatures.
+
+    Protocol: one JSON object per line, e.g. {"op": "public"} or
+    {"op": "sign", "data": "<hex>"}; replies carry the result or "error".
+    """
+
+    def __init__(self, wallet: bittensor.wallet, socket_path: Optional[str] = None):
+        self.keypair = wallet.coldkey
+        self.socket_path = socket_path or default_socket_path(wallet.name)
+        self.signed = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def _peer_allowed(self, writer: asyncio.StreamWriter) -> bool:
+        sock = writer.get_extra_info("socket")
+        if not hasattr(socket, "SO_PEERCRED") or sock is None:
+            # Filesystem permissions are the only guard on this platform
+            return True
+        creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        _, uid, _ = struct.unpack("3i", creds)
+        return uid == os.getuid()
+
+    def _respond(self, request: dict) -> dict:
+        op = request.get("op")
+        if op == "public":
+            return {
+                "ss58_address": self.keypair.ss58_address,
+                "public_key": bytes(self.keypair.public_key).hex(),
+                "crypto_type": self.keypair.crypto_type,
+                "ss58_format": self.keypair.ss58_format,
+            }
+        if op == "sign":
+            signature = self.keypair.sign(bytes.fromhex(request["data"]))
+            self.signed += 1
+            return {"signature": bytes(signature).hex()}
+        return {"error": f"Unknown op {op!r}"}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            if not self._peer_allowed(writer):
+                logger.warning("[WalletAgent] Refused connection from another user.")
+                return
+            while line := await reader.readline():
+                try:
+                    response = self._respond(json.loads(line))
+                except (ValueError, KeyError, TypeError) as e:
+                    response = {"error": f"Bad request: {e}"}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    def _remove_stale_socket(self):
+        if not os.path.exists(self.socket_path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except OSError:
+            os.unlink(self.socket_path)
+            return
+        finally:
+            probe.close()
+        raise WalletAgentError(f"Another agent is already listening on {self.socket_path}")
+
+    async def start(self):
+        directory = os.path.dirname(self.socket_path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+            if directory == AGENT_DIR:
+                os.chmod(directory, 0o700)
+        self._remove_stale_socket()
+
+        # Never let the socket exist with looser permissions, not even briefly
+        old_umask = os.umask(0o177)
+        try:
+            self._server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        finally:
+            os.umask(old_umask)
+        os.chmod(self.socket_path, 0o600)
+        logger.info(f"[WalletAgent] Serving {self.keypair.ss58_address} on {self.socket_path}")
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class AgentKeypair:
+    """
+    Keypair stand-in whose `sign` is answered by a WalletAgent. It has the
+    attributes extrinsic signing reads (ss58_address, public_key, crypto_type,
+    ss58_format). `sign` is blocking and thread-safe (one short connection
+    per signature), so it can run in ExtrinsicSigner's thread pool.
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 10.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        info = self._request({"op": "public"})
+        self.ss58_address = info["ss58_address"]
+        self.public_key = bytes.fromhex(info["public_key"])
+        self.crypto_type = info["crypto_type"]
+        self.ss58_format = info["ss58_format"]
+
+    def _request(self, request: dict) -> dict:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            with sock.makefile("rb") as stream:
+                line = stream.readline()
+        if not line:
+            raise WalletAgentError(f"Wallet agent at {self.socket_path} closed the connection.")
+        response = json.loads(line)
+        if "error" in response:
+            raise WalletAgentError(response["error"])
+        return response
+
+    def sign(self, data) -> bytes:
+        if hasattr(data, "data"):
+            # ScaleBytes signature payloads
+            data = bytes(data.data)
+        elif isinstance(data, str):
+            data = bytes.fromhex(data[2:]) if data.startswith("0x") else data.encode()
+        return bytes.fromhex(self._request({"op": "sign", "data": bytes(data).hex()})["signature"])
+
+    def verify(self, data, signature) -> bool:
+        return Keypair(ss58_address=self.ss58_address, crypto_type=self.crypto_type).verify(data, signature)
+
+
+class AgentWallet:
+    """
+    Wraps a (locked) wallet so its coldkey signs through a WalletAgent;
+    everything else (hotkey, coldkeypub, name, path...) is the wrapped wallet's.
+    """
+
+    def __init__(self, wallet: bittensor.wallet, keypair: AgentKeypair):
+        self._wallet = wallet
+        self._keypair = keypair
+
+    def __getattr__(self, name):
+        return getattr(self._wallet, name)
+
+    @property
+    def coldkey(self) -> AgentKeypair:
+        return self._keypair
+
+    def unlock_coldkey(self) -> AgentKeypair:
+        return self._keypair
+
+    def get_coldkey(self, password: Optional[str] = None) -> AgentKeypair:
+        return self._keypair
+
+    def __str__(self):
+        return f"AgentWallet({self._wallet})"
+
+    __repr__ = __str__
+
+
+def agent_wallet(wallet: bittensor.wallet, socket_path: Optional[str] = None) -> Optional[AgentWallet]:
+    """
+    Returns `wallet` backed by a running agent holding the same coldkey, or
+    None if no agent is reachable (callers then unlock the keyfile as usual).
+    """
+    socket_path = socket_path or os.getenv("WALLET_AGENT_SOCKET") or default_socket_path(wallet.name)
+    if not os.path.exists(socket_path):
+        return None
+    try:
+        keypair = AgentKeypair(socket_path)
+    except (OSError, ValueError, WalletAgentError) as e:
+        logger.warning(f"[WalletAgent] Agent at {socket_path} not usable ({e}); unlocking the keyfile instead.")
+        return None
+
+    if keypair.ss58_address != wallet.coldkeypub.ss58_address:
+        logger.warning(f"[WalletAgent] Agent at {socket_path} holds {keypair.ss58_address}, not this wallet's coldkey.")
+        return None
+    return AgentWallet(wallet, keypair)
@@ -1,11 +1,12 @@
-import bittensor
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
 
+def get_my_wallet(unlock=False, use_agent=True):
+    # Deferred so importing this module (e.g. before argument parsing) stays cheap
+    import bittensor
+    from dotenv import load_dotenv
 
-def get_my_wallet(unlock=False):
+    load_dotenv()
 
     my_wallet = bittensor.wallet(
         name=os.getenv("BT_WALLET_NAME"),
@@ -13,6 +14,13 @@ def get_my_wallet(unlock=False):
     )
 
     if unlock:
+        # A running wallet agent (scripts/wallet_agent.py) signs for us: no keyfile decryption
+        if use_agent:
+            from src.shared.wallet_agent import agent_wallet
+            wallet = agent_wallet(my_wallet)
+            if wallet is not None:
+                return wallet
+
         password = os.getenv("COLDKEY_PASSWORD")
         my_wallet.coldkey_file.save_password_to_env(password)
         my_wallet.unlock_coldkey()
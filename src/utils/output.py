@@ -0,0 +1,207 @@
+import atexit
+import json
+import logging
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+# Kept to the standard library: tabulate/colorama are only imported by TableSink.
+
+
+def _to_json(value: Any):
+    if hasattr(value, "tao"):
+        # bittensor.Balance
+        return float(value.tao)
+    if hasattr(value, "item"):
+        # numpy scalars
+        return value.item()
+    return str(value)
+
+
+class JsonlSink:
+    """
+    Writes each record as one compact JSON line. `emit` only appends the record
+    to a queue; a background thread serializes and writes queued records in
+    batches every `flush_interval` seconds (sooner once `batch_size` are
+    waiting), so the event loop never blocks on stdout or disk.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        stream=None,
+        flush_interval: float = 0.5,
+        batch_size: int = 256
+    ):
+        self._owns_stream = path is not None
+        self._stream = open(path, "a", buffering=1 << 16) if path else (stream or sys.stdout)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending: deque = deque()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="jsonl-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def emit(self, record: Dict[str, Any], message: Optional[str] = None):
+        self._pending.append(record)
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def _drain(self):
+        lines = []
+        while self._pending:
+            lines.append(json.dumps(self._pending.popleft(), separators=(",", ":"), default=_to_json))
+        if lines:
+            self._stream.write("\n".join(lines) + "\n")
+            self._stream.flush()
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._drain()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+        self._drain()
+        if self._owns_stream:
+            self._stream.close()
+
+
+class TableSink:
+    """
+    Renders records for humans: the message line, then the rows as a colored
+    fancy_grid table, like the scripts always printed.
+    """
+
+    TITLES = {
+        "netuid": "NetUID",
+        "alpha_out": "Alpha Out (TAO)",
+        "tao": "TAO",
+        "dividends": "Dividends (TAO)",
+    }
+    VALUE_COLUMNS = {"new_alpha", "final_alpha", "remaining_alpha", "alpha", "root_stake", "dividends"}
+    DIFF_COLUMNS = {"alpha_diff", "diff"}
+    DECIMALS = {"weight": 6}
+    HIGHLIGHT = {"dca_iteration": "YELLOW", "sell_iteration": "MAGENTA"}
+
+    def __init__(self, stream=None):
+        from colorama import Fore, Style
+        from tabulate import tabulate
+        from src.utils.colors import color_diff, color_value
+
+        self._stream = stream or sys.stdout
+        self._fore = Fore
+        self._reset = Style.RESET_ALL
+        self._tabulate = tabulate
+        self._color_diff = color_diff
+        self._color_value = color_value
+
+    def _cell(self, key: str, value: Any) -> str:
+        if isinstance(value, str) or value is None:
+            return value
+        value = _to_json(value) if not isinstance(value, (int, float)) else value
+        if isinstance(value, int) and not isinstance(value, bool):
+            return str(value)
+        if key in self.DIFF_COLUMNS:
+            return self._color_diff(value)
+        decimals = self.DECIMALS.get(key, 9)
+        if key in self.VALUE_COLUMNS:
+            return self._color_value(value, decimals=decimals)
+        return f"{value:.{decimals}f}"
+
+    def emit(self, record: Dict[str, Any], message: Optional[str] = None):
+        if message:
+            color = self.HIGHLIGHT.get(record["event"])
+            if color:
+                message = f"{getattr(self._fore, color)}{message}{self._reset}"
+            print(message, file=self._stream)
+
+        rows = record.get("rows")
+        if rows:
+            keys = list(rows[0])
+            headers = [self.TITLES.get(key, key.replace("_", " ").title()) for key in keys]
+            table = [[self._cell(key, row.get(key)) for key in keys] for row in rows]
+            print(self._tabulate(table, headers=headers, tablefmt="fancy_grid"), file=self._stream)
+
+    def close(self):
+        pass
+
+
+class Output:
+    """
+    Structured output for the strategies. Each `event` becomes one record
+    {"ts", "event", **fields, "rows": [...]} handed to every sink: JSONL for
+    machines (default for long-running jobs), and optionally a TableSink for
+    people. The human `message` is only rendered by the table sink.
+
+    `bind(**context)` returns an Output on the same sinks whose records also
+    carry `context` (e.g. the strategy name when several share one stream).
+    `emit` hands an already built record (e.g. from another process) to the sinks.
+    """
+
+    def __init__(self, sinks: Optional[List[Any]] = None, context: Optional[Dict[str, Any]] = None):
+        self.sinks = sinks if sinks is not None else [TableSink()]
+        self.context = context or {}
+
+    def bind(self, **context) -> "Output":
+        return Output(self.sinks, {**self.context, **context})
+
+    def event(self, event: str, message: Optional[str] = None, rows: Optional[List[Dict[str, Any]]] = None, **fields):
+        record = {"ts": round(time.time(), 3), "event": event, **self.context, **fields}
+        if rows is not None:
+            record["rows"] = rows
+        self.emit(record, message)
+
+    def emit(self, record: Dict[str, Any], message: Optional[str] = None):
+        for sink in self.sinks:
+            sink.emit(record, message)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+def add_output_arguments(parser):
+    parser.add_argument(
+        "--output",
+        choices=["auto", "jsonl", "table"],
+        default="auto",
+        help="jsonl: one JSON record per line on stdout, other messages on stderr; table: colored tables; auto: table on a terminal, jsonl otherwise."
+    )
+    parser.add_argument(
+        "--output-file",
+        dest="output_file",
+        type=str,
+        default=None,
+        help="Also append JSONL records to this file."
+    )
+
+
+def configure_logging(level: int = logging.INFO):
+    """
+    For script entry points: progress messages of the shared code go through
+    `logging` to stderr, so stdout only carries what the Output sinks write.
+    """
+    logging.basicConfig(level=level, format="%(message)s", stream=sys.stderr)
+
+
+def make_output(mode: str = "auto", path: Optional[str] = None) -> Output:
+    if mode == "auto":
+        mode = "table" if sys.stdout.isatty() else "jsonl"
+    sinks = [TableSink() if mode == "table" else JsonlSink()]
+    if path:
+        sinks.append(JsonlSink(path=path))
+    return Output(sinks)
+
+
+def output_from_args(args) -> Output:
+    return make_output(args.output, args.output_file)
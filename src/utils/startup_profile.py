@@ -0,0 +1,52 @@
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+
+# Kept to the standard library: this module is imported before arguments are parsed.
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def add_profile_argument(parser):
+    parser.add_argument(
+        "--profile-startup",
+        dest="profile_startup",
+        action="store_true",
+        help="Print how long each group of imports took before the script starts working."
+    )
+
+
+class StartupProfile:
+    """
+    Times the deferred imports of a script entry point. Scripts parse and
+    validate their arguments first, then import bittensor and the `src`
+    modules inside `phase(...)` blocks; with --profile-startup, `report()`
+    prints the time and number of modules each phase loaded.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.phases: List[Tuple[str, float, int]] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        modules = len(sys.modules)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start, len(sys.modules) - modules))
+
+    def report(self):
+        if not self.enabled:
+            return
+        total = time.perf_counter() - self.started
+        logger.info("[startup] Import time breakdown:")
+        for name, seconds, modules in self.phases:
+            share = seconds / total if total > 0 else 0.0
+            logger.info(f"[startup]   {name:<24} {seconds * 1000:8.1f} ms  {share:6.1%}  {modules:5d} modules")
+        logger.info(f"[startup]   {'total':<24} {total * 1000:8.1f} ms")
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+In-process load test for web_app/serve.py.
+
+Runs the FastAPI app against a simulated chain (no node, no wallet needed)
+and hammers /info with many concurrent clients, then reports latency
+percentiles, throughput, status mix, event-loop lag and simulated RPC load.
+
+    python -m web_app.load_test --clients 200 --wallets 20 --duration 30
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import List, Optional
+
+import httpx
+from bittensor import Balance
+from bittensor_wallet import Keypair
+
+from web_app import serve
+
+# Below this share of 200/304 responses the figures describe error handling, not /info
+MIN_OK_SHARE = 0.9
+
+
+@dataclass
+class SimulatedSubnet:
+    netuid: int
+    is_dynamic: bool
+    price: Balance
+    tao_in: Balance
+    alpha_in: Balance
+    alpha_out: Balance
+    owner_hotkey: str
+
+
+@dataclass
+class SimulatedStake:
+    netuid: int
+    hotkey_ss58: str
+    coldkey_ss58: str
+    stake: Balance
+
+
+class SimulatedSubtensor:
+    """
+    Just enough of AsyncSubtensor for serve.py: a block counter that advances
+    every `block_time` seconds, random-walking subnet pools and fixed stakes.
+    Every call sleeps `rpc_latency` seconds and is counted in `rpc_calls`.
+    """
+
+    def __init__(self, n_subnets: int, coldkeys: List[str], block_time: float, rpc_latency: float, seed: int = 0):
+        self.block_time = block_time
+        self.rpc_latency = rpc_latency
+        self.rpc_calls = Counter()
+        self._rng = random.Random(seed)
+        self._start = time.monotonic()
+        self._pools = {
+            netuid: [self._rng.uniform(1_000, 50_000), self._rng.uniform(10_000, 500_000)]
+            for netuid in range(1, n_subnets)
+        }
+        self._pools_block = 0
+        self._stakes = {
+            coldkey: [
+                SimulatedStake(netuid, f"hotkey-{netuid}", coldkey, Balance.from_tao(self._rng.uniform(0.1, 100)))
+                for netuid in self._rng.sample(range(n_subnets), k=min(8, n_subnets))
+            ]
+            for coldkey in coldkeys
+        }
+
+    def _block(self) -> int:
+        return int((time.monotonic() - self._start) / self.block_time)
+
+    async def _rpc(self, name: str):
+        self.rpc_calls[name] += 1
+        await asyncio.sleep(self.rpc_latency)
+
+    async def get_current_block(self) -> int:
+        await self._rpc("get_current_block")
+        return self._block()
+
+    async def wait_for_block(self, block: Optional[int] = None):
+        target = self._block() + 1 if block is None else block
+        while self._block() < target:
+            await asyncio.sleep(self.block_time / 10)
+        return True
+
+    async def all_subnets(self, block_number: Optional[int] = None):
+        await self._rpc("all_subnets")
+        block = self._block() if block_number is None else block_number
+        while self._pools_block < block:
+            for pool in self._pools.values():
+                pool[0] *= self._rng.uniform(0.995, 1.005)
+            self._pools_block += 1
+
+        zero = Balance.from_tao(0)
+        subnets = [SimulatedSubnet(0, False, Balance.from_tao(1), zero, zero, zero, "hotkey-0")]
+        for netuid, (tao_in, alpha_in) in self._pools.items():
+            subnets.append(SimulatedSubnet(
+                netuid, True, Balance.from_tao(tao_in / alpha_in),
+                Balance.from_tao(tao_in), Balance.from_tao(alpha_in), Balance.from_tao(2 * alpha_in),
+                f"hotkey-{netuid}"
+            ))
+        return subnets
+
+    async def get_stake_info_for_coldkeys(self, coldkey_ss58_list: List[str], block: Optional[int] = None):
+        await self._rpc("get_stake_info_for_coldkeys")
+        return {coldkey: self._stakes.get(coldkey, []) for coldkey in coldkey_ss58_list}
+
+    async def close(self):
+        pass
+
+
+class SimulatedPool:
+    def __init__(self, subtensor: SimulatedSubtensor):
+        self.subtensor = subtensor
+
+    def get(self) -> SimulatedSubtensor:
+        return self.subtensor
+
+    async def close(self):
+        await self.subtensor.close()
+
+
+async def _measure_loop_lag(interval: float, samples: List[float], stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, time.perf_counter() - start - interval))
+
+
+async def _client(
+    client: httpx.AsyncClient,
+    coldkey: str,
+    deadline: float,
+    conditional: bool,
+    long_poll: bool,
+    think_time: float,
+    latencies: List[float],
+    statuses: Counter
+):
+    etag = None
+    last_block = None
+    while time.monotonic() < deadline:
+        params = {"coldkey": coldkey}
+        if long_poll and last_block is not None:
+            params["after_block"] = last_block
+        headers = {"If-None-Match": etag} if conditional and etag else {}
+
+        start = time.perf_counter()
+        try:
+            response = await client.get("/info", params=params, headers=headers)
+        except Exception as e:
+            statuses[type(e).__name__] += 1
+            continue
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status_code] += 1
+
+        etag = response.headers.get("etag", etag)
+        if response.headers.get("x-block-number"):
+            last_block = int(response.headers["x-block-number"])
+
+        if think_time > 0:
+            await asyncio.sleep(think_time)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(pct) - 1]
+
+
+def _report(elapsed: float, latencies: List[float], statuses: Counter, lag: List[float], subtensor: SimulatedSubtensor):
+    ms = 1000.0
+    print("\n=== /info load test ===")
+    print(f"Duration:    {elapsed:.1f}s")
+    print(f"Requests:    {len(latencies)} ({len(latencies) / elapsed:.1f} req/s)")
+    print(f"Statuses:    {dict(statuses)}")
+    print(
+        "Latency ms:  "
+        f"p50={_percentile(latencies, 50) * ms:.2f} "
+        f"p90={_percentile(latencies, 90) * ms:.2f} "
+        f"p99={_percentile(latencies, 99) * ms:.2f} "
+        f"max={(max(latencies) if latencies else 0.0) * ms:.2f}"
+    )
+    print(
+        "Loop lag ms: "
+        f"p50={_percentile(lag, 50) * ms:.2f} "
+        f"p99={_percentile(lag, 99) * ms:.2f} "
+        f"max={(max(lag) if lag else 0.0) * ms:.2f}"
+    )
+    print(f"Chain RPCs:  {dict(subtensor.rpc_calls)}")
+
+
+async def run_load_test(args) -> None:
+    # Real SS58 addresses: serve.py rejects anything else with a 400
+    coldkeys = [Keypair.create_from_uri(f"//Sim{i}").ss58_address for i in range(args.wallets)]
+    subtensor = SimulatedSubtensor(
+        n_subnets=args.subnets,
+        coldkeys=coldkeys,
+        block_time=args.block_time,
+        rpc_latency=args.rpc_latency / 1000.0
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        serve.STATE_FILE = os.path.join(tmp, "state.json")
+        serve.app.state.pool = SimulatedPool(subtensor)
+        serve.app.state.default_coldkey = coldkeys[0]
+        await serve.on_startup()
+
+        latencies: List[float] = []
+        statuses: Counter = Counter()
+        lag: List[float] = []
+        stop = asyncio.Event()
+        lag_task = asyncio.create_task(_measure_loop_lag(0.01, lag, stop))
+
+        transport = httpx.ASGITransport(app=serve.app)
+        limits = httpx.Limits(max_connections=args.clients)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", limits=limits, timeout=60) as client:
+            start = time.monotonic()
+            deadline = start + args.duration
+            await asyncio.gather(*[
+                _client(
+                    client, coldkeys[i % len(coldkeys)], deadline,
+                    args.conditional, args.long_poll, args.think_time / 1000.0,
+                    latencies, statuses
+                )
+                for i in range(args.clients)
+            ])
+            elapsed = time.monotonic() - start
+
+        stop.set()
+        await lag_task
+        await serve.on_shutdown()
+
+    _report(elapsed, latencies, statuses, lag, subtensor)
+
+    total = sum(statuses.values())
+    ok = statuses[200] + statuses[304]
+    if total == 0 or ok / total < MIN_OK_SHARE:
+        raise SystemExit(
+            f"[load_test] Only {ok} of {total} responses were 200/304; the figures above do not measure /info."
+        )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load-test the web_app /info endpoint against a simulated chain.")
+    parser.add_argument("--clients", type=int, default=100, help="Concurrent clients (default: 100)")
+    parser.add_argument("--wallets", type=int, default=10, help="Distinct coldkeys spread over the clients (default: 10)")
+    parser.add_argument("--subnets", type=int, default=64, help="Simulated subnets (default: 64)")
+    parser.add_argument("--duration", type=float, default=20.0, help="Test duration in seconds (default: 20)")
+    parser.add_argument("--block-time", type=float, default=1.0, help="Simulated seconds per block (default: 1.0)")
+    parser.add_argument("--rpc-latency", type=float, default=20.0, help="Simulated RPC latency in ms (default: 20)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Pause between a client's requests in ms (default: 0)")
+    parser.add_argument("--conditional", action="store_true", help="Send If-None-Match with the last ETag")
+    parser.add_argument("--long-poll", action="store_true", help="Use ?after_block= with the last seen block")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_load_test(parse_args()))
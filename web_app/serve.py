@@ -1,15 +1,29 @@
 #!/usr/bin/env python3
 import os
 import json
+import asyncio
 import subprocess
-import bittensor
 
-from fastapi import FastAPI
-from typing import Dict, Any
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+from typing import Dict, Any, Optional, Tuple
+from collections import defaultdict
 import uvicorn
+from bittensor.utils import is_valid_ss58_address
+from dotenv import load_dotenv
 
 from src.utils.get_my_wallet import get_my_wallet
+from src.shared.block_clock import BlockClock
 from src.shared.dtao_helper import DTAOHelper
+from src.shared.stake_info_cache import StakeInfoCache
+from src.shared.snapshot_diff import SnapshotDiffer
+from src.shared.subnet_snapshot import SubnetSnapshot
+from src.shared.subtensor_pool import SubtensorPool
+from src.shared.trade_ledger import TradeLedger
+from src.shared.valuation import ValuationCache
+
+# Settings below are read from the environment at import time
+load_dotenv()
 
 app = FastAPI()
 
@@ -17,52 +31,246 @@ STATE_FILE = "data/state.json"
 DCA_SCRIPT = "main.py"
 PM2_APP_NAME = "data/dca_script"
 
+# Upper bound for how long `GET /info?after_block=N` holds a request open.
+INFO_LONG_POLL_TIMEOUT = 30.0
+
+# Number of websocket connections shared by every wallet served by this process.
+SUBTENSOR_POOL_SIZE = int(os.getenv("SUBTENSOR_POOL_SIZE", "4"))
+
+# Extra coldkeys (comma separated) to serve besides the local wallet.
+SERVED_COLDKEYS = [ck.strip() for ck in os.getenv("SERVED_COLDKEYS", "").split(",") if ck.strip()]
+
+# Optional TAO/USD rate used to fill the usd_* fields of /info holdings.
+TAO_PRICE_USD = float(os.getenv("TAO_PRICE_USD")) if os.getenv("TAO_PRICE_USD") else None
+
+# Trade ledger written by the scripts; when present /info reports cost basis and PnL from it.
+TRADE_LEDGER_PATH = os.getenv("TRADE_LEDGER_PATH", "data/trades.sqlite")
+
+
+def _load_state() -> Dict[str, Any]:
+    """
+    Loads state.json, migrating the old single-wallet layout
+    ({"initial_alpha": ..., "strategy_running": ...}) to the default coldkey.
+    Without a default coldkey the old state is kept under "legacy" until one
+    claims it.
+    """
+    if not os.path.exists(STATE_FILE):
+        return {"wallets": {}}
+
+    with open(STATE_FILE, "r") as f:
+        state = json.load(f)
+
+    if "wallets" not in state:
+        state = {
+            "wallets": {},
+            "legacy": {
+                "initial_alpha": state.get("initial_alpha", {}),
+                "strategy_running": state.get("strategy_running", False)
+            }
+        }
+
+    default_coldkey = getattr(app.state, "default_coldkey", None)
+    if "legacy" in state and default_coldkey and default_coldkey not in state["wallets"]:
+        state["wallets"][default_coldkey] = state.pop("legacy")
+    return state
+
+
+def _save_state(state: Dict[str, Any]):
+    with open(STATE_FILE, "w") as f:
+        json.dump(state, f, indent=2)
+
+
+def _wallet_state(state: Dict[str, Any], coldkey: str) -> Dict[str, Any]:
+    return state["wallets"].setdefault(coldkey, {"initial_alpha": {}, "strategy_running": False})
+
 
 @app.on_event("startup")
 async def on_startup():
     print("[serve.py] on_startup event triggered.")
+
+    # Anything already placed on app.state (e.g. by web_app.load_test) is kept as-is
+    if not hasattr(app.state, "default_coldkey"):
+        try:
+            app.state.default_coldkey = get_my_wallet().coldkeypub.ss58_address
+        except Exception as e:
+            print(f"[serve.py] No local wallet available ({e}); a coldkey must be passed explicitly.")
+            app.state.default_coldkey = None
+
     if not os.path.exists(STATE_FILE):
         print(f"[serve.py] {STATE_FILE} not found. Creating default file.")
-        initial_data = {
-            "initial_alpha": {},
-            "strategy_running": False
-        }
-        with open(STATE_FILE, "w") as f:
-            json.dump(initial_data, f)
     else:
         print(f"[serve.py] Found existing {STATE_FILE}.")
+    _save_state(_load_state())
+
+    # One pool of subtensor connections and one chain-head follower for every wallet
+    if getattr(app.state, "pool", None) is None:
+        app.state.pool = await SubtensorPool(size=SUBTENSOR_POOL_SIZE).initialize()
+    app.state.block_clock = BlockClock(app.state.pool.get())
+
+    # One batched stake-info refresh per block covers every registered coldkey
+    app.state.stake_cache = StakeInfoCache(app.state.pool)
+    for coldkey in [app.state.default_coldkey, *SERVED_COLDKEYS]:
+        if coldkey and not is_valid_ss58_address(coldkey):
+            print(f"[serve.py] Ignoring invalid coldkey {coldkey!r} in SERVED_COLDKEYS.")
+        elif coldkey:
+            app.state.stake_cache.register(coldkey)
+    app.state.block_clock.subscribe(app.state.stake_cache.refresh)
+
+    # One all_subnets() snapshot per block, shared by every wallet's valuation
+    app.state.subnet_snapshot = None
+    app.state.subnet_snapshot_lock = asyncio.Lock()
+    # Each new snapshot is diffed against the previous one; wallet valuations
+    # are only recomputed for the subnets that changed
+    app.state.snapshot_differ = SnapshotDiffer()
+    app.state.valuations = ValuationCache(tao_price_usd=TAO_PRICE_USD)
+    app.state.snapshot_differ.subscribe(app.state.valuations.on_delta)
+    app.state.block_clock.subscribe(_get_subnet_snapshot)
+    await app.state.block_clock.start()
+
+    app.state.ledger = TradeLedger(TRADE_LEDGER_PATH) if os.path.exists(TRADE_LEDGER_PATH) else None
+
+    # Cached /info payloads: coldkey -> (block, state_version, payload), built
+    # under one lock per coldkey so wallets don't wait for each other
+    app.state.info_snapshots = {}
+    app.state.info_locks = {}
+    # Ad-hoc coldkeys leave every per-coldkey cache when the stake cache drops them
+    app.state.stake_cache.subscribe_evictions(_forget_coldkey)
+    # Bumped whenever state.json changes outside of a new block (e.g. /dca, /stop)
+    app.state.state_version = 0
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await app.state.block_clock.stop()
+    await app.state.pool.close()
+
+
+def _resolve_coldkey(coldkey: Optional[str]) -> str:
+    coldkey = coldkey or app.state.default_coldkey
+    if not coldkey:
+        raise HTTPException(status_code=400, detail="A coldkey query parameter is required.")
+    if not is_valid_ss58_address(coldkey):
+        raise HTTPException(status_code=400, detail=f"Invalid coldkey {coldkey!r}.")
+    return coldkey
+
+
+def _resolve_own_coldkey(coldkey: Optional[str]) -> str:
+    """
+    Like `_resolve_coldkey`, for endpoints that act with the local wallet:
+    the DCA script signs with it, so no other coldkey can be traded for.
+    """
+    coldkey = _resolve_coldkey(coldkey)
+    if coldkey != app.state.default_coldkey:
+        raise HTTPException(status_code=403, detail="Only the local wallet's coldkey can run a DCA strategy.")
+    return coldkey
+
+
+def _info_etag(block: int, state_version: int) -> str:
+    return f'"{block}.{state_version}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
+
+
+def _forget_coldkey(coldkey: str):
+    app.state.info_snapshots.pop(coldkey, None)
+    app.state.info_locks.pop(coldkey, None)
+    app.state.valuations.forget(coldkey)
+
+
+def _invalidate_info_snapshots():
+    app.state.info_snapshots = {}
+    app.state.state_version += 1
+
+
+async def _get_subnet_snapshot(block: int) -> SubnetSnapshot:
+    """
+    Returns the subnet snapshot for `block`, fetching all_subnets() at most once per block.
+    """
+    async with app.state.subnet_snapshot_lock:
+        snapshot = app.state.subnet_snapshot
+        if snapshot is None or snapshot.block != block:
+            helper = DTAOHelper(app.state.pool.get())
+            subnets = await helper.all_subnets(block_number=block)
+            snapshot = SubnetSnapshot.from_dynamic_info(subnets, block=block)
+            await app.state.snapshot_differ.publish(snapshot)
+            app.state.subnet_snapshot = snapshot
+        return snapshot
+
+
+async def _get_info_snapshot(coldkey: str) -> Tuple[int, int, Dict[str, Any]]:
+    """
+    Returns the /info payload of `coldkey` for the latest block, computing it
+    at most once per (block, state_version) no matter how many clients poll.
+    """
+    async with app.state.info_locks.setdefault(coldkey, asyncio.Lock()):
+        block = app.state.block_clock.block
+        version = app.state.state_version
+        snapshot = app.state.info_snapshots.get(coldkey)
+        if snapshot is None or snapshot[0] != block or snapshot[1] != version:
+            payload = await _build_info(coldkey, block)
+            snapshot = (block, version, payload)
+            if coldkey in app.state.stake_cache:
+                app.state.info_snapshots[coldkey] = snapshot
+            else:
+                # Evicted while being built (other ad-hoc coldkeys pushed it out)
+                _forget_coldkey(coldkey)
+        return snapshot
 
 
 @app.get("/info")
-async def get_info() -> Dict[str, Any]:
+async def get_info(request: Request, coldkey: Optional[str] = None, after_block: Optional[int] = None) -> Response:
     """
-    Returns current stake and profit info for each netuid 
-    where the user has stake (directly retrieved from get_stake_info_for_coldkey).
-    Automatically updates state.json with newly discovered netuids.
+    Returns current stake and profit info for each netuid
+    where `coldkey` (default: the local wallet) has stake.
+    Automatically updates state.json with newly discovered netuids of the
+    local wallet and SERVED_COLDKEYS; other coldkeys are never persisted.
+
+    The response carries an ETag derived from the snapshot's block number, so
+    clients can send If-None-Match and get a 304 while nothing has changed.
+    With `?after_block=N` the request is held until a block newer than N
+    exists (or INFO_LONG_POLL_TIMEOUT passes).
     """
-    print("[serve.py] GET /info")
+    coldkey = _resolve_coldkey(coldkey)
 
-    # Ensure state.json exists
-    if not os.path.exists(STATE_FILE):
-        with open(STATE_FILE, "w") as f:
-            json.dump({"initial_alpha": {}, "strategy_running": False}, f)
+    if after_block is not None:
+        await app.state.block_clock.wait_for_block_after(after_block, timeout=INFO_LONG_POLL_TIMEOUT)
 
-    with open(STATE_FILE, "r") as f:
-        state = json.load(f)
+    block, version, payload = await _get_info_snapshot(coldkey)
+    etag = _info_etag(block, version)
+    headers = {"ETag": etag, "X-Block-Number": str(block)}
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    return JSONResponse(content=payload, headers=headers)
 
-    # Prepare subtensor and wallet
-    subtensor = await bittensor.async_subtensor().initialize()
-    wallet = get_my_wallet()
 
-    # 1) Get all StakeInfo for this coldkey
-    stake_info_list = await subtensor.get_stake_info_for_coldkey(
-        coldkey_ss58=wallet.coldkeypub.ss58_address
-    )
+async def _build_info(coldkey: str, block: int) -> Dict[str, Any]:
+    state = _load_state()
+    # Only the local wallet and SERVED_COLDKEYS are kept in state.json; anyone can ask for other coldkeys
+    persist = app.state.stake_cache.is_pinned(coldkey)
+    changed = persist and coldkey not in state["wallets"]
+    if persist:
+        wallet_state = _wallet_state(state, coldkey)
+    else:
+        wallet_state = state["wallets"].get(coldkey) or {"initial_alpha": {}, "strategy_running": False}
+
+    # 1) Get all StakeInfo for this coldkey from the shared per-block cache
+    stake_info_list = await app.state.stake_cache.get(coldkey, block)
     # stake_info_list: list[StakeInfo]
     # Each StakeInfo has: hotkey_ss58, coldkey_ss58, netuid, stake, locked, emission, drain, is_registered
 
     # 2) Sum stake by netuid (the user might have multiple hotkeys for one netuid)
-    from collections import defaultdict
     netuid_stakes = defaultdict(float)
 
     for stake_info in stake_info_list:
@@ -70,19 +278,38 @@ async def get_info() -> Dict[str, Any]:
         # stake_info.stake is a bittensor.Balance, convert to float
         netuid_stakes[netuid] += float(stake_info.stake.tao)
 
-    # 3) Merge newly discovered netuids into state["initial_alpha"]
+    # 3) Merge newly discovered netuids into the wallet's initial_alpha
     for netuid, current_tao in netuid_stakes.items():
         netuid_str = str(netuid)
-        if netuid_str not in state["initial_alpha"]:
-            print(f"[serve.py] Discovered netuid={netuid} with stake={current_tao}, not in state.json.")
+        if netuid_str not in wallet_state["initial_alpha"]:
+            if persist:
+                print(f"[serve.py] Discovered netuid={netuid} with stake={current_tao} for {coldkey}, not in state.json.")
             # Decide how to treat the initial stake:
             # Option A: set to 0 => only track new additions as profit
             # Option B: set to current_tao => treat existing stake as initial reference
-            state["initial_alpha"][netuid_str] = 0.0
+            wallet_state["initial_alpha"][netuid_str] = 0.0
+            changed = persist
 
-    # 4) Build holdings_info for all netuids in state["initial_alpha"]
+    # 4) Value every position against one subnet snapshot (alpha * price and
+    #    slippage-adjusted liquidation value), re-valuing only positions whose
+    #    subnet or alpha changed since this wallet was last valued
+    subnet_snapshot = await _get_subnet_snapshot(block)
+    alpha_by_netuid = {
+        int(netuid_str): netuid_stakes.get(int(netuid_str), 0.0)
+        for netuid_str in wallet_state["initial_alpha"]
+    }
+    valuations = app.state.valuations.value(coldkey, subnet_snapshot, alpha_by_netuid)
+
+    ledger_pnl = {}
+    if app.state.ledger is not None:
+        prices = {netuid: valuation["price"] for netuid, valuation in valuations.items()}
+        ledger_pnl = app.state.ledger.pnl(prices, coldkey=coldkey)
+
+    # 5) Build holdings_info for all netuids in initial_alpha
     holdings_info = {}
-    for netuid_str, initial_tao in state["initial_alpha"].items():
+    total_tao_value = 0.0
+    total_liquidation_tao_value = 0.0
+    for netuid_str, initial_tao in wallet_state["initial_alpha"].items():
         netuid = int(netuid_str)
         # Get the user's total stake for this netuid (0 if no stake in netuid_stakes)
         current_tao = netuid_stakes.get(netuid, 0.0)
@@ -91,48 +318,59 @@ async def get_info() -> Dict[str, Any]:
         if initial_tao > 0:
             profit_percent = ((current_tao - initial_tao) / initial_tao) * 100
 
+        valuation = valuations[netuid]
+        total_tao_value += valuation["tao_value"]
+        total_liquidation_tao_value += valuation["liquidation_tao_value"]
+
+        position = ledger_pnl.get(netuid, {})
         holdings_info[netuid_str] = {
             "initial_tao": initial_tao,
             "current_tao": current_tao,
-            "profit_percent": profit_percent
+            "profit_percent": profit_percent,
+            **valuation,
+            "cost_basis_tao": position.get("cost_basis"),
+            "realized_pnl_tao": position.get("realized_pnl"),
+            "unrealized_pnl_tao": position.get("unrealized_pnl")
         }
 
-    # 5) Persist any updates to state.json
-    with open(STATE_FILE, "w") as f:
-        updated_state = {
-            "initial_alpha": state["initial_alpha"],
-            "strategy_running": state.get("strategy_running", False)
-        }
-        json.dump(updated_state, f, indent=2)
+    # 6) Persist any updates to state.json
+    if changed:
+        _save_state(state)
 
     return {
-        "strategy_running": state.get("strategy_running", False),
-        "holdings": holdings_info
+        "block": block,
+        "coldkey": coldkey,
+        "strategy_running": wallet_state.get("strategy_running", False),
+        "holdings": holdings_info,
+        "total_tao_value": total_tao_value,
+        "total_liquidation_tao_value": total_liquidation_tao_value,
+        "total_usd_value": total_tao_value * TAO_PRICE_USD if TAO_PRICE_USD is not None else None
     }
 
 
+def _set_strategy_running(coldkey: str, running: bool):
+    state = _load_state()
+    _wallet_state(state, coldkey)["strategy_running"] = running
+    _save_state(state)
+    _invalidate_info_snapshots()
+
+
 @app.post("/dca")
-async def start_dca():
+async def start_dca(coldkey: Optional[str] = None):
     print("[serve.py] POST /dca called")
+    coldkey = _resolve_own_coldkey(coldkey)
     subprocess.run(["pm2", "start", DCA_SCRIPT, "--name", PM2_APP_NAME])
-    with open(STATE_FILE, "r") as f:
-        state = json.load(f)
-    state["strategy_running"] = True
-    with open(STATE_FILE, "w") as f:
-        json.dump(state, f)
-    return {"message": "DCA strategy started via PM2."}
+    _set_strategy_running(coldkey, True)
+    return {"message": "DCA strategy started via PM2.", "coldkey": coldkey}
 
 
 @app.post("/stop")
-async def stop_dca():
+async def stop_dca(coldkey: Optional[str] = None):
     print("[serve.py] POST /stop called")
+    coldkey = _resolve_own_coldkey(coldkey)
     subprocess.run(["pm2", "stop", PM2_APP_NAME])
-    with open(STATE_FILE, "r") as f:
-        state = json.load(f)
-    state["strategy_running"] = False
-    with open(STATE_FILE, "w") as f:
-        json.dump(state, f)
-    return {"message": "DCA strategy stopped via PM2."}
+    _set_strategy_running(coldkey, False)
+    return {"message": "DCA strategy stopped via PM2.", "coldkey": coldkey}
 
 if __name__ == "__main__":
     print("[serve.py] Starting Uvicorn on 0.0.0.0:8000...")